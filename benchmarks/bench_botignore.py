@@ -0,0 +1,108 @@
+"""
+.botignore matching benchmark.
+
+Walks a bot tree holding a vendored virtual environment (tens of thousands of files) and compares the
+previous fnmatch based filtering against the compiled BotIgnore matcher, with and without a rule pruning
+the virtual environment directory.
+
+Usage:
+    python benchmarks/bench_botignore.py [--packages 300] [--files 100]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+from fnmatch import fnmatch
+from os.path import join
+from time import perf_counter
+
+from roboai_cli.util.botignore import BotIgnore
+
+RULES = [
+    "__pycache__",
+    "*.py[cod]",
+    "*$py.class",
+    "*.so",
+    ".*",
+    "eggs",
+    "*.egg-info",
+    "venv",
+    "virtualenv",
+    "build",
+    ".vscode",
+    "*.log",
+    "*.tmp",
+    "results",
+    "!results/keep.json",
+]
+
+
+def create_tree(root: str, packages: int, files: int):
+    site_packages = join(root, "custom", "env", "lib", "python3.7", "site-packages")
+    for package in range(packages):
+        package_dir = join(site_packages, "package_{0}".format(package), "module")
+        os.makedirs(join(package_dir, "__pycache__"))
+        for file in range(files):
+            for path in [join(package_dir, "file_{0}.py".format(file)),
+                         join(package_dir, "__pycache__", "file_{0}.pyc".format(file))]:
+                open(path, "w").close()
+
+
+def walk_fnmatch(root: str, rules: list) -> int:
+    exclusions = [rule for rule in rules if not rule.startswith("!")]
+    exceptions = [rule.replace("!", "").strip() for rule in rules if rule.startswith("!")]
+    count = 0
+    for dirpath, dirs, files in os.walk(root, topdown=True):
+        dirs[:] = [directory for directory in dirs
+                   if not any(fnmatch(directory, exclusion) for exclusion in exclusions)
+                   or any(fnmatch(directory, exception) for exception in exceptions)]
+        actual_files = [file for file in files
+                        if not any(fnmatch(file, exclusion) for exclusion in exclusions)
+                        or any(fnmatch(file, exception) for exception in exceptions)]
+        actual_dirs = [directory for directory in dirs
+                       if not any(fnmatch(directory, exclusion) for exclusion in exclusions)
+                       or any(fnmatch(directory, exception) for exception in exceptions)]
+        count += len(actual_files) + len(actual_dirs)
+    return count
+
+
+def walk_compiled(root: str, rules: list) -> int:
+    bot_ignore = BotIgnore(rules)
+    count = 0
+    for dirpath, relative_dirpath, dirs, files in bot_ignore.walk(root, "custom"):
+        count += len(files) + len(dirs)
+    return count
+
+
+def measure(function, *args):
+    start = perf_counter()
+    result = function(*args)
+    return perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--packages", type=int, default=300, help="Number of vendored packages.")
+    parser.add_argument("--files", type=int, default=50, help="Number of modules per vendored package.")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="roboai-bench-")
+    try:
+        create_tree(root, args.packages, args.files)
+        custom_dir = join(root, "custom")
+        print("{0} files in the tree".format(args.packages * args.files * 2))
+        for label, function, rules in [
+            ("fnmatch (previous)", walk_fnmatch, RULES),
+            ("compiled", walk_compiled, RULES),
+            ("compiled, env/ pruned", walk_compiled, RULES + ["/custom/env/"]),
+        ]:
+            # warm up the file system cache so that only the matching cost is compared
+            measure(function, custom_dir, rules)
+            elapsed, count = measure(function, custom_dir, rules)
+            print("{0:<26}{1:>8.3f} s{2:>10} entries kept".format(label, elapsed, count))
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+CLI startup import time benchmark.
+
+Runs 'roboai <command> --help' for the group and for every command with 'python -X importtime', and reports
+the time spent importing modules. Fails when a command exceeds its budget, or imports a module only some
+commands need, such as pandas.
+
+Usage:
+    python benchmarks/bench_import_time.py [--runs 3] [--scale 1.0] [command ...]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from roboai_cli.main import COMMANDS
+
+# import time budget, in milliseconds, the commands not using the platform get a smaller one
+DEFAULT_BUDGET = 400
+BUDGETS = {
+    "--help": 150,
+    "daemon": 150,
+    "diff": 150,
+    "interactive": 150,
+    "models": 150,
+    "run": 150,
+    "seed": 150,
+    "shell": 150,
+    "stories": 150,
+    "test": 150,
+    "train": 150,
+}
+# modules which must not be imported by 'roboai <command> --help'
+DEFERRED_MODULES = ["pandas", "questionary", "pkg_resources", "distutils", "halo"]
+
+
+def measure(command: str, home: str) -> (float, set):
+    """
+    Get the import time of a command, in milliseconds, and the top level packages it imported.
+    """
+    args = [sys.executable, "-X", "importtime", "-m", "roboai_cli"] + ([command] if command != "--help" else [])
+    env = dict(os.environ, HOME=home, XDG_CONFIG_HOME=home)
+    result = subprocess.run(args + ["--help"], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                            universal_newlines=True, check=True)
+    total = 0
+    packages = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        packages.add(name.strip().split(".")[0])
+        # the nested imports are included in the cumulative time of the top level ones
+        if not name.startswith("  "):
+            total += int(cumulative)
+    return total / 1000, packages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("commands", nargs="*", help="Commands to benchmark. (default: the group and every command)")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per command, the fastest one is kept.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Factor applied to the budgets, for slow machines.")
+    args = parser.parse_args()
+    commands = args.commands or ["--help"] + sorted(COMMANDS)
+
+    failures = []
+    with tempfile.TemporaryDirectory(prefix="roboai-bench-") as home:
+        print("{0:<16}{1:>12}{2:>12}".format("command", "import ms", "budget ms"))
+        for command in commands:
+            runs = [measure(command, home) for _ in range(args.runs)]
+            elapsed = min(run[0] for run in runs)
+            deferred = sorted(set(DEFERRED_MODULES) & set.union(*(run[1] for run in runs)))
+            budget = BUDGETS.get(command, DEFAULT_BUDGET) * args.scale
+            status = "" if elapsed <= budget else "  over budget"
+            if deferred:
+                status += "  imports {0}".format(", ".join(deferred))
+            if status:
+                failures.append(command)
+            print("{0:<16}{1:>12.1f}{2:>12.0f}{3}".format(command, elapsed, budget, status))
+
+    if failures:
+        sys.exit("Import time regression: {0}".format(", ".join(failures)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Packaging throughput benchmark.
+
+Compares the previous serial packaging path (zipfile.ZipFile with ZIP_DEFLATED) against the
+ZipArchiveWriter used by 'roboai package --jobs N' on a synthetic bot tree.
+
+Usage:
+    python benchmarks/bench_packaging.py [--size-mb 256] [--jobs 1 2 4 8]
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import zipfile
+from os.path import join
+from time import perf_counter
+
+from roboai_cli.util.archive import ZipArchiveWriter, get_cpu_count
+
+
+def create_model_chunk(rng: random.Random, words: list, size: int) -> bytes:
+    """
+    Create YAML-like data, compressible like the text files of a bot but far less than repeated text.
+    """
+    lines = []
+    length = 0
+    while length < size:
+        line = "- {0}: {1}\n  confidence: {2:.6f}\n  tokens: [{3}]\n".format(
+            rng.choice(words).decode(), rng.randrange(1 << 20), rng.random(),
+            ", ".join(str(rng.randrange(50000)) for _ in range(8))).encode()
+        lines.append(line)
+        length += len(line)
+    return b"".join(lines)[:size]
+
+
+def create_tree(root: str, size_mb: int) -> list:
+    """
+    Create a bot-like tree: many small text files plus a large, compressible model file.
+    """
+    entries = []
+    words = [b"intent", b"greet", b"hello", b"utter", b"action", b"slot", b"entity", b"form", b"story"]
+    rng = random.Random(0)
+    os.makedirs(join(root, "data"))
+    entries.append((join(root, "data"), "data/"))
+    for i in range(200):
+        path = join(root, "data", "nlu_{0}.md".format(i))
+        with open(path, "wb") as f:
+            f.write(b" ".join(rng.choice(words) for _ in range(20000)))
+        entries.append((path, "data/nlu_{0}.md".format(i)))
+
+    os.makedirs(join(root, "models"))
+    path = join(root, "models", "model.bin")
+    chunks = [create_model_chunk(rng, words, 1024 * 1024) for _ in range(8)]
+    with open(path, "wb") as f:
+        for i in range(size_mb):
+            f.write(chunks[i % len(chunks)])
+    entries.append((path, "models/model.bin"))
+    return entries
+
+
+def bench_zipfile(entries: list, output: str) -> float:
+    start = perf_counter()
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as package_zip:
+        for source, arcname in entries:
+            package_zip.write(source, arcname)
+    return perf_counter() - start
+
+
+def bench_writer(entries: list, output: str, jobs: int) -> float:
+    start = perf_counter()
+    with ZipArchiveWriter(output, jobs=jobs) as writer:
+        writer.write(entries)
+    return perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=256, help="Size of the synthetic model file in MB.")
+    parser.add_argument("--jobs", type=int, nargs="+", default=None, help="Job counts to benchmark.")
+    args = parser.parse_args()
+    jobs_list = args.jobs or sorted({1, 2, 4, get_cpu_count()})
+
+    root = tempfile.mkdtemp(prefix="roboai-bench-")
+    try:
+        entries = create_tree(join(root, "bot"), args.size_mb)
+        total = sum(os.path.getsize(source) for source, arcname in entries if not arcname.endswith("/"))
+        output = join(root, "package.zip")
+
+        elapsed = bench_zipfile(entries, output)
+        print("{0:<24}{1:>8.2f} s{2:>10.1f} MB/s{3:>12} bytes".format(
+            "zipfile (serial)", elapsed, total / elapsed / 1e6, os.path.getsize(output)))
+        for jobs in jobs_list:
+            elapsed = bench_writer(entries, output, jobs)
+            with zipfile.ZipFile(output) as package_zip:
+                assert package_zip.testzip() is None
+                # the throughput is only meaningful when the entries were deflated rather than stored
+                assert all(info.compress_type == zipfile.ZIP_DEFLATED
+                           for info in package_zip.infolist() if not info.is_dir())
+            print("{0:<24}{1:>8.2f} s{2:>10.1f} MB/s{3:>12} bytes".format(
+                "writer --jobs {0}".format(jobs), elapsed, total / elapsed / 1e6, os.path.getsize(output)))
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
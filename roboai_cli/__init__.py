@@ -1,7 +1,7 @@
 """ROBO.AI Bot Manager"""
 
-from roboai_cli import main
-
 __version__ = "1.0.0"
 
+from roboai_cli import main  # noqa: E402
+
 run = main.run
@@ -4,8 +4,6 @@ from os.path import dirname, isfile, join
 from shutil import copyfile
 
 import click
-import pkg_resources
-from questionary import Choice, prompt
 from robo_ai.model.assistant.assistant import Assistant
 from robo_ai.model.assistant.assistant_list_response import (
     AssistantListResponse,
@@ -138,6 +136,8 @@ def get_bot_uuid() -> str:
         if page > 0:
             bot_choices.append({"name": "> Previous page...", "value": PREV_PAGE})
 
+        from questionary import Choice, prompt
+
         questions = [
             {
                 "type": "list",
@@ -173,6 +173,8 @@ def get_base_version() -> str:
 
     version_choices = [{"value": base_version["version"], "name": base_version["label"]} for base_version in versions]
 
+    from questionary import prompt
+
     questions = [
         {
             "type": "list",
@@ -207,6 +209,8 @@ def create_bot_ignore(bot_ignore_dir: str):
 
 
 def get_bot_ignore_path() -> str:
+    import pkg_resources
+
     return pkg_resources.resource_filename(__name__, "../initial_structure/initial_project/.botignore")
 
 
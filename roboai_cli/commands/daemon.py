@@ -0,0 +1,68 @@
+import click
+
+from roboai_cli.util.cli import print_message, print_success
+from roboai_cli.util.rasa_daemon import (
+    DEFAULT_MODEL_CACHE_SIZE,
+    STATUS_REQUEST,
+    STOP_REQUEST,
+    ModelCache,
+    RasaDaemon,
+    get_daemon_socket_path,
+    handle_agent_message,
+    import_rasa,
+    is_daemon_running,
+    is_daemon_supported,
+    load_agent,
+    request_daemon,
+    run_rasa_command,
+)
+
+
+@click.command(name="daemon", help="Run a daemon keeping Rasa and the last used models loaded between commands.")
+@click.option("--models", "model_cache_size", type=click.IntRange(min=1), default=DEFAULT_MODEL_CACHE_SIZE,
+              help="Number of models kept loaded. (default: {0})".format(DEFAULT_MODEL_CACHE_SIZE))
+@click.option("--status", is_flag=True, default=False, help="Display the status of the running daemon.")
+@click.option("--stop", is_flag=True, default=False, help="Stop the running daemon.")
+def command(model_cache_size: int, status: bool, stop: bool):
+    """
+    Run the Rasa daemon in the foreground until it is stopped. While it runs, the train, test and shell commands
+    send it their Rasa jobs instead of starting Rasa in a new process.
+
+    Args:
+        model_cache_size (int): number of models kept loaded
+        status (bool): optional flag to display the status of the running daemon
+        stop (bool): optional flag to stop the running daemon
+    """
+    if not is_daemon_supported():
+        raise click.ClickException("The daemon is not supported on this platform, it needs unix sockets.")
+    if status and stop:
+        raise click.UsageError("The daemon status cannot be displayed while stopping it.")
+
+    if status or stop:
+        responses = request_daemon({"type": STATUS_REQUEST if status else STOP_REQUEST})
+        if responses is None:
+            raise click.ClickException("No daemon is running.")
+        response = next(responses)
+        if stop:
+            print_success("The daemon was stopped.")
+            return
+        print_message("Daemon running with pid {0} for {1:.0f} s, {2} jobs handled.".format(
+            response["pid"], response["uptime"], response["jobs"]))
+        for model_path in reversed(response["models"]):
+            print_message("  {0}".format(model_path))
+        return
+
+    if is_daemon_running():
+        raise click.ClickException("A daemon is already running.")
+    import_rasa()
+    daemon = RasaDaemon(get_daemon_socket_path(), ModelCache(load_agent, model_cache_size), run_rasa_command,
+                        handle_agent_message)
+    print_success("Daemon listening on {0}, stop it with 'roboai daemon --stop'.".format(get_daemon_socket_path()))
+    try:
+        daemon.serve()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    command()
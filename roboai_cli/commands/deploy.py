@@ -1,15 +1,27 @@
+import json
 from os.path import abspath, dirname, join
+from time import perf_counter
 
 import click
-from roboai_cli.util.cli import print_message, print_success
+from roboai_cli.util.batch import DEFAULT_CONCURRENCY, print_batch_results, run_batch
+from roboai_cli.util.cli import print_info, print_message, print_success
+from roboai_cli.util.deploy_timings import (
+    DeployTimings,
+    append_deploy_history,
+    format_deploy_record,
+    get_deploy_record,
+    measure,
+)
+from roboai_cli.util.http import get_request_count
 from roboai_cli.util.robo import (
     create_package,
-    create_runtime,
-    does_the_runtime_exist,
+    create_packages,
+    deploy_package,
+    get_bot_languages,
     get_current_bot_base_version,
     get_current_bot_uuid,
     get_default_package_path,
-    update_runtime,
+    get_language_package_path,
     validate_package_file,
     validate_robo_session,
 )
@@ -20,6 +32,14 @@ from roboai_cli.util.robo import (
     "language",
     nargs=-1,
 )
+@click.option(
+    "--all",
+    "all_languages",
+    is_flag=True,
+    type=bool,
+    default=False,
+    help="Deploys every language of the bot.",
+)
 @click.option(
     "--skip-packaging",
     is_flag=True,
@@ -46,31 +66,102 @@ from roboai_cli.util.robo import (
     default=None,
     help="Path to the model to be packaged. If no model is passed then the latest one is picked up.",
 )
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=0),
+    default=1,
+    help="Number of parallel compression workers used when packaging, 0 uses all the available cores. (default: 1)",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    type=bool,
+    default=False,
+    help="Deploys the package even if it is the same as the one already running.",
+)
+@click.option(
+    "--parallel-uploads",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of package parts uploaded at once. (default: 1)",
+)
+@click.option(
+    "--timeout",
+    type=click.FloatRange(min=0),
+    default=None,
+    help="Maximum time to wait for the bot runtime, in seconds. (default: no timeout)",
+)
+@click.option(
+    "--concurrency",
+    type=click.IntRange(min=1),
+    default=DEFAULT_CONCURRENCY,
+    help="Number of languages deployed at once when deploying several languages. (default: {0})".format(
+        DEFAULT_CONCURRENCY),
+)
+@click.option(
+    "--timings",
+    type=click.Choice(["text", "json"]),
+    default=None,
+    help="Print the time spent in each deployment phase and append it to the deploy history of the bot.",
+)
 def command(
-    language: tuple, skip_packaging: bool, package_file: str, bot_uuid: str, runtime_base_version: str, model: str
+    language: tuple, all_languages: bool, skip_packaging: bool, package_file: str, bot_uuid: str,
+    runtime_base_version: str, model: str, jobs: int, force: bool, parallel_uploads: int, timeout: float,
+    concurrency: int, timings: str
 ):
     """
     Deploy a bot into the ROBO.AI platform.
 
     Args:
-        language: language code of the bot to be deployed
+        language: language codes of the bots to be deployed
+        all_languages (bool): optional flag to deploy every language of the bot
         skip_packaging (bool): optional flag indicating whether packaging should be skipped
         package_file (str): optional flag stating where the package file is stored
         bot_uuid (str): optional argument stating the ID of the bot
         runtime_base_version (str): optional argument stating the runtime version
         model (str): optional argument with the path to the model to be packaged.
                     If no model is passed then the latest one is picked up.
+        jobs (int): number of parallel compression workers used when packaging, 0 uses all the available cores.
+        force (bool): optional flag to deploy the package even if it is the same as the one already running
+        parallel_uploads (int): number of package parts uploaded at once
+        timeout (float): optional maximum time to wait for the bot runtime status changes, in seconds
+        concurrency (int): number of languages deployed at once when deploying several languages
+        timings (str): optional format, text or json, of the deployment phase timings to print
     """
-    validate_robo_session()
+    deploy_timings = DeployTimings() if timings else None
+    deployments = {}
+    start = perf_counter()
+    try:
+        with measure(deploy_timings, "session_validation"):
+            validate_robo_session()
+
+        if all_languages:
+            language = tuple(get_bot_languages(abspath(".")))
+
+        if len(language) > 1:
+            if package_file or bot_uuid or model:
+                raise click.UsageError("A package file, a bot UUID or a model can only be selected when deploying "
+                                       "a single language.")
+            deploy_languages(list(language), skip_packaging, runtime_base_version, jobs, force, parallel_uploads,
+                             timeout, concurrency, deploy_timings, deployments)
+        else:
+            deploy_language(language[0] if language else None, skip_packaging, package_file, bot_uuid,
+                            runtime_base_version, model, jobs, force, parallel_uploads, timeout, deploy_timings,
+                            deployments)
+    finally:
+        if deploy_timings:
+            print_deploy_timings(deploy_timings, deployments, perf_counter() - start, timings)
 
-    if len(language) == 0:
+
+def deploy_language(language: str, skip_packaging: bool, package_file: str, bot_uuid: str, runtime_base_version: str,
+                    model: str, jobs: int, force: bool, parallel_uploads: int, timeout: float,
+                    deploy_timings: DeployTimings, deployments: dict):
+    if not language:
         bot_dir = bot_ignore_dir = abspath(".")
-    elif len(language) == 1:
-        bot_dir = abspath(join(".", "languages", language[0]))
-        bot_ignore_dir = dirname(dirname(bot_dir))
     else:
-        print_message("Please select only one bot to deploy.\n")
-        exit(0)
+        bot_dir = abspath(join(".", "languages", language))
+        bot_ignore_dir = dirname(dirname(bot_dir))
 
     if not bot_uuid:
         bot_uuid = get_current_bot_uuid(bot_dir)
@@ -81,19 +172,82 @@ def command(
     if package_file:
         validate_package_file(package_file)
     elif not skip_packaging:
-        package_file = create_package(bot_dir, bot_ignore_dir, model)
+        with measure(deploy_timings, "packaging"):
+            package_file = create_package(bot_dir, bot_ignore_dir, model, jobs)
     elif not package_file:
         package_file = get_default_package_path()
 
     validate_package_file(package_file)
 
-    if does_the_runtime_exist(bot_uuid):
-        update_runtime(bot_uuid, package_file, runtime_base_version)
+    timings = DeployTimings() if deploy_timings else None
+    deployments[language or "default"] = timings
+    deployment = deploy_package(bot_dir, bot_uuid, package_file, runtime_base_version, force, parallel_uploads,
+                                timeout, timings=timings)
+    if not deployment.deployed:
+        print_info("The package is the same as the one already running, skipping the deployment. "
+                   "Use --force to deploy it anyway.")
+        return
+
+    if deployment.downtime is not None:
+        print_info("The bot runtime was down for {0:.1f} s, from the stop request until it was running again."
+                   .format(deployment.downtime))
+        if deployment.uploaded_while_down:
+            print_info("The platform does not support staged uploads, the package was uploaded while it was down.")
+    print_success("Deployment complete.\n")
+
+
+def deploy_languages(languages: list, skip_packaging: bool, runtime_base_version: str, jobs: int, force: bool,
+                     parallel_uploads: int, timeout: float, concurrency: int, deploy_timings: DeployTimings,
+                     deployments: dict):
+    """
+    Package several languages, then deploy them concurrently. A language failing to deploy does not stop the others.
+    """
+    bot_root_dir = abspath(".")
+    bot_dirs = {language: join(bot_root_dir, "languages", language) for language in languages}
+    bot_uuids = {language: get_current_bot_uuid(bot_dir) for language, bot_dir in bot_dirs.items()}
+    if len(set(bot_uuids.values())) < len(languages):
+        raise click.UsageError("Several languages refer to the same bot UUID, please check their manifest files.")
+    base_versions = {language: runtime_base_version or get_current_bot_base_version(bot_dir)
+                     for language, bot_dir in bot_dirs.items()}
+
+    if skip_packaging:
+        package_files = {language: get_language_package_path(language) for language in languages}
     else:
-        create_runtime(bot_uuid, package_file, runtime_base_version)
+        with measure(deploy_timings, "packaging"):
+            package_files = create_packages(bot_root_dir, languages, jobs)
+    for package_file in package_files.values():
+        validate_package_file(package_file)
+
+    def get_task(language: str):
+        def deploy(reporter) -> str:
+            timings = DeployTimings() if deploy_timings else None
+            deployments[language] = timings
+            deployment = deploy_package(bot_dirs[language], bot_uuids[language], package_files[language],
+                                        base_versions[language], force, parallel_uploads, timeout, reporter, timings)
+            if not deployment.deployed:
+                return "skipped, the package is already running"
+            if deployment.downtime is not None:
+                return "deployed, down for {0:.1f} s{1}".format(
+                    deployment.downtime, " including the upload" if deployment.uploaded_while_down else "")
+            return "deployed"
+        return deploy
 
+    results = run_batch({language: get_task(language) for language in languages}, concurrency,
+                        "Deploying {0} languages".format(len(languages)))
+    print_batch_results(results, "Language", "deployments")
     print_success("Deployment complete.\n")
 
 
+def print_deploy_timings(deploy_timings: DeployTimings, deployments: dict, total: float, output_format: str):
+    record = get_deploy_record(deploy_timings, deployments, get_request_count(), total)
+    history_path = append_deploy_history(abspath("."), record)
+    if output_format == "json":
+        # a single line, so that the record can be picked out of the other messages
+        print_message(json.dumps(record, sort_keys=True))
+    else:
+        print_message(format_deploy_record(record))
+        print_message("The timings were appended to {0}".format(history_path))
+
+
 if __name__ == "__main__":
     command()
@@ -7,6 +7,7 @@ from os.path import join
 
 from roboai_cli.util.cli import print_info, print_success
 from roboai_cli.util.input_output import load_yaml
+from roboai_cli.util.workspace import get_workspace
 
 
 @click.command(name="diff", help="Check for structural differences between languages for the same multi-language bot.")
@@ -94,15 +95,10 @@ def get_all_languages(path: str, languages: tuple):
     if len(languages) == 0:
         print_info("No language was provided. Will identify differences for \
                    all available language pairs inside provided bot folder.")
-        languages_paths = [join(path, "languages", folder) for folder in os.listdir(join(path, "languages"))
-                           if os.path.isdir(os.path.join(path, "languages", folder))]
     elif len(languages) == 1:
         print_info("Unable to provide differences: at least two languages must be provided.")
         exit(0)
-    else:
-        languages_paths = [join(path, "languages", folder) for folder in os.listdir(join(path, "languages"))
-                           if os.path.isdir(os.path.join(path, "languages", folder)) and folder in languages]
-    return languages_paths
+    return get_workspace(path).get_language_dirs(languages)
 
 
 if __name__ == "__main__":
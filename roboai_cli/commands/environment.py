@@ -4,7 +4,7 @@ from roboai_cli.config.tool_settings import ToolSettings
 from robo_ai.exception.invalid_credentials_error import InvalidCredentialsError
 from robo_ai.model.config import Config
 from roboai_cli.util.cli import loading_indicator, print_error, print_success, print_info
-from roboai_cli.util.robo import get_robo_client
+from roboai_cli.util.robo import get_robo_client, reset_current_robo_client
 from roboai_cli.config.environment_settings import EnvironmentAuth, Environment
 
 
@@ -71,6 +71,7 @@ def activate_environment(settings, env_name):
     verify_endpoint_validity(environment.base_url, environment.api_auth_setting.username,
                              environment.api_auth_setting.password, environment)
     settings.set_current_environment(environment)
+    reset_current_robo_client()
     print_success(f"The connection to the {env_name} environment was successfully established.")
 
 
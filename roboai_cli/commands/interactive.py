@@ -1,7 +1,8 @@
 import click
 import os
 from os.path import join, abspath
-import glob
+
+from roboai_cli.util.model_registry import get_latest_model_path
 
 
 @click.command(name='interactive', help='Run in interactive learning mode where you can \
@@ -19,8 +20,7 @@ def command(language: str):
 
 def start_interactive_mode(language: str):
 
-    list_of_models = glob.glob(join(abspath("."), "languages", language, "models", "*.tar.gz"))
-    latest_model = max(list_of_models, key=os.path.getctime)
+    latest_model = get_latest_model_path(join(abspath('.'), 'languages', language))
 
     config_path = join(abspath('.'), 'languages', language, 'config.yml')
     domain_path = join(abspath('.'), 'languages', language, 'domain.yml')
@@ -3,7 +3,7 @@ import click
 from roboai_cli.config.tool_settings import ToolSettings
 from robo_ai.exception.invalid_credentials_error import InvalidCredentialsError
 from roboai_cli.util.cli import print_error, loading_indicator, print_success
-from roboai_cli.util.robo import get_robo_client
+from roboai_cli.util.robo import get_robo_client, get_token_expiry, reset_current_robo_client, save_auth_token
 
 
 @click.command(name='login', help='Initialize a new session using a ROBO.AI API key.')
@@ -23,8 +23,8 @@ def command(api_key: str):
             tokens = robo.oauth.authenticate(api_key)
 
         current_environment.api_key = api_key
-        current_environment.api_auth_token = tokens.access_token
-        settings.update_environment(current_environment)
+        save_auth_token(current_environment, tokens.access_token, get_token_expiry(tokens.expires_in))
+        reset_current_robo_client()
         print_success('Successfully authenticated!\n')
 
     except InvalidCredentialsError:
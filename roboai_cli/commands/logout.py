@@ -2,6 +2,7 @@ import click
 
 from roboai_cli.config.tool_settings import ToolSettings
 from roboai_cli.util.cli import print_success
+from roboai_cli.util.robo import reset_current_robo_client
 
 
 @click.command(name='logout', help='Close the current session in the ROBO.AI platform.')
@@ -12,9 +13,12 @@ def command():
     settings = ToolSettings()
     current_environment = settings.get_current_environment()
     current_environment.api_auth_token = None
+    current_environment.api_auth_token_expiry = None
     current_environment.api_key = None
-    settings.update_environment(current_environment)
-    settings.set_current_environment(None)
+    with settings.batch():
+        settings.update_environment(current_environment)
+        settings.set_current_environment(None)
+    reset_current_robo_client()
     print_success('Your session was successfully terminated.\n')
 
 
@@ -1,46 +1,240 @@
-from os.path import abspath, join
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
 import click
-from roboai_cli.util.cli import loading_indicator, print_info, print_message
+import requests
+from robo_ai.exception.api_error import ApiError
+from roboai_cli.util.batch import DEFAULT_CONCURRENCY
+from roboai_cli.util.cli import loading_indicator, print_info, print_message, print_warning
+from roboai_cli.util.log_stats import DEFAULT_SLOW_ACTION_THRESHOLD, format_log_stats, get_log_stats
+from roboai_cli.util.log_store import get_log_store
 from roboai_cli.util.robo import (
-    get_current_bot_uuid,
-    get_runtime_logs,
+    get_runtime_log_lines,
+    get_target_bot_uuids,
     validate_robo_session
 )
+from roboai_cli.util.runtime_logs import (
+    DEFAULT_FOLLOW_INTERVAL,
+    filter_since,
+    follow_logs,
+    get_last_lines,
+    merge_logs,
+    parse_time,
+)
 
 
 @click.command(name='logs', help='Display selected bot runtime logs.')
 @click.argument('language', nargs=-1,)
+@click.option('--all', 'all_languages', is_flag=True, default=False,
+              help='Display the logs of the bots of every language, merged by timestamp.')
 @click.option('--bot-uuid',
               type=str,
               default=None,
               help='The bot UUID to use, it overrides the bot UUID configured \
               in the manifest.')
-def command(language: tuple, bot_uuid: str):
+@click.option('--follow', '-f', is_flag=True, default=False,
+              help='Keep displaying the new log lines as they are logged.')
+@click.option('--since', type=str, default=None,
+              help='Only display the lines logged since a duration, such as 15m or 2h, or a UTC timestamp, '
+                   'such as "2021-01-27 10:15".')
+@click.option('--grep', 'pattern', type=str, default=None,
+              help='Only display the lines matching a regular expression.')
+@click.option('--from', 'from_time', type=str, default=None,
+              help='Only display the lines logged from a duration or a UTC timestamp, like --since.')
+@click.option('--to', 'to_time', type=str, default=None,
+              help='Only display the lines logged up to a duration or a UTC timestamp.')
+@click.option('--lines', '-n', 'line_count', type=click.IntRange(min=0), default=None,
+              help='Only display the last N lines.')
+@click.option('--stats', is_flag=True, default=False,
+              help='Display statistics of the lines instead of the lines: errors, requests per minute, request '
+                   'latency percentiles, exceptions and slow action calls.')
+@click.option('--slow-action', 'slow_action_threshold', type=click.FloatRange(min=0),
+              default=DEFAULT_SLOW_ACTION_THRESHOLD,
+              help='Duration from which an action call is reported as slow by --stats, in seconds. '
+                   '(default: {0})'.format(DEFAULT_SLOW_ACTION_THRESHOLD))
+@click.option('--interval', type=click.FloatRange(min=0.1), default=DEFAULT_FOLLOW_INTERVAL,
+              help='Time between two log fetches when following the logs, in seconds. (default: {0})'.format(
+                  DEFAULT_FOLLOW_INTERVAL))
+@click.option('--concurrency', type=click.IntRange(min=1), default=DEFAULT_CONCURRENCY,
+              help='Number of bot logs fetched at once. (default: {0})'.format(DEFAULT_CONCURRENCY))
+def command(language: tuple, all_languages: bool, bot_uuid: str, follow: bool, since: str, pattern: str,
+            from_time: str, to_time: str, line_count: int, stats: bool, slow_action_threshold: float, interval: float,
+            concurrency: int):
     """
     display selected bot runtime logs.
 
     Args:
-        language: language code of the bot to get logs from
+        language: language codes of the bots to get logs from
+        all_languages (bool): optional flag to get the logs of the bots of every language
         bot_uuid (str): optional argument stating the ID of the bot to get logs from
+        follow (bool): optional flag to keep displaying the new log lines
+        since (str): optional duration or timestamp from which the lines are displayed
+        pattern (str): optional regular expression the displayed lines match
+        from_time (str): optional duration or timestamp from which the stored lines are displayed
+        to_time (str): optional duration or timestamp up to which the stored lines are displayed
+        line_count (int): optional number of last lines to display
+        stats (bool): optional flag to display statistics of the lines instead of the lines
+        slow_action_threshold (float): duration from which an action call is reported as slow, in seconds
+        interval (float): time between two log fetches when following the logs, in seconds
+        concurrency (int): number of bot logs fetched at once when getting the logs of several bots
     """
+    since_time = parse_time(since) if since else None
+    start_time = parse_time(from_time) if from_time else since_time
+    end_time = parse_time(to_time) if to_time else None
+    regex = get_regex(pattern) if pattern else None
+    if stats and follow:
+        raise click.UsageError("The statistics cannot be displayed while following the logs.")
+    # the lines are selected from the local log store when they are searched
+    query = bool(pattern or from_time or to_time)
     validate_robo_session()
 
-    if len(language) == 0:
-        bot_dir = abspath('.')
-    elif len(language) == 1:
-        bot_dir = abspath(join('.', 'languages', language[0]))
-    else:
-        print_message('Please select only one bot to check the logs.')
-        exit(0)
+    bot_uuids = get_target_bot_uuids(language, all_languages, bot_uuid)
+    if len(bot_uuids) > 1:
+        display_merged_logs(bot_uuids, follow, query, start_time, end_time, regex, line_count,
+                            slow_action_threshold if stats else None, interval, concurrency)
+        return
 
-    if not bot_uuid:
-        bot_uuid = get_current_bot_uuid(bot_dir)
+    bot_uuid = next(iter(bot_uuids.values()))
 
     # validate_bot(bot_uuid)
 
+    # the fetched lines are kept in the local log store, which only stores the lines it does not have yet
+    store = get_log_store(bot_uuid)
     with loading_indicator('Fetching logs from server...'):
-        logs = get_runtime_logs(bot_uuid)
+        lines = get_runtime_log_lines(bot_uuid)
+        store.advance(lines)
+
+    if query:
+        lines = store.query(start_time, end_time, pattern)
+    else:
+        lines = select_lines(lines, since_time)
+    if stats:
+        print_stats(lines, line_count, slow_action_threshold)
+        return
 
     print_info("Displaying logs for bot '{0}'\n".format(bot_uuid))
-    print_message(logs + "\n")
+    print_lines(lines, line_count)
+
+    if follow:
+        try:
+            print_lines(select_lines(follow_logs(lambda: poll_log_lines(bot_uuid), store, interval),
+                                     start_time, regex))
+        except KeyboardInterrupt:
+            pass
+
+
+def display_merged_logs(bot_uuids: Dict[str, str], follow: bool, query: bool, start_time, end_time, regex,
+                        line_count: int, slow_action_threshold: Optional[float], interval: float, concurrency: int):
+    """
+    Display the logs of several bots merged by timestamp, every line being prefixed by the name of its bot,
+    or the statistics of the logs of every bot when a slow action threshold is given.
+    The logs are fetched concurrently, and the bots whose logs cannot be fetched are left out.
+    """
+    stores = {name: get_log_store(uuid) for name, uuid in bot_uuids.items()}
+    with loading_indicator('Fetching logs of {0} bots from server...'.format(len(bot_uuids))):
+        buffers, errors = fetch_log_lines(bot_uuids, concurrency)
+        for name, lines in buffers.items():
+            stores[name].advance(lines)
+    print_fetch_errors(errors)
+    if not buffers:
+        raise click.ClickException("The logs of none of the bots could be fetched.")
+
+    if query:
+        streams = {name: stores[name].query(start_time, end_time, regex.pattern if regex else None)
+                   for name in buffers}
+    else:
+        streams = {name: select_lines(lines, start_time) for name, lines in buffers.items()}
+    if slow_action_threshold is not None:
+        for name, lines in streams.items():
+            print_info("Bot '{0}'".format(name))
+            print_stats(lines, line_count, slow_action_threshold)
+        return
+
+    print_info("Displaying logs for bots {0}\n".format(", ".join("'{0}'".format(name) for name in buffers)))
+    print_lines(merge_logs(streams), line_count)
+
+    if follow:
+        try:
+            while True:
+                time.sleep(interval)
+                buffers, errors = fetch_log_lines(bot_uuids, concurrency)
+                print_fetch_errors(errors)
+                print_lines(merge_logs({name: select_lines(stores[name].advance(lines), start_time, regex)
+                                        for name, lines in buffers.items()}))
+        except KeyboardInterrupt:
+            pass
+
+
+def fetch_log_lines(bot_uuids: Dict[str, str],
+                    concurrency: int) -> Tuple[Dict[str, List[str]], Dict[str, BaseException]]:
+    """
+    Fetch the log buffers of several bots concurrently.
+
+    Returns:
+        Tuple[Dict[str, List[str]], Dict[str, BaseException]]: the log lines by bot name, and the errors
+        of the bots whose logs could not be fetched
+    """
+    def fetch(bot_uuid: str):
+        try:
+            return get_runtime_log_lines(bot_uuid)
+        except (Exception, ApiError) as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(bot_uuids))) as executor:
+        results = dict(zip(bot_uuids, executor.map(fetch, bot_uuids.values())))
+    buffers = {name: result for name, result in results.items() if not isinstance(result, BaseException)}
+    errors = {name: result for name, result in results.items() if isinstance(result, BaseException)}
+    return buffers, errors
+
+
+def poll_log_lines(bot_uuid: str) -> List[str]:
+    """
+    Get the log lines of a bot while following its logs, a failing poll only gives no new line.
+    """
+    try:
+        return get_runtime_log_lines(bot_uuid)
+    except (ApiError, requests.RequestException) as e:
+        print_warning("Could not fetch the logs, retrying: {0}".format(format_fetch_error(e)))
+        return []
+
+
+def print_fetch_errors(errors: Dict[str, BaseException]):
+    for name, error in errors.items():
+        print_warning("Could not fetch the logs of '{0}': {1}".format(name, format_fetch_error(error)))
+
+
+def format_fetch_error(error: BaseException) -> str:
+    if isinstance(error, click.ClickException):
+        return error.format_message()
+    return str(error) or type(error).__name__
+
+
+def get_regex(pattern: str):
+    try:
+        return re.compile(pattern)
+    except re.error as e:
+        raise click.BadParameter("'{0}' is not a valid regular expression: {1}.".format(pattern, e),
+                                 param_hint="'--grep'")
+
+
+def select_lines(lines, since_time=None, regex=None):
+    if since_time:
+        lines = filter_since(lines, since_time)
+    if regex:
+        lines = (line for line in lines if regex.search(line))
+    return lines
+
+
+def print_stats(lines, line_count: int = None, slow_action_threshold: float = DEFAULT_SLOW_ACTION_THRESHOLD):
+    if line_count is not None:
+        lines = get_last_lines(lines, line_count)
+    print_message(format_log_stats(get_log_stats(lines, slow_action_threshold)))
+
+
+def print_lines(lines, line_count: int = None):
+    if line_count is not None:
+        lines = get_last_lines(lines, line_count)
+    for line in lines:
+        print_message(line)
@@ -0,0 +1,75 @@
+import click
+from os.path import abspath
+from datetime import datetime
+
+from roboai_cli.util.cli import print_info, print_message, print_success
+from roboai_cli.util.model_registry import parse_size
+from roboai_cli.util.package_report import format_size
+from roboai_cli.util.workspace import Workspace, get_workspace
+
+
+@click.command(name="models", help="List the trained models and remove the old ones.")
+@click.argument("languages", nargs=-1,)
+@click.option("--keep", type=click.IntRange(min=1), default=None,
+              help="Number of models to keep per language, the oldest ones are removed.")
+@click.option("--max-size", type=str, default=None,
+              help="Maximum size of the models kept per language, e.g. 500M or 2G, the oldest ones are removed.")
+@click.option("--dry-run", is_flag=True, default=False,
+              help="Show the models which would be removed without removing them.")
+def command(languages: tuple, keep: int, max_size: str, dry_run: bool):
+    """
+    List the models of the bots, from the latest to the oldest, and garbage-collect the old ones.
+    The latest model of a bot is never removed.
+
+    Args:
+        languages (tuple): language codes of the bots. If no language is passed all the languages are used.
+        keep (int): optional number of models to keep per language
+        max_size (str): optional maximum size of the models kept per language
+        dry_run (bool): optional flag to only show the models which would be removed
+    """
+    try:
+        max_bytes = parse_size(max_size) if max_size else None
+    except ValueError:
+        raise click.BadParameter("'{0}' is not a valid size.".format(max_size), param_hint="--max-size")
+
+    workspace = get_workspace(abspath("."))
+    for language, language_dir in get_language_dirs(workspace, languages):
+        model_registry = workspace.get_model_registry(language_dir)
+        if language:
+            print_message("{0}:".format(language))
+        show_models(model_registry)
+
+        if keep is None and max_bytes is None:
+            continue
+        removed = model_registry.prune(keep, max_bytes, dry_run)
+        for model in removed:
+            print_info("{0} {1} ({2})".format("Would remove" if dry_run else "Removed", model.name,
+                                              format_size(model.size)))
+        if not dry_run and removed:
+            print_success("Removed {0} models, freeing {1}.".format(
+                len(removed), format_size(sum(model.size for model in removed))))
+
+
+def get_language_dirs(workspace: Workspace, languages: tuple) -> list:
+    if not workspace.is_multi_language:
+        return [(None, workspace.root)]
+    if not languages:
+        languages = workspace.get_languages()
+    return [(language, workspace.get_language_dir(language)) for language in languages]
+
+
+def show_models(model_registry):
+    models = model_registry.models
+    if not models:
+        print_message("  No models found.")
+        return
+    for index, model in enumerate(models):
+        print_message("  {0:<45} {1:<5} {2:>10}  {3}  {4}{5}".format(
+            model.name, model.type, format_size(model.size),
+            datetime.fromtimestamp(model.created).strftime("%Y-%m-%d %H:%M:%S"),
+            (model.fingerprint or "-")[:12], "  (latest)" if index == 0 else ""
+        ))
+
+
+if __name__ == "__main__":
+    command()
@@ -1,35 +1,74 @@
+import json
+
 import click
 
 from os.path import abspath, join, dirname
 
 from roboai_cli.util.cli import print_success, print_message
-from roboai_cli.util.robo import create_package
+from roboai_cli.util.package_report import DEFAULT_TOP_ENTRIES
+from roboai_cli.util.robo import create_package, create_packages, get_bot_languages, get_package_report
 
 
 @click.command(name="package",
                help="Package the required bot and make it ready for deployment.")
 @click.argument("language", nargs=-1,)
+@click.option("--all", "all_languages", is_flag=True, default=False,
+              help="Package every language of the bot.")
 @click.option("--model", type=click.Path(), default=None,
               help="Path to the model to be packaged. If no model is passed then the latest one is picked up.")
-def command(language: tuple, model: str):
+@click.option("--jobs", "-j", type=click.IntRange(min=0), default=1,
+              help="Number of parallel compression workers per package, 0 uses all the available cores. (default: 1)")
+@click.option("--report", is_flag=True, default=False,
+              help="Print the package composition and the time spent in each packaging phase.")
+@click.option("--report-json", type=click.Path(dir_okay=False, writable=True), default=None,
+              help="Write the package composition and timings as JSON into the given file.")
+@click.option("--top", type=click.IntRange(min=1), default=DEFAULT_TOP_ENTRIES,
+              help="Number of largest entries shown in the report. (default: {0})".format(DEFAULT_TOP_ENTRIES))
+def command(language: tuple, all_languages: bool, model: str, jobs: int, report: bool, report_json: str, top: int):
     """
 
     Package the required bot and make it ready for deployment.
+    Several languages are packaged concurrently, each one into its own build directory, a single one into build/.
 
     Args:
-        language (tuple): language code of the bot to create a package of.
+        language (tuple): language codes of the bots to create a package of.
+        all_languages (bool): optional flag to package every language of the bot.
+        model (str): optional argument with the path to the model to be packaged.
+        jobs (int): number of parallel compression workers per package, 0 uses all the available cores.
+        report (bool): optional flag to print the package composition and timings.
+        report_json (str): optional path of a file where the package composition and timings are written as JSON.
+        top (int): number of largest entries shown in the report.
     """
+    if all_languages:
+        language = tuple(get_bot_languages(abspath(".")))
+
     if len(language) == 0:
-        bot_dir = bot_ignore_dir = abspath(".")
+        package_paths = {None: create_package(abspath("."), abspath("."), model, jobs)}
     elif len(language) == 1:
         bot_dir = abspath(join(".", "languages", language[0]))
         bot_ignore_dir = dirname(dirname(bot_dir))
+        package_paths = {language[0]: create_package(bot_dir, bot_ignore_dir, model, jobs)}
     else:
-        print_message("Please select only one bot to package.")
-        exit(0)
+        if model:
+            raise click.UsageError("A model can only be selected when packaging a single language.")
+        package_paths = create_packages(abspath("."), list(language), jobs)
+
+    for language_code, package_path in package_paths.items():
+        if language_code and len(package_paths) > 1:
+            print_message("Package file ({0}): {1}".format(language_code, package_path))
+        else:
+            print_message("Package file: {0}".format(package_path))
+
+    if report:
+        for package_path in package_paths.values():
+            print_message("\n" + get_package_report(package_path).format(top))
+    if report_json:
+        reports = {language_code or "default": get_package_report(package_path).to_dict()
+                   for language_code, package_path in package_paths.items()}
+        with open(report_json, "w") as f:
+            json.dump(reports, f, indent=4)
+        print_message("Package report: {0}".format(report_json))
 
-    package_path = create_package(bot_dir, bot_ignore_dir, model)
-    print_message("Package file: {0}".format(package_path))
     print_success("The packaging is complete.\n")
 
 
@@ -1,41 +1,61 @@
-from os.path import abspath, join
-
 import click
-from roboai_cli.util.cli import print_success, print_message
-from roboai_cli.util.robo import get_current_bot_uuid, remove_runtime, validate_robo_session
+from roboai_cli.util.batch import DEFAULT_CONCURRENCY, print_batch_results, run_batch
+from roboai_cli.util.cli import print_success
+from roboai_cli.util.http import DEFAULT_RATE_LIMIT, set_rate_limit
+from roboai_cli.util.robo import (
+    get_target_bot_uuids,
+    remove_runtime,
+    validate_robo_session
+)
 
 
 @click.command(name="remove", help="Remove a deployed bot from the ROBO.AI platform.")
-@click.argument(
-    "language",
-    nargs=-1,
-)
-@click.option(
-    "--bot-uuid",
-    type=str,
-    default=None,
-    help="The bot UUID to use, \
-              it overrides the bot UUID configured in the manifest.",
-)
-def command(language: tuple, bot_uuid: str):
+@click.argument("language", nargs=-1,)
+@click.option("--all", "all_languages", is_flag=True, default=False,
+              help="Remove the bots of every language.")
+@click.option("--bot-uuid", type=str, default=None,
+              help="The bot UUID to use, it overrides the bot UUID configured in the manifest.")
+@click.option("--bot-uuids-file", type=click.Path(exists=True, dir_okay=False), default=None,
+              help="Path to a file listing the UUIDs of the bots to remove, one per line.")
+@click.option("--timeout", type=click.FloatRange(min=0), default=None,
+              help="Maximum time to wait for the bot runtime, in seconds. (default: no timeout)")
+@click.option("--concurrency", type=click.IntRange(min=1), default=DEFAULT_CONCURRENCY,
+              help="Number of bots removed at once. (default: {0})".format(DEFAULT_CONCURRENCY))
+@click.option("--rate-limit", type=click.FloatRange(min=0), default=DEFAULT_RATE_LIMIT,
+              help="Maximum number of requests per second, 0 for no limit. (default: {0})".format(DEFAULT_RATE_LIMIT))
+def command(language: tuple, all_languages: bool, bot_uuid: str, bot_uuids_file: str, timeout: float,
+            concurrency: int, rate_limit: float):
     """
     Remove a deployed bot from the ROBO.AI platform
 
     Args:
-        language (tuple): language code of the bot to be removed
-        bot_uuid (str): optional argument stating the ID of the bot to be removed
+        language (tuple): language codes of the bots to be removed
+        all_languages (bool): optional flag to remove the bots of every language
+        bot_uuid (str): optional argument stating the bot ID to be removed
+        bot_uuids_file (str): optional path to a file listing the UUIDs of the bots to be removed
+        timeout (float): optional maximum time to wait for the bot runtime to be removed, in seconds
+        concurrency (int): number of bots removed at once
+        rate_limit (float): maximum number of requests per second, 0 for no limit
     """
     validate_robo_session()
-    if len(language) == 0:
-        bot_dir = abspath(".")
-    elif len(language) == 1:
-        bot_dir = abspath(join(".", "languages", language[0]))
-    else:
-        print_message("Please select only one bot runtime to be removed.\n")
-        exit(0)
-    if not bot_uuid:
-        bot_uuid = get_current_bot_uuid(bot_dir)
+    set_rate_limit(rate_limit)
+
+    bot_uuids = get_target_bot_uuids(language, all_languages, bot_uuid, bot_uuids_file)
+    if len(bot_uuids) > 1:
+        tasks = {name: get_remove_task(uuid, timeout) for name, uuid in bot_uuids.items()}
+        results = run_batch(tasks, concurrency, "Removing {0} bot runtimes".format(len(tasks)))
+        print_batch_results(results, "Bot", "removals")
+        print_success("The bot runtimes were successfully removed.\n")
+        return
 
     # validate_bot(bot_uuid)
-    remove_runtime(bot_uuid)
+    remove_runtime(next(iter(bot_uuids.values())), timeout)
     print_success("The bot runtime was successfully removed.\n")
+
+
+def get_remove_task(bot_uuid: str, timeout: float):
+    def remove(reporter) -> str:
+        if not remove_runtime(bot_uuid, timeout, reporter):
+            return "the bot runtime does not exist"
+        return "removed"
+    return remove
@@ -1,5 +1,4 @@
 import os
-from distutils.dir_util import copy_tree
 from os.path import join, abspath
 
 import click
@@ -239,6 +238,8 @@ def create_initial_project(path: str, languages: tuple) -> None:
         path (str): path of the project given by the user
         languages (tuple): requested languages to be included in the initial project
     """
+    from distutils.dir_util import copy_tree
+
     copy_tree(initial_project_path(), path)
     add_languages_structure(path, languages)
 
@@ -251,6 +252,8 @@ def add_languages_structure(path: str, languages: tuple) -> None:
         path (str): path of the project given by the user
         languages (tuple): requested languages to be included in the initial project
     """
+    from distutils.dir_util import copy_tree
+
     for language in languages:
         os.makedirs(join(path, "languages", language), exist_ok=True)
         copy_tree(language_project_path(), join(path, "languages", language))
@@ -1,7 +1,13 @@
 import click
-import os
+import subprocess
+import uuid
 from os.path import join, abspath
-import glob
+
+from roboai_cli.util.cli import print_info, print_message
+from roboai_cli.util.model_registry import get_latest_model_path
+from roboai_cli.util.rasa_daemon import is_daemon_running, send_message
+
+STOP_MESSAGE = "/stop"
 
 
 @click.command(name="shell", help="Start a shell to interact with the required bot.")
@@ -13,6 +19,7 @@ import glob
 def command(language: str, debug: bool, response_timeout: int):
     """
     Wrapper of rasa shell for a multi-language bot.
+    When the Rasa daemon is running, and debugging is off, the messages are handled by the daemon.
 
     Args:
         language (str): language code of the bot for rasa shell to be run
@@ -24,13 +31,49 @@ def command(language: str, debug: bool, response_timeout: int):
 
 def start_shell(language: str, debug: bool, response_timeout: int):
 
-    list_of_models = glob.glob(join(abspath("."), "languages", language, "models", "*.tar.gz"))
-    latest_file = max(list_of_models, key=os.path.getctime)
+    latest_file = get_latest_model_path(join(abspath("."), "languages", language))
 
     endpoints_path = join(abspath("."), "endpoints.yml")
 
-    os.system(f"rasa shell --model {latest_file} --response-timeout {response_timeout} \
-              {'--debug' if debug else ''} --endpoints {endpoints_path}")
+    if not debug and is_daemon_running():
+        start_daemon_shell(latest_file, endpoints_path, response_timeout)
+        return
+
+    # rasa shell reads the input of the user, it never runs in the daemon
+    subprocess.call(["rasa", "shell", "--model", latest_file, "--response-timeout", str(response_timeout)]
+                    + (["--debug"] if debug else []) + ["--endpoints", endpoints_path])
+
+
+def start_daemon_shell(model_path: str, endpoints_path: str, response_timeout: int):
+    """
+    Chat with a model loaded in the Rasa daemon, which keeps it loaded for the next shells.
+    """
+    sender_id = uuid.uuid4().hex
+    print_info("Bot loaded by the Rasa daemon. Type a message and press enter (use '{0}' to exit):".format(
+        STOP_MESSAGE))
+    while True:
+        try:
+            text = input("Your input ->  ").strip()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if text == STOP_MESSAGE:
+            break
+        if not text:
+            continue
+        responses = send_message(model_path, endpoints_path, sender_id, text, response_timeout)
+        if responses is None:
+            raise click.ClickException("The Rasa daemon is no longer running.")
+        for response in responses:
+            print_bot_response(response)
+
+
+def print_bot_response(response: dict):
+    if response.get("text"):
+        print_message(response["text"])
+    if response.get("image"):
+        print_message("Image: {0}".format(response["image"]))
+    for index, button in enumerate(response.get("buttons") or [], 1):
+        print_message("{0}: {1} ({2})".format(index, button.get("title"), button.get("payload")))
 
 
 if __name__ == "__main__":
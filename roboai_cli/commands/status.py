@@ -1,41 +1,53 @@
 import click
-from os.path import abspath, join
 from datetime import datetime
 
+from roboai_cli.util.batch import DEFAULT_CONCURRENCY, print_batch_results, run_batch
 from roboai_cli.util.cli import print_message
+from roboai_cli.util.http import DEFAULT_RATE_LIMIT, set_rate_limit
 from roboai_cli.util.robo import (
     does_the_runtime_exist,
     validate_robo_session,
-    get_current_bot_uuid,
+    get_target_bot_uuids,
     get_bot_runtime
 )
 
 
 @click.command(name="status", help="Display the bot status.")
 @click.argument("language", nargs=-1,)
+@click.option("--all", "all_languages", is_flag=True, default=False,
+              help="Display the status of the bots of every language.")
 @click.option("--bot-uuid", type=str, default=None,
               help="The bot UUID to use, it overrides the bot UUID configured in the manifest.")
-def command(language: tuple, bot_uuid: str):
+@click.option("--bot-uuids-file", type=click.Path(exists=True, dir_okay=False), default=None,
+              help="Path to a file listing the UUIDs of the bots, one per line.")
+@click.option("--concurrency", type=click.IntRange(min=1), default=DEFAULT_CONCURRENCY,
+              help="Number of bot statuses fetched at once. (default: {0})".format(DEFAULT_CONCURRENCY))
+@click.option("--rate-limit", type=click.FloatRange(min=0), default=DEFAULT_RATE_LIMIT,
+              help="Maximum number of requests per second, 0 for no limit. (default: {0})".format(DEFAULT_RATE_LIMIT))
+def command(language: tuple, all_languages: bool, bot_uuid: str, bot_uuids_file: str, concurrency: int,
+            rate_limit: float):
     """
     Display the bot status
 
     Args:
-        language (tuple): language code of the bot for the status to be shown
+        language (tuple): language codes of the bots for the status to be shown
+        all_languages (bool): optional flag to show the status of the bots of every language
         bot_uuid (str): optional argument stating the bot ID for the status to be shown
+        bot_uuids_file (str): optional path to a file listing the UUIDs of the bots for the status to be shown
+        concurrency (int): number of bot statuses fetched at once
+        rate_limit (float): maximum number of requests per second, 0 for no limit
     """
     validate_robo_session()
+    set_rate_limit(rate_limit)
 
-    if len(language) == 0:
-        bot_dir = abspath(".")
-    elif len(language) == 1:
-        bot_dir = abspath(join(".", "languages", language[0]))
-    else:
-        print_message("Please select only one bot to check the status.\n")
-        exit(0)
-
-    if not bot_uuid:
-        bot_uuid = get_current_bot_uuid(bot_dir)
+    bot_uuids = get_target_bot_uuids(language, all_languages, bot_uuid, bot_uuids_file)
+    if len(bot_uuids) > 1:
+        tasks = {name: get_status_task(uuid) for name, uuid in bot_uuids.items()}
+        results = run_batch(tasks, concurrency, "Fetching {0} bot statuses".format(len(tasks)))
+        print_batch_results(results, "Bot", "status requests")
+        return
 
+    bot_uuid = next(iter(bot_uuids.values()))
     print_message("Bot UUID: {0}".format(bot_uuid))
 
     if does_the_runtime_exist(bot_uuid):
@@ -48,5 +60,14 @@ def command(language: tuple, bot_uuid: str):
         print_message("Bot runtime status: Not Created\n")
 
 
+def get_status_task(bot_uuid: str):
+    def status(reporter) -> str:
+        reporter("fetching the status")
+        if not does_the_runtime_exist(bot_uuid):
+            return "Not Created"
+        return get_bot_runtime(bot_uuid).status.value
+    return status
+
+
 if __name__ == "__main__":
     command()
@@ -1,35 +1,60 @@
 import click
-from os.path import abspath, join
-
-from roboai_cli.util.cli import print_success, print_message
-from roboai_cli.util.robo import validate_robo_session, get_current_bot_uuid, stop_runtime
+from roboai_cli.util.batch import DEFAULT_CONCURRENCY, print_batch_results, run_batch
+from roboai_cli.util.cli import print_success
+from roboai_cli.util.http import DEFAULT_RATE_LIMIT, set_rate_limit
+from roboai_cli.util.robo import (
+    get_target_bot_uuids,
+    stop_runtime,
+    validate_robo_session
+)
 
 
 @click.command(name="stop", help="Stop a bot running in the ROBO.AI platform.")
 @click.argument("language", nargs=-1,)
+@click.option("--all", "all_languages", is_flag=True, default=False,
+              help="Stop the bots of every language.")
 @click.option("--bot-uuid", type=str, default=None,
               help="The bot UUID to use, it overrides the bot UUID configured in the manifest.")
-def command(language: tuple, bot_uuid: str):
+@click.option("--bot-uuids-file", type=click.Path(exists=True, dir_okay=False), default=None,
+              help="Path to a file listing the UUIDs of the bots to stop, one per line.")
+@click.option("--timeout", type=click.FloatRange(min=0), default=None,
+              help="Maximum time to wait for the bot runtime, in seconds. (default: no timeout)")
+@click.option("--concurrency", type=click.IntRange(min=1), default=DEFAULT_CONCURRENCY,
+              help="Number of bots stopped at once. (default: {0})".format(DEFAULT_CONCURRENCY))
+@click.option("--rate-limit", type=click.FloatRange(min=0), default=DEFAULT_RATE_LIMIT,
+              help="Maximum number of requests per second, 0 for no limit. (default: {0})".format(DEFAULT_RATE_LIMIT))
+def command(language: tuple, all_languages: bool, bot_uuid: str, bot_uuids_file: str, timeout: float,
+            concurrency: int, rate_limit: float):
     """
     Stop a bot running in the ROBO.AI platform.
 
     Args:
-        language: language code of the bot to be stopped
-        bot_uuid (str): optional argument stating the bot ID to be stopped.
+        language (tuple): language codes of the bots to be stopped
+        all_languages (bool): optional flag to stop the bots of every language
+        bot_uuid (str): optional argument stating the bot ID to be stopped
+        bot_uuids_file (str): optional path to a file listing the UUIDs of the bots to be stopped
+        timeout (float): optional maximum time to wait for the bot runtime to stop, in seconds
+        concurrency (int): number of bots stopped at once
+        rate_limit (float): maximum number of requests per second, 0 for no limit
     """
     validate_robo_session()
+    set_rate_limit(rate_limit)
 
-    if len(language) == 0:
-        bot_dir = abspath(".")
-    elif len(language) == 1:
-        bot_dir = abspath(join(".", "languages", language[0]))
-    else:
-        print_message("Please select only one bot runtime to be stopped.\n")
-        exit(0)
-
-    if not bot_uuid:
-        bot_uuid = get_current_bot_uuid(bot_dir)
+    bot_uuids = get_target_bot_uuids(language, all_languages, bot_uuid, bot_uuids_file)
+    if len(bot_uuids) > 1:
+        tasks = {name: get_stop_task(uuid, timeout) for name, uuid in bot_uuids.items()}
+        results = run_batch(tasks, concurrency, "Stopping {0} bot runtimes".format(len(tasks)))
+        print_batch_results(results, "Bot", "stops")
+        print_success("The bot runtimes were successfully stopped.\n")
+        return
 
     # validate_bot(bot_uuid)
-    stop_runtime(bot_uuid)
+    stop_runtime(next(iter(bot_uuids.values())), timeout)
     print_success("The bot runtime was successfully stopped.\n")
+
+
+def get_stop_task(bot_uuid: str, timeout: float):
+    def stop(reporter) -> str:
+        stop_runtime(bot_uuid, timeout, reporter)
+        return "stopped"
+    return stop
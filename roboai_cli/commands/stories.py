@@ -1,11 +1,10 @@
 import click
-import os
-from os.path import abspath, join, exists, isfile, basename
-from os import listdir
+from os.path import abspath, join, basename
 
 from roboai_cli.util.cli import print_info, print_error
 from roboai_cli.util.input_output import load_md, load_yaml
 from roboai_cli.util.helpers import clean_intents
+from roboai_cli.util.workspace import get_workspace
 
 
 @click.command(name="stories", help="Generate stories for a Rasa bot.")
@@ -22,18 +21,12 @@ def command(languages: tuple, covered_intents: bool):
                            be tested.
         covered_intents (bool): flag to check which intents are being covered in the stories file.
     """
-    if len(languages) == 0:
-        if exists(join(abspath("."), "languages")):
-            # it means it's a multi language bot
-            multi_language = True
-            bot_dir = get_all_languages(path=abspath("."), languages=languages)
-        else:
-            # it means it's a single language bot
-            multi_language = False
-            bot_dir = [abspath(".")]
-    else:
-        multi_language = True
-        bot_dir = get_all_languages(path=abspath("."), languages=languages)
+    workspace = get_workspace(abspath("."))
+    # a bot without a languages directory is a single language bot
+    multi_language = len(languages) > 0 or workspace.is_multi_language
+    if len(languages) == 0 and multi_language:
+        _inform_language()
+    bot_dir = workspace.get_bot_dirs(languages)
 
     if covered_intents:
         check_covered_intents(bot_dir, multi_language)
@@ -45,19 +38,14 @@ def generate_stories(languages_path: list, multi_language_bot: bool) -> None:
     for language in languages_path:
         lang = basename(language) if basename(language) != "bot" else "the"
 
+        workspace = get_workspace(abspath("."))
         if multi_language_bot:
-            stories_dir_path = join(abspath("."), "languages")
+            stories_files = workspace.get_shared_stories()
         else:
-            stories_dir_path = join(language, "data")
+            stories_files = workspace.get_data_files(language).stories
 
-        stories_exist = False
         # check if there's already a stories file - ask if it should be overriden?
-        for filename in listdir(join(stories_dir_path)):
-            if isfile(join(stories_dir_path, filename)):
-                if "stories" in filename:
-                    stories_exist = True
-                    break
-        if stories_exist:
+        if stories_files:
             overwrite = click.confirm(
                 "Stories file already exists. This action will overwrite it. Continue?"
             )
@@ -79,32 +67,18 @@ def check_covered_intents(language_path: list, multi_language_bot: bool):
             exit(0)
         else:
             intents = clean_intents(intents)
-            check_specific_stories = False
+            workspace = get_workspace(abspath("."))
+            # the stories shared by every language are checked along with the stories of the language
+            stories_files = workspace.get_data_files(language).stories
             if multi_language_bot:
-                stories_dir_path = join(abspath("."), "languages")
-                check_specific_stories = True
-            else:
-                stories_dir_path = join(language, "data")
-            for filename in listdir(stories_dir_path):
-                if isfile(join(stories_dir_path, filename)):
-                    if "stories" in filename:
-                        lines = load_md(join(stories_dir_path, filename))
-                        for line in lines:
-                            for intent in intents:
-                                if intent in line:
-                                    intents.remove(intent)
-                                    break
-            if check_specific_stories:
-                lang = basename(language)
-                for filename in listdir(join(stories_dir_path, lang, "data")):
-                    if isfile(join(stories_dir_path, lang, "data", filename)):
-                        if "stories" in filename:
-                            lines = load_md(join(stories_dir_path, lang, "data", filename))
-                            for line in lines:
-                                for intent in intents:
-                                    if intent in line:
-                                        intents.remove(intent)
-                                        break
+                stories_files = workspace.get_shared_stories() + stories_files
+            for stories_file in stories_files:
+                lines = load_md(stories_file)
+                for line in lines:
+                    for intent in intents:
+                        if intent in line:
+                            intents.remove(intent)
+                            break
             if intents:
                 print("The following intents are not covered in your stories:")
                 print(*intents, sep="\n")
@@ -131,17 +105,6 @@ def generate_stories_md(path_to_language: str, multi_language_bot: bool):
                 out_f.write("\n")
 
 
-def get_all_languages(path: str, languages: tuple) -> list:
-    if len(languages) == 0:
-        _inform_language()
-        languages_paths = [join(path, "languages", folder) for folder in os.listdir(join(path, "languages"))
-                           if os.path.isdir(os.path.join(path, "languages", folder))]
-    else:
-        languages_paths = [join(path, "languages", folder) for folder in os.listdir(join(path, "languages"))
-                           if os.path.isdir(os.path.join(path, "languages", folder)) and folder in languages]
-    return languages_paths
-
-
 def _inform_language() -> None:
     """
     Auxiliary method to inform the user no languages were passed when executing the test command.
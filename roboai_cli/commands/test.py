@@ -1,18 +1,23 @@
 import json
-import os
 import random
 from collections import defaultdict
 from os import listdir, mkdir, makedirs
-from os.path import abspath, basename, dirname, exists, isfile, join
+from os.path import abspath, basename, exists, isfile, join
 from re import search, sub
 from datetime import datetime
+from typing import TYPE_CHECKING
 
 import click
-import pandas as pd
 
 from roboai_cli.util.cli import print_error, print_info
 from roboai_cli.util.input_output import load_md, load_yaml
 from roboai_cli.util.helpers import clean_intents
+from roboai_cli.util.rasa_daemon import run_rasa
+from roboai_cli.util.workspace import get_workspace
+
+if TYPE_CHECKING:
+    # pandas takes long to import, it is only imported when the results are written
+    import pandas as pd
 
 
 @click.command(name="test", help="Test Rasa models for the required bots.")
@@ -30,18 +35,12 @@ def command(languages: tuple, cross_validation: bool, folds: int):
         cross_validation (bool): Evaluates model in cross-validation mode.
         folds (int): Number of folds to be applied in cross-validation mode.
     """
-    if len(languages) == 0:
-        if exists(join(abspath("."), "languages")):
-            # multi-language bot
-            bot_dir = get_all_languages(path=abspath("."), languages=languages)
-            multi_language_bot = True
-        else:
-            # single-language bot
-            bot_dir = [abspath(".")]
-            multi_language_bot = False
-    else:
-        multi_language_bot = True
-        bot_dir = get_all_languages(path=abspath("."), languages=languages)
+    workspace = get_workspace(abspath("."))
+    # a bot without a languages directory is a single language bot
+    multi_language_bot = len(languages) > 0 or workspace.is_multi_language
+    if len(languages) == 0 and multi_language_bot:
+        _inform_language()
+    bot_dir = workspace.get_bot_dirs(languages)
     test(bot_dir, multi_language_bot, cross_validation, folds)
 
 
@@ -91,16 +90,12 @@ def test(languages_path: list, multi_language_bot: bool, cross_validation: bool,
 
 def test_bot(language: str, cross_validation: bool, folds: int, timestamp: str):
     if cross_validation:
-        os.system(
-            f"rasa test --model {join(language, 'models')} --nlu {join(language, 'data')} \
-                --cross-validation -f {folds} --config {join(language, 'config.yml')} \
-                --stories {join(language, 'tests')} --out {join(language, 'results', timestamp)}"
-        )
+        run_rasa(["test", "--model", join(language, "models"), "--nlu", join(language, "data"),
+                  "--cross-validation", "-f", str(folds), "--config", join(language, "config.yml"),
+                  "--stories", join(language, "tests"), "--out", join(language, "results", timestamp)])
     else:
-        os.system(
-            f"rasa test --model {join(language, 'models')} --nlu {join(language, 'data')} \
-                --stories {join(language, 'tests')} --out {join(language, 'results', timestamp)}"
-        )
+        run_rasa(["test", "--model", join(language, "models"), "--nlu", join(language, "data"),
+                  "--stories", join(language, "tests"), "--out", join(language, "results", timestamp)])
 
 
 def check_covered_intents(language_path: str) -> bool:
@@ -181,24 +176,22 @@ def generate_conversation_md_from_stories(
             If it's a single-language bot this will be the bot root's folder.
         multi_language_bot (bool): flag indicating whether the bot is single or multi language
     """
+    workspace = get_workspace(abspath("."))
+    data_files = workspace.get_data_files(path_to_language)
     if multi_language_bot:
-        stories_path = dirname(join(path_to_language))
+        stories_files = workspace.get_shared_stories()
     else:
-        stories_path = join(path_to_language, "data")
+        stories_files = data_files.stories
 
     all_stories = []
-    for filename in listdir(stories_path):
-        if isfile(join(stories_path, filename)):
-            if "stories" in filename:
-                stories = load_md(join(stories_path, filename))
-                all_stories.append(stories)
+    for stories_file in stories_files:
+        stories = load_md(stories_file)
+        all_stories.append(stories)
     all_stories = [item for sublist in all_stories for item in sublist]
     all_nlu = []
-    for filename in listdir(join(path_to_language, "data")):
-        if isfile(join(path_to_language, "data", filename)):
-            if "stories" not in filename:
-                nlu = load_md(join(path_to_language, "data", filename))
-                all_nlu.append(nlu)
+    for nlu_file in data_files.nlu:
+        nlu = load_md(nlu_file)
+        all_nlu.append(nlu)
     all_nlu = [item for sublist in all_nlu for item in sublist]
     output_path = join(path_to_language, "tests", "conversation_tests.md")
     if not exists(join(path_to_language, "tests")):
@@ -249,11 +242,9 @@ def generate_conversation_md_from_domain(path_to_language: str):
     domain = load_yaml(join(path_to_language, "domain.yml"))
     intents_list = domain.get("intents", None)
     all_nlu = []
-    for filename in listdir(join(path_to_language, "data")):
-        if isfile(join(path_to_language, "data", filename)):
-            if "stories" not in filename:
-                nlu = load_md(join(path_to_language, "data", filename))
-                all_nlu.append(nlu)
+    for nlu_file in get_workspace(abspath(".")).get_data_files(path_to_language).nlu:
+        nlu = load_md(nlu_file)
+        all_nlu.append(nlu)
 
     all_nlu = [item for sublist in all_nlu for item in sublist]
     if not intents_list:
@@ -284,6 +275,8 @@ def format_results(language_path: str, timestamp: str):
         language_path (str): path to language folder.
         timestamp (str): timestamp of when the test is run.
     """
+    import pandas as pd
+
     try:
         confusion_list = confusion_table_df(language_path, timestamp)
         misclassified_intents = misclassified_intents_df(language_path, timestamp)
@@ -328,7 +321,9 @@ def format_results(language_path: str, timestamp: str):
         print_error("One or more files necessary for the intent_details.xlsx file was not output by Rasa and thus this file cannot be generated.\n")
 
 
-def misclassified_intents_df(language_path: str, timestamp: str) -> pd.DataFrame:
+def misclassified_intents_df(language_path: str, timestamp: str) -> "pd.DataFrame":
+    import pandas as pd
+
     with open(join(language_path, "results", timestamp, "intent_errors.json"), "r") as f:
         intent_errors = json.load(f)
 
@@ -351,7 +346,9 @@ def misclassified_intents_df(language_path: str, timestamp: str) -> pd.DataFrame
     )
 
 
-def stats_table(language_path: str, timestamp: str) -> pd.DataFrame:
+def stats_table(language_path: str, timestamp: str) -> "pd.DataFrame":
+    import pandas as pd
+
     with open(join(language_path, "results", timestamp, "intent_report.json"), "r") as f:
         intent_report = json.load(f)
 
@@ -366,7 +363,9 @@ def stats_table(language_path: str, timestamp: str) -> pd.DataFrame:
     return stats_table.sort_values("precision", ascending=True)
 
 
-def confusion_table_df(language_path: str, timestamp: str) -> pd.DataFrame:
+def confusion_table_df(language_path: str, timestamp: str) -> "pd.DataFrame":
+    import pandas as pd
+
     with open(join(language_path, "results", timestamp, "intent_report.json"), "r") as f:
         intent_report = json.load(f)
 
@@ -381,23 +380,6 @@ def confusion_table_df(language_path: str, timestamp: str) -> pd.DataFrame:
     return confusion_table.sort_values("count", ascending=False)
 
 
-def get_all_languages(path: str, languages: tuple) -> list:
-    if len(languages) == 0:
-        _inform_language()
-        languages_paths = [
-            join(path, "languages", folder)
-            for folder in os.listdir(join(path, "languages"))
-            if os.path.isdir(os.path.join(path, "languages", folder))
-        ]
-    else:
-        languages_paths = [
-            join(path, "languages", folder)
-            for folder in os.listdir(join(path, "languages"))
-            if os.path.isdir(os.path.join(path, "languages", folder)) and folder in languages
-        ]
-    return languages_paths
-
-
 def _inform_language() -> None:
     """
     Auxiliary method to inform the user no languages were passed when executing the test command.
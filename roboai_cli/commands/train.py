@@ -4,6 +4,8 @@ from os.path import join
 from datetime import datetime
 
 from roboai_cli.util.cli import print_info
+from roboai_cli.util.rasa_daemon import run_rasa
+from roboai_cli.util.workspace import get_workspace
 
 
 @click.command(name="train", help="Train Rasa models for the required bots.")
@@ -21,7 +23,10 @@ from roboai_cli.util.cli import print_info
               help="Force a model training even if the data has not changed. (default: False)")
 @click.option("--debug", "-vv", "debug", is_flag=True, default=False,
               help="Print lots of debugging statements. Sets logging level")
-def command(languages: tuple, path: str, dev_config: str, nlu: bool, core: bool, augmentation: int, force: bool, debug: bool):
+@click.option("--keep", type=click.IntRange(min=1), default=None,
+              help="Number of models to keep per language after training, the oldest ones are removed.")
+def command(languages: tuple, path: str, dev_config: str, nlu: bool, core: bool, augmentation: int, force: bool,
+            debug: bool, keep: int):
     """
     Wrapper of rasa train for multi-language bots.
 
@@ -32,9 +37,13 @@ def command(languages: tuple, path: str, dev_config: str, nlu: bool, core: bool,
         nlu (bool): flag indicating whether only NLU should be trained
         core (bool): flag indicating whether only core should be trained
         augmentation (int): augmentation option
+        keep (int): optional number of models to keep per language after training
     """
 
-    languages_paths = get_all_languages(path=path, languages=languages)
+    workspace = get_workspace(path)
+    if len(languages) == 0:
+        _inform_language()
+    languages_paths = workspace.get_language_dirs(languages)
 
     if nlu:
         train_nlu(path, languages_paths, dev_config, force, debug)
@@ -43,6 +52,12 @@ def command(languages: tuple, path: str, dev_config: str, nlu: bool, core: bool,
     else:
         train(path, languages_paths, augmentation, dev_config, force, debug)
 
+    if keep:
+        for language_path in languages_paths:
+            removed = workspace.get_model_registry(language_path).prune(keep=keep)
+            if removed:
+                print_info("Removed {0} old models of {1}.".format(len(removed), os.path.basename(language_path)))
+
     # print_success("All training tasks completed")
 
 
@@ -53,33 +68,24 @@ def _inform_language() -> None:
     print_info("No language was provided. Will train all available languages inside provided bot folder.")
 
 
-def get_all_languages(path: str, languages: tuple):
-    if len(languages) == 0:
-        _inform_language()
-        languages_paths = [join(path, "languages", folder) for folder in os.listdir(join(path, "languages"))
-                           if os.path.isdir(os.path.join(path, "languages", folder))]
-    else:
-        languages_paths = [join(path, "languages", folder) for folder in os.listdir(join(path, "languages"))
-                           if os.path.isdir(os.path.join(path, "languages", folder)) and folder in languages]
-    return languages_paths
-
-
 def train(path: str, languages_paths: list, augmentation: int, dev_config: str, force: bool, debug: bool):
     timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
     stories_path = join(path, "languages", "stories.md")
     for language_path in languages_paths:
         lang = os.path.basename(language_path)  # os.path.split(os.path.dirname(language_path))
-        os.system(f"rasa train --config {join(language_path, dev_config)} --domain {join(language_path, 'domain.yml')} \
-        --data {join(language_path, 'data')} {stories_path} --augmentation {augmentation} {'--force' if force else ''} \
-        {'--debug' if debug else ''} --out {join(language_path, 'models')} --fixed-model-name model-{lang}-{timestamp}")
+        run_rasa(["train", "--config", join(language_path, dev_config), "--domain", join(language_path, "domain.yml"),
+                  "--data", join(language_path, "data"), stories_path, "--augmentation", str(augmentation)]
+                 + (["--force"] if force else []) + (["--debug"] if debug else [])
+                 + ["--out", join(language_path, "models"), "--fixed-model-name", f"model-{lang}-{timestamp}"])
 
 
 def train_nlu(path: str, languages_paths: list, dev_config: str, force: bool, debug: bool):
     timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
     for language_path in languages_paths:
         lang = os.path.basename(language_path)  # os.path.split(os.path.dirname(language_path))
-        os.system(f"rasa train nlu --nlu {join(language_path, 'data')} --config {join(language_path, dev_config)} \
-                  {'--debug' if debug else ''} --out {join(language_path, 'models')} --fixed-model-name nlu-model-{lang}-{timestamp}")
+        run_rasa(["train", "nlu", "--nlu", join(language_path, "data"), "--config", join(language_path, dev_config)]
+                 + (["--debug"] if debug else [])
+                 + ["--out", join(language_path, "models"), "--fixed-model-name", f"nlu-model-{lang}-{timestamp}"])
 
 
 def train_core(path: str, languages_paths: list, augmentation: int, dev_config: str, force: bool, debug: bool):
@@ -87,9 +93,10 @@ def train_core(path: str, languages_paths: list, augmentation: int, dev_config:
     stories_path = join(path, 'languages', 'stories.md')
     for language_path in languages_paths:
         lang = os.path.basename(language_path)  # os.path.split(os.path.dirname(language_path))
-        os.system(f"rasa train core --domain {join(language_path, 'domain.yml')} --stories {stories_path} \
-                  --augmentation {augmentation} --config {join(language_path, dev_config)} {'--force' if force else ''} \
-                  {'--debug' if debug else ''} --out {join(language_path, 'models')} --fixed-model-name core-model-{lang}-{timestamp}")
+        run_rasa(["train", "core", "--domain", join(language_path, "domain.yml"), "--stories", stories_path,
+                  "--augmentation", str(augmentation), "--config", join(language_path, dev_config)]
+                 + (["--force"] if force else []) + (["--debug"] if debug else [])
+                 + ["--out", join(language_path, "models"), "--fixed-model-name", f"core-model-{lang}-{timestamp}"])
 
 
 if __name__ == "__main__":
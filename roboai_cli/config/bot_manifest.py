@@ -1,11 +1,18 @@
+import copy
 import os
 import json
 from typing import List
 
+from roboai_cli.config.store.utils import writeConfigs
+
 MANIFEST_FILE = "robo-manifest.json"
 BOT_ID_SETTING = "bot_id"
 BOT_RUNTIME_BASE_VERSION_SETTING = "base_version"
 EXCLUSIONS_SETTING = "exclusions"
+COMPRESSION_LEVEL_SETTING = "compression_level"
+PACKAGE_DIGEST_SETTING = "package_digest"
+# settings describing the deployment state, they are not packaged along with the manifest
+DEPLOYMENT_STATE_SETTINGS = [PACKAGE_DIGEST_SETTING]
 DEFAULT_RUNTIME_BASE_VERSION = "rasa-1.10.0"
 
 DEFAULT_MANIFEST = {
@@ -25,6 +32,9 @@ DEFAULT_MANIFEST = {
     # ]
 }
 
+# parsed manifests by path, along with the modification time and size of the file they were read from
+_settings_cache = {}
+
 
 class BotManifest:
     __path: str
@@ -50,6 +60,27 @@ class BotManifest:
     def set_base_version(self, version: str):
         self.__update_setting_value(BOT_RUNTIME_BASE_VERSION_SETTING, version)
 
+    def get_compression_level(self) -> int:
+        return self.__get_setting_value(COMPRESSION_LEVEL_SETTING)
+
+    def set_compression_level(self, level: int):
+        self.__update_setting_value(COMPRESSION_LEVEL_SETTING, level)
+
+    def get_package_digest(self) -> str:
+        return self.__get_setting_value(PACKAGE_DIGEST_SETTING)
+
+    def set_package_digest(self, digest: str):
+        self.__update_setting_value(PACKAGE_DIGEST_SETTING, digest)
+
+    def get_packaged_content(self) -> bytes:
+        """
+        Get the manifest content as it is packaged, without the deployment state settings,
+        so that deploying a package does not change the next one.
+        """
+        settings = {key: value for key, value in self.__load_settings().items()
+                    if key not in DEPLOYMENT_STATE_SETTINGS}
+        return json.dumps(settings, indent=4, sort_keys=True).encode("utf-8")
+
     def __get_setting_value(self, key):
         settings = self.__load_settings()
         if key in settings:
@@ -64,15 +95,27 @@ class BotManifest:
     def __load_settings(self):
         manifest_path = self.__get_manifest_path()
         if not os.path.exists(manifest_path):
-            return DEFAULT_MANIFEST
+            return copy.deepcopy(DEFAULT_MANIFEST)
 
-        with open(manifest_path) as file:
-            return json.load(file)
+        # the manifest is only parsed again when the file changed
+        file_key = self.__get_file_key(manifest_path)
+        cached = _settings_cache.get(manifest_path)
+        if cached is None or cached[0] != file_key:
+            with open(manifest_path) as file:
+                cached = (file_key, json.load(file))
+            _settings_cache[manifest_path] = cached
+        return copy.deepcopy(cached[1])
 
     def __save_settings(self, settings):
         manifest_path = self.__get_manifest_path()
-        with open(manifest_path, "w") as file:
-            json.dump(settings, file, indent=4, sort_keys=True)
+        # written to a temporary file renamed over the manifest, which is then never seen half written
+        writeConfigs(manifest_path, settings, indent=4, sort_keys=True)
+        _settings_cache[manifest_path] = (self.__get_file_key(manifest_path), copy.deepcopy(settings))
+
+    @staticmethod
+    def __get_file_key(path: str):
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
 
     def __get_manifest_path(self):
         return self.__path + os.path.sep + MANIFEST_FILE
@@ -2,6 +2,7 @@ CURRENT_ENVIRONMENT = "CURRENT_ENV"
 ENVIRONMENTS = "ENVIRONMENTS"
 API_KEY_SETTING = "API_KEY"
 API_AUTH_TOKEN_SETTING = "API_AUTH_TOKEN"
+API_AUTH_TOKEN_EXPIRY_SETTING = "API_AUTH_TOKEN_EXPIRY"
 API_ENDPOINT_SETTING = "API_ENDPOINT"
 PACKAGE_NAME = "robo-ai"
 
@@ -1,4 +1,5 @@
-from .environment_constants import API_KEY_SETTING, API_ENDPOINT_SETTING, API_AUTH_TOKEN_SETTING
+from .environment_constants import API_KEY_SETTING, API_ENDPOINT_SETTING, API_AUTH_TOKEN_SETTING, \
+    API_AUTH_TOKEN_EXPIRY_SETTING
 
 
 class EnvironmentAuth:
@@ -22,15 +23,17 @@ class Environment:
     # __environment_name: str = None
     # __api_key: str = None
     # __api_auth_token: str = None
+    # __api_auth_token_expiry: int = None
     # __base_url: str = None
     # __api_auth_setting: EnvironmentAuth = None
 
     def __init__(self, environment_name: str, base_url: str,
                  api_key: str = None, api_auth_token: str = None,
-                 api_auth_setting: EnvironmentAuth = None):
+                 api_auth_setting: EnvironmentAuth = None, api_auth_token_expiry: int = None):
         self.__environment_name = environment_name
         self.__api_key = api_key
         self.__api_auth_token = api_auth_token
+        self.__api_auth_token_expiry = api_auth_token_expiry
         self.__base_url = base_url
         self.__api_auth_setting = api_auth_setting
 
@@ -54,6 +57,17 @@ class Environment:
     def api_auth_token(self, new_api_auth_token) -> None:
         self.__api_auth_token = new_api_auth_token
 
+    @property
+    def api_auth_token_expiry(self) -> int:
+        """
+        Time at which the auth token expires, in seconds since the epoch.
+        """
+        return self.__api_auth_token_expiry
+
+    @api_auth_token_expiry.setter
+    def api_auth_token_expiry(self, new_api_auth_token_expiry) -> None:
+        self.__api_auth_token_expiry = new_api_auth_token_expiry
+
     @property
     def base_url(self) -> str:
         return self.__base_url
@@ -65,6 +79,7 @@ class Environment:
     def environment_as_dict(self) -> dict:
         return {API_KEY_SETTING: self.__api_key,
                 API_AUTH_TOKEN_SETTING: self.__api_auth_token,
+                API_AUTH_TOKEN_EXPIRY_SETTING: self.__api_auth_token_expiry,
                 API_ENDPOINT_SETTING: {
                     "url": self.__base_url,
                     "username": self.__api_auth_setting.username,
@@ -1,10 +1,19 @@
+import threading
+from contextlib import contextmanager
+from copy import deepcopy
 from os.path import join
 
-from .utils import getConfigDir, createConfig, loadConfigs, getConfigSize, \
-    getConfigs, setConfigs, hasConfigs, deleteConfigs, clearConfigs
+from .utils import getConfigDir, createConfig, createConfigPathSync, readConfigs, writeConfigs, getConfigStat, \
+    lockConfigs, dotnotation
 
 
 class ConfigStore:
+    """
+    JSON config file kept in memory, and read again only once the file changed.
+
+    Updates are written to a temporary file renamed over the config file, while holding a lock shared with the
+    other processes, and the updates made within `batch` are written at once.
+    """
 
     def __init__(self, name, defaults={}, globalConfigPath=False):
         self.name = name
@@ -23,32 +32,88 @@ class ConfigStore:
         self.path = join(self.configDir, self.pathPrefix)
         # self.all = {}
         createConfig(self.path, self.defaults, pathEntry=pathEntry)
-        self.Object = loadConfigs(self.path)
-        self.size = getConfigSize(self.path)
+        self._lock = threading.RLock()
+        self._configs = None
+        self._stat = None
+        self._batchDepth = 0
+        self._changed = False
+        self.Object = self.all()
+        self.size = len(self.Object)
+
+    def _load(self):
+        """
+        Get the configs, read again from the file only when it changed since it was last read.
+        """
+        with self._lock:
+            if self._batchDepth:
+                return self._configs
+            stat = getConfigStat(self.path)
+            if stat is None:
+                createConfigPathSync(self.path)
+                stat = getConfigStat(self.path)
+            if self._configs is None or stat != self._stat:
+                self._configs = readConfigs(self.path)
+                self._stat = stat
+            return self._configs
+
+    @contextmanager
+    def batch(self):
+        """
+        Group the updates made within the context into a single write. The configs are read again once the lock
+        of the file is held, so that the updates of the other processes are kept.
+        """
+        with self._lock:
+            if self._batchDepth:
+                self._batchDepth += 1
+                try:
+                    yield
+                finally:
+                    self._batchDepth -= 1
+                return
+
+            with lockConfigs(self.path):
+                self._stat = None
+                self._load()
+                self._batchDepth = 1
+                self._changed = False
+                try:
+                    yield
+                    if self._changed:
+                        writeConfigs(self.path, self._configs)
+                        self._stat = getConfigStat(self.path)
+                except BaseException:
+                    # the updates were not written
+                    self._configs = None
+                    raise
+                finally:
+                    self._batchDepth = 0
 
     def all(self, Object=None):
         if Object:
             self.set(Object)
 
-        jsonConfigs = loadConfigs(self.path)
-        return jsonConfigs
+        return deepcopy(self._load())
 
     def get(self, key):
-        value = getConfigs(self.path, key)
-        return value
+        value = self._load().get(key, None)
+        return deepcopy(value)
 
     def set(self, key, value=None):
-        if isinstance(key, dict):
-            setObject = key
-            setConfigs(self.path, Object=setObject)
-        else:
-            setConfigs(self.path, key=key, value=value)
+        setObject = key if isinstance(key, dict) else {key: value}
+        with self.batch():
+            for jkey, jval in setObject.items():
+                self._configs.update(dotnotation(jkey, jval))
+            self._changed = True
 
     def has(self, key):
-        return hasConfigs(self.path, key)
+        return key in self._load()
 
     def delete(self, key):
-        deleteConfigs(self.path, key)
+        with self.batch():
+            self._configs.pop(key)
+            self._changed = True
 
     def clear(self):
-        clearConfigs(self.path)
+        with self.batch():
+            self._configs = {}
+            self._changed = True
@@ -1,6 +1,19 @@
 import os
+import stat
 import sys
 import json
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # no advisory file locks on Windows
+    fcntl = None
+
+# the umask can only be read by setting it
+_umask = os.umask(0)
+os.umask(_umask)
 
 
 def getConfigDir():
@@ -35,55 +48,66 @@ def createConfigPathSync(path):
     createConfig(path, {}, pathEntry=pathEntry)
 
 
-def loadConfigs(path):
-    createConfigPathSync(path)
-    if os.path.isfile(path):
-        with open(path, "rb") as fp:
-            jsonConfigs = dict(json.load(fp))
-        return jsonConfigs
-
-
-def writeConfigs(path, jsonData):
-    with open(path, "w") as fp:
-        json.dump(jsonData, fp)
-
-
-def setConfigs(path, key=None, value=None, Object=None):
-    jsonConfigs = loadConfigs(path)
-    if Object is None:
-        jsonConfigs.update(dotnotation(key, value))
-    else:
-        for jkey, jval in Object.items():
-            jsonConfigs.update(dotnotation(jkey, jval))
-    writeConfigs(path, jsonConfigs)
-
-
-def getConfigs(path, key):
-    jsonConfigs = loadConfigs(path)
-    value = jsonConfigs.get(key, None)
-    return value
-
-
-def hasConfigs(path, key):
-    jsonConfigs = loadConfigs(path)
-    if key in jsonConfigs:
-        return True
-    return False
-
-
-def deleteConfigs(path, key):
-    jsonConfigs = loadConfigs(path)
-    jsonConfigs.pop(key)
-    writeConfigs(path, jsonConfigs)
-
-
-def clearConfigs(path):
-    writeConfigs(path, {})
-
-
-def getConfigSize(path):
-    jsonConfigs = loadConfigs(path)
-    return len(jsonConfigs)
+def readConfigs(path):
+    with open(path, "rb") as fp:
+        jsonConfigs = dict(json.load(fp))
+    return jsonConfigs
+
+
+def writeConfigs(path, jsonData, **dumpOptions):
+    """
+    Write the configs to a temporary file first and rename it, so that the config file is never seen half written.
+    The file keeps its permissions, and the options are passed to json.dump.
+    """
+    fd, tempPath = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=os.path.dirname(path))
+    try:
+        os.chmod(tempPath, getFileMode(path))
+        with os.fdopen(fd, "w") as fp:
+            json.dump(jsonData, fp, **dumpOptions)
+            fp.flush()
+            os.fsync(fp.fileno())
+        os.replace(tempPath, path)
+    except BaseException:
+        if os.path.exists(tempPath):
+            os.remove(tempPath)
+        raise
+
+
+def getFileMode(path):
+    """
+    Get the permissions of a file, or the ones a new file gets when it does not exist.
+    """
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_umask
+
+
+def getConfigStat(path):
+    """
+    Get what tells whether the config file changed: its inode, which a rename changes, modification time and size.
+    """
+    try:
+        fileStat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return fileStat.st_ino, fileStat.st_mtime_ns, fileStat.st_size
+
+
+@contextmanager
+def lockConfigs(path):
+    """
+    Hold an exclusive advisory lock on the config file, shared by all the processes updating it.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(path + ".lock", "a") as lockFile:
+        fcntl.flock(lockFile.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lockFile.fileno(), fcntl.LOCK_UN)
 
 
 def dotnotation(key, value):
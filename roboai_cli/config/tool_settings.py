@@ -1,12 +1,18 @@
 from roboai_cli.config.store import ConfigStore
 from .environment_constants import DEFAULT_SETTINGS, PACKAGE_NAME, API_KEY_SETTING, \
-    API_AUTH_TOKEN_SETTING, API_ENDPOINT_SETTING, CURRENT_ENVIRONMENT
+    API_AUTH_TOKEN_SETTING, API_AUTH_TOKEN_EXPIRY_SETTING, API_ENDPOINT_SETTING, CURRENT_ENVIRONMENT
 from .environment_settings import Environment, EnvironmentAuth
 
 
 class ToolSettings:
     _store = ConfigStore(PACKAGE_NAME, DEFAULT_SETTINGS, globalConfigPath=True)
 
+    def batch(self):
+        """
+        Group the settings updates made within the returned context into a single write.
+        """
+        return self._store.batch()
+
     def get_api_key(self) -> str:
         return self._store.get(API_KEY_SETTING)
 
@@ -32,7 +38,8 @@ class ToolSettings:
                                api_auth_token=environment_config["API_AUTH_TOKEN"],
                                base_url=environment_config["API_ENDPOINT"]["url"],
                                api_auth_setting=EnvironmentAuth(environment_config["API_ENDPOINT"]["username"],
-                               environment_config["API_ENDPOINT"]["password"]))
+                               environment_config["API_ENDPOINT"]["password"]),
+                               api_auth_token_expiry=environment_config.get(API_AUTH_TOKEN_EXPIRY_SETTING))
         else:
             return None
 
@@ -54,7 +61,8 @@ class ToolSettings:
                                api_auth_token=environment_config["API_AUTH_TOKEN"],
                                base_url=environment_config["API_ENDPOINT"]["url"],
                                api_auth_setting=EnvironmentAuth(environment_config["API_ENDPOINT"]["username"],
-                               environment_config["API_ENDPOINT"]["password"]))
+                               environment_config["API_ENDPOINT"]["password"]),
+                               api_auth_token_expiry=environment_config.get(API_AUTH_TOKEN_EXPIRY_SETTING))
         else:
             return None
 
@@ -1,10 +1,9 @@
-import pkg_resources
-
-
 def language_project_path() -> str:
     """
     Auxiliary method to get the default language folder structure.
     """
+    import pkg_resources
+
     return pkg_resources.resource_filename(__name__, "language")
 
 
@@ -12,4 +11,6 @@ def initial_project_path() -> str:
     """
     Auxiliary method to get the default initial project folder structure.
     """
+    import pkg_resources
+
     return pkg_resources.resource_filename(__name__, "initial_project")
@@ -1,59 +1,91 @@
+import importlib
+
 import click
-from roboai_cli.commands import (
-    login,
-    logout,
-    connect,
-    deploy,
-    remove,
-    stop,
-    start,
-    seed,
-    status,
-    environment,
-    package,
-    clean,
-    logs,
-    diff,
-    train,
-    run,
-    shell,
-    test,
-    interactive,
-    stories
-)
-from pyfiglet import Figlet
-
-from roboai_cli.__init__ import __version__  # this is wrong but won't work otherwise
+
+from roboai_cli import __version__
 from roboai_cli.util.cli import print_message
 from roboai_cli.util.text import remove_last_line
 
+# module and help of every command, the module of a command is only imported when the command is run
+COMMANDS = {
+    "login": ("roboai_cli.commands.login", "Initialize a new session using a ROBO.AI API key."),
+    "logout": ("roboai_cli.commands.logout", "Close the current session in the ROBO.AI platform."),
+    "connect": ("roboai_cli.commands.connect", "Connect a local bot to a ROBO.AI server bot instance."),
+    "deploy": ("roboai_cli.commands.deploy", "Deploy the current bot into the ROBO.AI platform."),
+    "remove": ("roboai_cli.commands.remove", "Remove a deployed bot from the ROBO.AI platform."),
+    "stop": ("roboai_cli.commands.stop", "Stop a bot running in the ROBO.AI platform."),
+    "start": ("roboai_cli.commands.start", "Start a bot deployed on the ROBO.AI platform."),
+    "seed": ("roboai_cli.commands.seed", "Create a new ROBO.AI project seedling, including folder structure and "
+                                         "sample files for all requested languages passed as argument."),
+    "status": ("roboai_cli.commands.status", "Display the bot status."),
+    "environment": ("roboai_cli.commands.environment", "Define the ROBO.AI platform API endpoint to use."),
+    "package": ("roboai_cli.commands.package", "Package the required bot and make it ready for deployment."),
+    "clean": ("roboai_cli.commands.clean", "Clean the last package"),
+    "logs": ("roboai_cli.commands.logs", "Display selected bot runtime logs."),
+    "diff": ("roboai_cli.commands.diff", "Check for structural differences between languages for the same "
+                                         "multi-language bot."),
+    "train": ("roboai_cli.commands.train", "Train Rasa models for the required bots."),
+    "run": ("roboai_cli.commands.run", "Start the action server."),
+    "shell": ("roboai_cli.commands.shell", "Start a shell to interact with the required bot."),
+    "stories": ("roboai_cli.commands.stories", "Generate stories for a Rasa bot."),
+    "test": ("roboai_cli.commands.test", "Test Rasa models for the required bots."),
+    "interactive": ("roboai_cli.commands.interactive", "Run in interactive learning mode where you can provide "
+                                                       "feedback to the required bot."),
+    "models": ("roboai_cli.commands.models", "List the trained models and remove the old ones."),
+    "daemon": ("roboai_cli.commands.daemon", "Run a daemon keeping Rasa and the last used models loaded between "
+                                             "commands."),
+}
+# commands sending requests to the platform through the robo_ai SDK
+PLATFORM_COMMANDS = {"login", "connect", "deploy", "remove", "stop", "start", "status", "environment", "logs"}
+
+
+class LazyGroup(click.Group):
+    """
+    Group importing the module of a command only when the command is run, so that a command does not pay
+    for the imports of the others. The group help lists the commands with the help given along with their module.
+    """
+
+    def __init__(self, *args, lazy_commands: dict = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = lazy_commands or {}
+
+    def list_commands(self, ctx):
+        return sorted(set(self.commands) | set(self.lazy_commands))
 
-@click.group(help=f"roboai {__version__}")
+    def get_command(self, ctx, cmd_name):
+        if cmd_name not in self.commands and cmd_name in self.lazy_commands:
+            module = importlib.import_module(self.lazy_commands[cmd_name][0])
+            self.add_command(module.command, cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def format_commands(self, ctx, formatter):
+        commands = self.list_commands(ctx)
+        if not commands:
+            return
+        limit = formatter.width - 6 - max(len(name) for name in commands)
+        rows = []
+        for name in commands:
+            if name in self.commands:
+                if self.commands[name].hidden:
+                    continue
+                rows.append((name, self.commands[name].get_short_help_str(limit)))
+            else:
+                rows.append((name, click.utils.make_default_short_help(self.lazy_commands[name][1], limit)))
+        with formatter.section("Commands"):
+            formatter.write_dl(rows)
+
+
+@click.group(cls=LazyGroup, lazy_commands=COMMANDS, help=f"roboai {__version__}")
 @click.version_option(version=__version__, message=f"roboai {__version__}")
-def cli():
-    pass
+@click.pass_context
+def cli(ctx: click.Context):
+    if ctx.invoked_subcommand in PLATFORM_COMMANDS:
+        from roboai_cli.util.http import install_http_session, uninstall_http_session
 
+        install_http_session()
+        # the SDK gets its requests module back once the command is over
+        ctx.call_on_close(uninstall_http_session)
 
-cli.add_command(login.command)
-cli.add_command(logout.command)
-cli.add_command(connect.command)
-cli.add_command(deploy.command)
-cli.add_command(remove.command)
-cli.add_command(stop.command)
-cli.add_command(start.command)
-cli.add_command(seed.command)
-cli.add_command(status.command)
-cli.add_command(environment.command)
-cli.add_command(package.command)
-cli.add_command(clean.command)
-cli.add_command(logs.command)
-cli.add_command(diff.command)
-cli.add_command(train.command)
-cli.add_command(run.command)
-cli.add_command(shell.command)
-cli.add_command(stories.command)
-cli.add_command(test.command)
-cli.add_command(interactive.command)
 
 try:
     import colorama
@@ -64,6 +96,8 @@ except any:
 
 
 def get_motd():
+    from pyfiglet import Figlet
+
     figlet = Figlet(font="standard")
     logo = figlet.renderText("ROBO . AI")
     logo = remove_last_line(remove_last_line(logo))
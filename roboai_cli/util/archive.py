@@ -0,0 +1,415 @@
+import io
+import os
+import stat
+import struct
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import Callable, Dict, Iterable, Tuple, Union
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+DEFLATE_WINDOW_SIZE = 32 * 1024
+
+# file types which are already compressed, deflating them again only costs CPU time
+INCOMPRESSIBLE_EXTENSIONS = (
+    ".gz", ".tgz", ".bz2", ".xz", ".lzma", ".zst", ".zip", ".7z", ".rar", ".whl", ".jar", ".npz", ".ftz",
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".mp3", ".mp4", ".ogg",
+)
+PROBE_SAMPLE_COUNT = 8
+PROBE_SAMPLE_SIZE = 32 * 1024
+PROBE_MIN_FILE_SIZE = PROBE_SAMPLE_COUNT * PROBE_SAMPLE_SIZE
+INCOMPRESSIBLE_RATIO = 0.95
+
+ZIP64_LIMIT = (1 << 31) - 1
+ZIP_FILECOUNT_LIMIT = (1 << 16) - 1
+ZIP_MAX_UINT32 = 0xFFFFFFFF
+
+LOCAL_HEADER_STRUCT = struct.Struct("<4s2B4HL2L2H")
+CENTRAL_HEADER_STRUCT = struct.Struct("<4s4B4HL2L5H2L")
+END_RECORD_STRUCT = struct.Struct("<4s4H2LH")
+ZIP64_END_RECORD_STRUCT = struct.Struct("<4sQ2H2L4Q")
+ZIP64_END_LOCATOR_STRUCT = struct.Struct("<4sLQL")
+
+LOCAL_HEADER_SIGNATURE = b"PK\003\004"
+CENTRAL_HEADER_SIGNATURE = b"PK\001\002"
+END_RECORD_SIGNATURE = b"PK\005\006"
+ZIP64_END_RECORD_SIGNATURE = b"PK\006\006"
+ZIP64_END_LOCATOR_SIGNATURE = b"PK\006\007"
+
+UTF8_FLAG = 0x800
+UNIX_SYSTEM = 3
+ZIP_VERSION = 20
+ZIP64_VERSION = 45
+DIRECTORY_ATTRIBUTE = 0x10
+
+# entries are written with a fixed timestamp (1980-01-01 00:00:00) and normalized permissions,
+# so that packaging the same files always produces the same archive
+NORMALIZED_DOS_DATE = 1 << 5 | 1
+NORMALIZED_DOS_TIME = 0
+FILE_MODE = stat.S_IFREG | 0o644
+EXECUTABLE_FILE_MODE = stat.S_IFREG | 0o755
+DIRECTORY_MODE = stat.S_IFDIR | 0o755
+
+
+def get_cpu_count() -> int:
+    return os.cpu_count() or 1
+
+
+def get_normalized_mode(path: str, is_dir: bool) -> int:
+    if is_dir:
+        return DIRECTORY_MODE
+    return EXECUTABLE_FILE_MODE if os.stat(path).st_mode & 0o111 else FILE_MODE
+
+
+def is_incompressible(path: str, file_size: int) -> bool:
+    """
+    Tell whether a file is not worth deflating, either because of its extension or because a fast compression
+    of samples spread evenly over the file shrinks none of them. A file with any compressible region is deflated.
+    """
+    if path.lower().endswith(INCOMPRESSIBLE_EXTENSIONS):
+        return True
+    if file_size < PROBE_MIN_FILE_SIZE:
+        return False
+    step = (file_size - PROBE_SAMPLE_SIZE) // (PROBE_SAMPLE_COUNT - 1)
+    with open(path, "rb") as f:
+        for index in range(PROBE_SAMPLE_COUNT):
+            f.seek(index * step)
+            sample = f.read(PROBE_SAMPLE_SIZE)
+            if len(zlib.compress(sample, 1)) < len(sample) * INCOMPRESSIBLE_RATIO:
+                return False
+    return True
+
+
+def compress_block(data: bytes, level: int, last: bool, dictionary: bytes = None) -> bytes:
+    """
+    Compress a block of a file as a raw deflate stream fragment.
+    Non final blocks are sync flushed so that the compressed blocks can be concatenated into a single valid
+    deflate stream. The tail of the previous block is used as dictionary to keep the compression ratio.
+    """
+    if dictionary:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS, zdict=dictionary)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+def timed_compress_block(data: bytes, level: int, last: bool, dictionary: bytes = None) -> Tuple[bytes, float]:
+    start = perf_counter()
+    compressed_data = compress_block(data, level, last, dictionary)
+    return compressed_data, perf_counter() - start
+
+
+class RawSource:
+    """
+    Already compressed data of an entry of an existing zip archive, copied as is into a new archive.
+    The entry mode is taken from the file at path, whose content is the same.
+    """
+
+    def __init__(self, path: str, archive_path: str, info: zipfile.ZipInfo):
+        self.path = path
+        self.archive_path = archive_path
+        self.info = info
+
+    def copy_to(self, output, block_size: int = DEFAULT_BLOCK_SIZE):
+        with open(self.archive_path, "rb") as archive:
+            archive.seek(self.info.header_offset)
+            header = LOCAL_HEADER_STRUCT.unpack(archive.read(LOCAL_HEADER_STRUCT.size))
+            archive.seek(header[-2] + header[-1], os.SEEK_CUR)
+            remaining = self.info.compress_size
+            while remaining > 0:
+                data = archive.read(min(block_size, remaining))
+                if not data:
+                    raise zipfile.BadZipFile("Truncated entry '{0}' in {1}".format(self.info.filename,
+                                                                                   self.archive_path))
+                output.write(data)
+                remaining -= len(data)
+
+
+class ArchiveMember:
+    """
+    Metadata of an entry written to the archive, needed to build the central directory.
+    """
+
+    def __init__(self, arcname: str, mode: int, method: int, file_size: int):
+        self.arcname = arcname
+        self.mode = mode
+        self.method = method
+        self.file_size = file_size
+        self.compress_size = 0
+        self.crc = 0
+        self.header_offset = 0
+
+    @property
+    def is_dir(self) -> bool:
+        return self.arcname.endswith("/")
+
+    @property
+    def zip64(self) -> bool:
+        return self.file_size * 1.05 > ZIP64_LIMIT
+
+    def local_header(self) -> bytes:
+        extra = b""
+        file_size, compress_size = self.file_size, self.compress_size
+        if self.zip64:
+            extra = struct.pack("<HHQQ", 1, 16, file_size, compress_size)
+            file_size = compress_size = ZIP_MAX_UINT32
+        name = self.arcname.encode("utf-8")
+        return LOCAL_HEADER_STRUCT.pack(
+            LOCAL_HEADER_SIGNATURE, ZIP64_VERSION if self.zip64 else ZIP_VERSION, 0, UTF8_FLAG, self.method,
+            NORMALIZED_DOS_TIME, NORMALIZED_DOS_DATE, self.crc, compress_size, file_size, len(name), len(extra)
+        ) + name + extra
+
+    def central_header(self) -> bytes:
+        zip64_fields = []
+        file_size, compress_size, header_offset = self.file_size, self.compress_size, self.header_offset
+        if file_size > ZIP64_LIMIT or compress_size > ZIP64_LIMIT:
+            zip64_fields.extend([file_size, compress_size])
+            file_size = compress_size = ZIP_MAX_UINT32
+        if header_offset > ZIP64_LIMIT:
+            zip64_fields.append(header_offset)
+            header_offset = ZIP_MAX_UINT32
+        extra = b""
+        if zip64_fields:
+            extra = struct.pack("<HH" + "Q" * len(zip64_fields), 1, 8 * len(zip64_fields), *zip64_fields)
+        version = ZIP64_VERSION if extra else ZIP_VERSION
+        name = self.arcname.encode("utf-8")
+        external_attributes = self.mode << 16 | (DIRECTORY_ATTRIBUTE if self.is_dir else 0)
+        return CENTRAL_HEADER_STRUCT.pack(
+            CENTRAL_HEADER_SIGNATURE, version, UNIX_SYSTEM, version, 0, UTF8_FLAG, self.method,
+            NORMALIZED_DOS_TIME, NORMALIZED_DOS_DATE, self.crc, compress_size, file_size, len(name), len(extra),
+            0, 0, 0, external_attributes, header_offset
+        ) + name + extra
+
+
+class ZipArchiveWriter:
+    """
+    Minimal zip writer able to deflate file blocks in a pool of worker threads.
+
+    zlib releases the GIL while compressing, so spreading the blocks of every file over a thread pool scales with
+    the number of cores. Blocks are written back in order, keeping a bounded number of blocks in flight.
+    With a single job the blocks are compressed in the calling thread, the archive is the same whatever the
+    number of jobs.
+    Files which are already compressed are stored as is, as well as every file when the level is 0.
+    The time spent reading the sources, compressing (summed over the workers) and writing the archive is recorded.
+    """
+
+    def __init__(self, path: str, level: int = zlib.Z_DEFAULT_COMPRESSION, jobs: int = 1,
+                 block_size: int = DEFAULT_BLOCK_SIZE):
+        self.__file = open(path, "wb")
+        self.__level = level
+        self.__jobs = jobs if jobs > 0 else get_cpu_count()
+        self.__block_size = block_size
+        self.__members = []
+        self.__current = None
+        self.__timings = {"reading": 0.0, "compression": 0.0, "writing": 0.0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.__file.close()
+
+    @property
+    def members(self) -> list:
+        return self.__members
+
+    @property
+    def timings(self) -> Dict[str, float]:
+        return self.__timings
+
+    def write(self, entries: Iterable[Tuple[Union[str, bytes, RawSource], str]],
+              progress_callback: Callable[[int], None] = None):
+        """
+        Write (source, arcname) entries into the archive. Directory entries have an arcname ending with '/'.
+        Sources are either file paths or in memory file contents, which are compressed,
+        or RawSource objects, which are copied as is.
+
+        Args:
+            entries: (source, arcname) pairs to be archived
+            progress_callback: called with the number of uncompressed bytes every time a block is written
+        """
+        if self.__jobs == 1:
+            for source, arcname in entries:
+                self.__write_serial(source, arcname, progress_callback)
+            return
+
+        in_flight = deque()
+        max_in_flight = self.__jobs * 4
+        with ThreadPoolExecutor(max_workers=self.__jobs) as pool:
+            for source, arcname in entries:
+                for task in self.__schedule(pool, source, arcname):
+                    in_flight.append(task)
+                    while len(in_flight) > max_in_flight:
+                        self.__complete(in_flight.popleft(), progress_callback)
+            while in_flight:
+                self.__complete(in_flight.popleft(), progress_callback)
+
+    def close(self):
+        start = perf_counter()
+        central_directory_offset = self.__file.tell()
+        for member in self.__members:
+            self.__file.write(member.central_header())
+        central_directory_size = self.__file.tell() - central_directory_offset
+
+        count = len(self.__members)
+        if count > ZIP_FILECOUNT_LIMIT or central_directory_offset > ZIP64_LIMIT \
+                or central_directory_size > ZIP64_LIMIT:
+            zip64_end_record_offset = self.__file.tell()
+            self.__file.write(ZIP64_END_RECORD_STRUCT.pack(
+                ZIP64_END_RECORD_SIGNATURE, ZIP64_END_RECORD_STRUCT.size - 12, ZIP64_VERSION, ZIP64_VERSION,
+                0, 0, count, count, central_directory_size, central_directory_offset
+            ))
+            self.__file.write(ZIP64_END_LOCATOR_STRUCT.pack(ZIP64_END_LOCATOR_SIGNATURE, 0,
+                                                            zip64_end_record_offset, 1))
+            count = min(count, ZIP_FILECOUNT_LIMIT)
+            central_directory_offset = min(central_directory_offset, ZIP_MAX_UINT32)
+            central_directory_size = min(central_directory_size, ZIP_MAX_UINT32)
+
+        self.__file.write(END_RECORD_STRUCT.pack(END_RECORD_SIGNATURE, 0, 0, count, count,
+                                                 central_directory_size, central_directory_offset, 0))
+        self.__file.close()
+        self.__timings["writing"] += perf_counter() - start
+
+    def __new_member(self, source: Union[str, bytes, RawSource], arcname: str) -> ArchiveMember:
+        if isinstance(source, RawSource):
+            member = ArchiveMember(arcname, get_normalized_mode(source.path, False), source.info.compress_type,
+                                   source.info.file_size)
+            member.crc = source.info.CRC
+            member.compress_size = source.info.compress_size
+            return member
+        if isinstance(source, bytes):
+            return ArchiveMember(arcname, FILE_MODE, ZIP_STORED if self.__level == 0 else ZIP_DEFLATED, len(source))
+        if arcname.endswith("/"):
+            return ArchiveMember(arcname, DIRECTORY_MODE, ZIP_STORED, 0)
+        file_size = os.path.getsize(source)
+        if self.__level == 0 or is_incompressible(source, file_size):
+            method = ZIP_STORED
+        else:
+            method = ZIP_DEFLATED
+        return ArchiveMember(arcname, get_normalized_mode(source, False), method, file_size)
+
+    @staticmethod
+    def __open(source: Union[str, bytes]):
+        return io.BytesIO(source) if isinstance(source, bytes) else open(source, "rb")
+
+    def __write_raw(self, member: ArchiveMember, source: RawSource, progress_callback: Callable[[int], None]):
+        self.__start_member(member)
+        start = perf_counter()
+        source.copy_to(self.__file, self.__block_size)
+        self.__timings["writing"] += perf_counter() - start
+        self.__members.append(member)
+        if progress_callback:
+            progress_callback(member.file_size)
+
+    def __start_member(self, member: ArchiveMember):
+        start = perf_counter()
+        member.header_offset = self.__file.tell()
+        self.__file.write(member.local_header())
+        self.__timings["writing"] += perf_counter() - start
+
+    def __finish_member(self, member: ArchiveMember):
+        start = perf_counter()
+        end_offset = self.__file.tell()
+        self.__file.seek(member.header_offset)
+        self.__file.write(member.local_header())
+        self.__file.seek(end_offset)
+        self.__timings["writing"] += perf_counter() - start
+        self.__members.append(member)
+
+    def __write_serial(self, source: Union[str, bytes, RawSource], arcname: str,
+                       progress_callback: Callable[[int], None]):
+        member = self.__new_member(source, arcname)
+        if isinstance(source, RawSource):
+            self.__write_raw(member, source, progress_callback)
+            return
+        self.__start_member(member)
+        if not member.is_dir:
+            for kind, data in self.__read_blocks(member, source):
+                if kind == "block":
+                    compressed_data, elapsed = timed_compress_block(*data)
+                    self.__timings["compression"] += elapsed
+                    self.__write_data(member, compressed_data)
+                    size = len(data[0])
+                else:
+                    self.__write_data(member, data)
+                    size = len(data)
+                if progress_callback:
+                    progress_callback(size)
+        self.__finish_member(member)
+
+    def __read_blocks(self, member: ArchiveMember, source: Union[str, bytes]):
+        """
+        Read the blocks of a file, updating the member CRC, and yield either ("data", block) when the file is
+        stored or ("block", compress_block arguments) when it is deflated.
+        """
+        with self.__open(source) as source_file:
+            if member.method == ZIP_STORED:
+                for block in iter(lambda: self.__read(source_file), b""):
+                    member.crc = zlib.crc32(block, member.crc)
+                    yield "data", block
+                return
+
+            block = self.__read(source_file)
+            dictionary = None
+            while True:
+                next_block = self.__read(source_file)
+                member.crc = zlib.crc32(block, member.crc)
+                last = not next_block
+                yield "block", (block, self.__level, last, dictionary)
+                if last:
+                    break
+                dictionary = block[-DEFLATE_WINDOW_SIZE:]
+                block = next_block
+
+    def __read(self, source_file) -> bytes:
+        start = perf_counter()
+        block = source_file.read(self.__block_size)
+        self.__timings["reading"] += perf_counter() - start
+        return block
+
+    def __write_data(self, member: ArchiveMember, data: bytes):
+        start = perf_counter()
+        self.__file.write(data)
+        self.__timings["writing"] += perf_counter() - start
+        member.compress_size += len(data)
+
+    def __schedule(self, pool: ThreadPoolExecutor, source: Union[str, bytes, RawSource], arcname: str):
+        member = self.__new_member(source, arcname)
+        if isinstance(source, RawSource):
+            yield "raw", (member, source)
+            return
+        yield "start", member
+        if not member.is_dir:
+            for kind, data in self.__read_blocks(member, source):
+                yield kind, (pool.submit(timed_compress_block, *data), len(data[0])) if kind == "block" else data
+        yield "end", member
+
+    def __complete(self, task: tuple, progress_callback: Callable[[int], None]):
+        kind, value = task
+        if kind == "start":
+            self.__current = value
+            self.__start_member(value)
+        elif kind == "block":
+            future, size = value
+            compressed_data, elapsed = future.result()
+            self.__timings["compression"] += elapsed
+            self.__write_data(self.__current, compressed_data)
+            if progress_callback:
+                progress_callback(size)
+        elif kind == "data":
+            self.__write_data(self.__current, value)
+            if progress_callback:
+                progress_callback(len(value))
+        elif kind == "raw":
+            member, source = value
+            self.__write_raw(member, source, progress_callback)
+        else:
+            self.__finish_member(value)
@@ -0,0 +1,95 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import click
+from robo_ai.exception.api_error import ApiError
+
+from roboai_cli.util.cli import loading_indicator, print_message
+
+DEFAULT_CONCURRENCY = 4
+
+# a task gets a callback to report its current step, and returns a short description of its outcome
+Task = Callable[[Callable[[str], None]], Optional[str]]
+
+
+class BatchResult(NamedTuple):
+    """
+    Outcome of a task run in a batch.
+    """
+    name: str
+    succeeded: bool
+    duration: float
+    message: str
+
+
+def run_batch(tasks: Dict[str, Task], concurrency: int = DEFAULT_CONCURRENCY,
+              label: str = "Running") -> List[BatchResult]:
+    """
+    Run tasks concurrently, at most `concurrency` at once, under a single progress indicator showing
+    the current step of every running task. A failing task does not stop the others.
+
+    Args:
+        tasks: tasks by name
+        concurrency: maximum number of tasks running at once
+        label: text of the progress indicator
+
+    Returns:
+        List[BatchResult]: outcome of every task, in the order of the tasks
+    """
+    lock = threading.Lock()
+    steps = {}
+    done = []
+
+    with loading_indicator(label) as indicator:
+        def refresh():
+            running = ", ".join("{0}: {1}".format(name, step) for name, step in steps.items())
+            indicator.text = "{0} ({1}/{2} done){3}".format(label, len(done), len(tasks),
+                                                            " - " + running if running else "")
+
+        def run(name: str, task: Task) -> BatchResult:
+            def report(step: str):
+                with lock:
+                    steps[name] = step
+                    refresh()
+
+            start = perf_counter()
+            try:
+                result = BatchResult(name, True, 0.0, task(report) or "")
+            except click.ClickException as e:
+                result = BatchResult(name, False, 0.0, e.format_message())
+            except (Exception, ApiError) as e:
+                result = BatchResult(name, False, 0.0, str(e) or type(e).__name__)
+            with lock:
+                steps.pop(name, None)
+                done.append(name)
+                refresh()
+            return result._replace(duration=perf_counter() - start)
+
+        with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as pool:
+            futures = [pool.submit(run, name, task) for name, task in tasks.items()]
+            return [future.result() for future in futures]
+
+
+def format_batch_results(results: List[BatchResult], name_header: str = "Name") -> str:
+    width = max([len(name_header)] + [len(result.name) for result in results])
+    lines = ["{0:<{1}}  {2:<9}  {3:>10}  {4}".format(name_header, width, "Result", "Duration", "Details")]
+    for result in results:
+        lines.append("{0:<{1}}  {2:<9}  {3:>8.1f} s  {4}".format(
+            result.name, width, "ok" if result.succeeded else "failed", result.duration,
+            result.message.replace("\n", " ")))
+    return "\n".join(lines)
+
+
+def print_batch_results(results: List[BatchResult], name_header: str = "Name", operations: str = "operations"):
+    """
+    Print the results table of a batch.
+
+    Raises:
+        click.ClickException: if a task failed
+    """
+    print_message(format_batch_results(results, name_header))
+    failures = [result for result in results if not result.succeeded]
+    if failures:
+        raise click.ClickException("{0} of {1} {2} failed.".format(len(failures), len(results), operations))
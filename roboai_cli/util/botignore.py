@@ -0,0 +1,171 @@
+import os
+import re
+from typing import List, Optional
+
+BOT_IGNORE_FILE_NAME = ".botignore"
+
+
+def translate(pattern: str) -> str:
+    """
+    Translate a gitignore glob into a regular expression matching paths relative to the .botignore directory.
+        - '*' matches anything but '/'
+        - '?' matches any single character but '/'
+        - '[...]' matches a character class, '[!...]' its negation
+        - '**/' matches zero or more directories, a trailing '/**' matches everything inside a directory
+    """
+    regex = []
+    i, length = 0, len(pattern)
+    while i < length:
+        char = pattern[i]
+        if char == "*":
+            if pattern[i:i + 2] == "**" and (i == 0 or pattern[i - 1] == "/") \
+                    and (i + 2 == length or pattern[i + 2] == "/"):
+                if i + 2 == length:
+                    regex.append(".*")
+                    i += 2
+                else:
+                    regex.append("(?:.*/)?")
+                    i += 3
+                continue
+            regex.append("[^/]*")
+        elif char == "?":
+            regex.append("[^/]")
+        elif char == "[":
+            end = pattern.find("]", i + 2 if pattern[i + 1:i + 2] in ("!", "]") else i + 1)
+            if end == -1:
+                regex.append(re.escape(char))
+            else:
+                content = pattern[i + 1:end].replace("\\", "\\\\").replace("[", "\\[")
+                if content.startswith("!"):
+                    content = "^" + content[1:]
+                elif content.startswith("^"):
+                    content = "\\" + content
+                regex.append("(?!/)[" + content + "]")
+                i = end
+        elif char == "\\" and i + 1 < length:
+            i += 1
+            regex.append(re.escape(pattern[i]))
+        else:
+            regex.append(re.escape(char))
+        i += 1
+    return "".join(regex)
+
+
+class BotIgnoreRule:
+    """
+    A single .botignore line compiled into a regular expression.
+    """
+
+    def __init__(self, pattern: str, negate: bool, dir_only: bool, anchored: bool):
+        self.pattern = pattern
+        self.negate = negate
+        self.dir_only = dir_only
+        self.anchored = anchored
+        regex = translate(pattern)
+        self.regex = regex if anchored else "(?:.*/)?" + regex
+
+    @staticmethod
+    def parse(line: str) -> Optional["BotIgnoreRule"]:
+        line = line.rstrip("\n\r")
+        # trailing spaces are ignored unless they are escaped
+        stripped = line.rstrip(" ")
+        if stripped.endswith("\\") and len(stripped) < len(line):
+            stripped += " "
+        line = stripped
+        if not line or line.startswith("#"):
+            return None
+
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        elif line.startswith("\\!") or line.startswith("\\#"):
+            line = line[1:]
+
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            return None
+
+        anchored = "/" in line
+        return BotIgnoreRule(line.lstrip("/"), negate, dir_only, anchored)
+
+
+class BotIgnore:
+    """
+    Compiled .botignore matcher following the gitignore semantics:
+        - blank lines and lines starting with '#' are ignored
+        - patterns containing a '/' are anchored to the .botignore directory, other patterns match at any level
+        - patterns ending with '/' only match directories
+        - '!' negates a pattern, the last matching pattern decides whether a path is ignored
+        - files inside an ignored directory cannot be re-included, so ignored directories can be pruned
+
+    All the rules are compiled into a single regular expression, where the alternatives are
+    ordered from the last to the first rule so that the first successful alternative is the decisive one.
+    """
+
+    def __init__(self, lines: List[str] = None):
+        self.__rules = [rule for rule in (BotIgnoreRule.parse(line) for line in lines or []) if rule]
+        self.__dir_regex = self.__compile(self.__rules)
+        self.__file_regex = self.__compile([rule if not rule.dir_only else None for rule in self.__rules])
+
+    @staticmethod
+    def from_file(path: str) -> "BotIgnore":
+        if not os.path.isfile(path):
+            return BotIgnore()
+        with open(path, "r") as f:
+            return BotIgnore(f.read().splitlines())
+
+    @property
+    def rules(self) -> List[BotIgnoreRule]:
+        return self.__rules
+
+    def match(self, path: str, is_dir: bool = False) -> bool:
+        """
+        Check whether a path, relative to the .botignore directory and using '/' as separator,
+        is ignored by the rules. The path parent directories are not checked.
+        """
+        regex = self.__dir_regex if is_dir else self.__file_regex
+        if regex is None:
+            return False
+        match = regex.fullmatch(path)
+        if match is None:
+            return False
+        return not self.__rules[int(match.lastgroup[1:])].negate
+
+    def is_ignored(self, path: str, is_dir: bool = False) -> bool:
+        """
+        Check whether a path, relative to the .botignore directory and using '/' as separator,
+        is ignored either by itself or because one of its parent directories is ignored.
+        """
+        parts = path.strip("/").split("/")
+        for i in range(1, len(parts)):
+            if self.match("/".join(parts[:i]), is_dir=True):
+                return True
+        return self.match("/".join(parts), is_dir)
+
+    def walk(self, root: str, relative_root: str):
+        """
+        Walk a directory tree like os.walk, pruning the ignored directories and leaving out the ignored files.
+
+        Args:
+            root (str): directory to walk
+            relative_root (str): path of the directory relative to the .botignore directory
+
+        Yields:
+            (dirpath, relative dirpath, dirnames, filenames) for every directory which is not ignored
+        """
+        for dirpath, dirs, files in os.walk(root, topdown=True):
+            relative_dirpath = os.path.relpath(dirpath, root).replace(os.path.sep, "/")
+            relative_dirpath = relative_root if relative_dirpath == "." else relative_root + "/" + relative_dirpath
+            dirs[:] = [directory for directory in dirs
+                       if not self.match(relative_dirpath + "/" + directory, is_dir=True)]
+            files = [file for file in files if not self.match(relative_dirpath + "/" + file)]
+            yield dirpath, relative_dirpath, dirs, files
+
+    @staticmethod
+    def __compile(rules: list):
+        alternatives = ["(?P<r{0}>{1})".format(index, rule.regex)
+                        for index, rule in reversed(list(enumerate(rules))) if rule is not None]
+        if not alternatives:
+            return None
+        return re.compile("|".join(alternatives), re.DOTALL)
@@ -1,8 +1,9 @@
 import click
-from halo import Halo
 
 
 def loading_indicator(text: str = None):
+    from halo import Halo
+
     return Halo(text=text, spinner="dots")
 
 
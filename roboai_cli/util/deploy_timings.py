@@ -0,0 +1,160 @@
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Dict, Optional
+
+DEPLOY_HISTORY_FILE_NAME = ".deploy-history.jsonl"
+
+# deployment phases, in the order they happen
+PHASES = [
+    ("session_validation", "Session validation"),
+    ("packaging", "Packaging"),
+    ("hashing", "Package hashing"),
+    ("upload", "Upload"),
+    ("waiting_stopped", "Waiting for STOPPED"),
+    ("waiting_created", "Waiting for CREATED"),
+    ("waiting_running", "Waiting for RUNNING"),
+]
+
+
+class DeployTimings:
+    """
+    Wall clock duration of the phases of a deployment, and the size of the uploaded package.
+    """
+
+    def __init__(self):
+        self.__phases = {}
+        self.__upload_size = None
+        self.__downtime = None
+        self.__downtime_includes_upload = False
+
+    @property
+    def phases(self) -> Dict[str, float]:
+        return self.__phases
+
+    @property
+    def upload_size(self) -> Optional[int]:
+        return self.__upload_size
+
+    @upload_size.setter
+    def upload_size(self, size: int):
+        self.__upload_size = size
+
+    @property
+    def downtime(self) -> Optional[float]:
+        """
+        How long the bot runtime was down, from the stop request until it was running again.
+        """
+        return self.__downtime
+
+    @downtime.setter
+    def downtime(self, downtime: float):
+        self.__downtime = downtime
+
+    @property
+    def downtime_includes_upload(self) -> bool:
+        """
+        Whether the package was uploaded while the bot runtime was down, on platforms without chunked uploads.
+        """
+        return self.__downtime_includes_upload
+
+    @downtime_includes_upload.setter
+    def downtime_includes_upload(self, includes_upload: bool):
+        self.__downtime_includes_upload = includes_upload
+
+    @property
+    def upload_throughput(self) -> Optional[float]:
+        """
+        Upload throughput, in MB/s.
+        """
+        upload_time = self.__phases.get("upload")
+        if self.__upload_size is None or not upload_time:
+            return None
+        return self.__upload_size / (1024 * 1024) / upload_time
+
+    @contextmanager
+    def measure(self, phase: str):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.__phases[phase] = self.__phases.get(phase, 0.0) + perf_counter() - start
+
+    def to_dict(self) -> dict:
+        content = {"phases": {phase: round(duration, 3) for phase, duration in self.__phases.items()}}
+        if self.__upload_size is not None:
+            throughput = self.upload_throughput
+            content["upload"] = {
+                "size": self.__upload_size,
+                "throughput_mb_s": round(throughput, 3) if throughput is not None else None,
+            }
+        if self.__downtime is not None:
+            content["downtime"] = round(self.__downtime, 3)
+            content["downtime_includes_upload"] = self.__downtime_includes_upload
+        return content
+
+
+@contextmanager
+def measure(timings: Optional[DeployTimings], phase: str):
+    """
+    Measure a phase when timings are being recorded.
+    """
+    if timings is None:
+        yield
+        return
+    with timings.measure(phase):
+        yield
+
+
+def get_deploy_record(timings: DeployTimings, deployments: Dict[str, DeployTimings], api_calls: int,
+                      total: float) -> dict:
+    """
+    Build the timings record of a deploy command: the phases shared by every deployment, such as the packaging,
+    and the phases of the deployment of each language.
+    """
+    return dict(timings.to_dict(), **{
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "total": round(total, 3),
+        "api_calls": api_calls,
+        "deployments": {name: deployment.to_dict() for name, deployment in deployments.items()},
+    })
+
+
+def append_deploy_history(bot_root_dir: str, record: dict) -> str:
+    """
+    Append a timings record to the deploy history of the bot, one JSON record per line.
+
+    Returns:
+        str: path of the history file
+    """
+    path = os.path.join(bot_root_dir, DEPLOY_HISTORY_FILE_NAME)
+    with open(path, "a") as f:
+        f.write(json.dumps(record, sort_keys=True) + "\n")
+    return path
+
+
+def format_deploy_record(record: dict) -> str:
+    labels = dict(PHASES)
+    lines = ["Deploy timings ({0} API calls, {1:.3f} s in total):".format(record["api_calls"], record["total"])]
+    for phase, _ in PHASES:
+        if phase in record["phases"]:
+            lines.append("  {0:<30}{1:>9.3f} s".format(labels[phase], record["phases"][phase]))
+    for name, deployment in record["deployments"].items():
+        if len(record["deployments"]) > 1:
+            lines.append("  {0}:".format(name))
+        indent = "    " if len(record["deployments"]) > 1 else "  "
+        for phase, _ in PHASES:
+            if phase in deployment["phases"]:
+                lines.append("{0}{1:<{2}}{3:>9.3f} s".format(indent, labels[phase], 32 - len(indent),
+                                                             deployment["phases"][phase]))
+        upload = deployment.get("upload")
+        if upload and upload["throughput_mb_s"] is not None:
+            lines.append("{0}{1:<{2}}{3:>9.3f} MB/s".format(indent, "Upload throughput", 32 - len(indent),
+                                                            upload["throughput_mb_s"]))
+        if deployment.get("downtime") is not None:
+            note = " (upload included)" if deployment.get("downtime_includes_upload") else ""
+            lines.append("{0}{1:<{2}}{3:>9.3f} s{4}".format(indent, "Bot runtime downtime", 32 - len(indent),
+                                                            deployment["downtime"], note))
+    return "\n".join(lines)
@@ -0,0 +1,206 @@
+"""
+HTTP connections shared by all the requests sent to the platform during a command.
+
+The robo_ai SDK sends every request with the module level functions of requests, which open a new connection,
+and a new TLS handshake, each time. The SDK resources are given a stand-in of the requests module instead,
+which sends their requests through a single session whose connections are kept alive and pooled.
+Their requests can also be rate limited, so that commands handling many bots at once do not flood the platform,
+and a request rejected because its token expired is sent again once with a renewed token.
+"""
+import threading
+import time
+from typing import Callable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from robo_ai.resources import client_resource, oauth
+
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 16
+# requests per second sent by commands handling several bots at once
+DEFAULT_RATE_LIMIT = 10.0
+
+_http_session = None
+_http_session_pool_size = 0
+_http_session_lock = threading.Lock()
+_rate_limiter = None
+_token_renewer = None
+_request_count = 0
+_request_count_lock = threading.Lock()
+# requests modules of the SDK resources, kept while the shared session is installed in their place
+_sdk_requests = None
+
+
+def create_http_session(pool_maxsize: int = POOL_MAXSIZE) -> requests.Session:
+    session = requests.Session()
+    mount_pool(session, pool_maxsize)
+    session.hooks["response"].append(count_request)
+    return session
+
+
+def count_request(response: requests.Response, *args, **kwargs):
+    global _request_count
+    with _request_count_lock:
+        _request_count += 1
+
+
+def get_request_count() -> int:
+    """
+    Get the number of requests answered through the sessions created by create_http_session.
+    """
+    return _request_count
+
+
+def mount_pool(session: requests.Session, pool_maxsize: int):
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=pool_maxsize)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+
+def get_http_session(pool_maxsize: int = POOL_MAXSIZE) -> requests.Session:
+    """
+    Get the session shared by the requests of the current command.
+
+    Args:
+        pool_maxsize: number of connections which may be used at once with the same host,
+            the pool is enlarged when it is smaller
+
+    Returns:
+        requests.Session: the shared session
+    """
+    global _http_session, _http_session_pool_size
+    with _http_session_lock:
+        if _http_session is None:
+            _http_session = create_http_session(max(pool_maxsize, POOL_MAXSIZE))
+            _http_session_pool_size = max(pool_maxsize, POOL_MAXSIZE)
+        elif pool_maxsize > _http_session_pool_size:
+            mount_pool(_http_session, pool_maxsize)
+            _http_session_pool_size = pool_maxsize
+        return _http_session
+
+
+class RateLimiter:
+    """
+    Token bucket allowing `rate` acquisitions per second on average, and bursts of up to `burst` acquisitions.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.__rate = rate
+        self.__burst = max(burst, 1)
+        self.__clock = clock
+        self.__sleep = sleep
+        self.__tokens = float(self.__burst)
+        self.__updated = clock()
+        self.__lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Wait until a token is available and take it.
+        """
+        with self.__lock:
+            now = self.__clock()
+            self.__tokens = min(self.__burst, self.__tokens + (now - self.__updated) * self.__rate)
+            self.__updated = now
+            self.__tokens -= 1
+            # the token is taken right away, later callers wait for the tokens of the callers before them
+            delay = -self.__tokens / self.__rate if self.__tokens < 0 else 0.0
+        if delay:
+            self.__sleep(delay)
+
+
+def set_rate_limit(rate: float = None, burst: int = 1):
+    """
+    Limit the number of requests sent by the robo_ai SDK per second, None removes the limit.
+    """
+    global _rate_limiter
+    _rate_limiter = RateLimiter(rate, burst) if rate else None
+
+
+def set_token_renewer(renew_token: Optional[Callable[[str], Optional[str]]]):
+    """
+    Set the function called with the token of a request rejected with 401 Unauthorized, returning the token
+    to send the request again with, or None for the request to fail. None removes the function.
+    """
+    global _token_renewer
+    _token_renewer = renew_token
+
+
+def get_bearer_token(headers: Optional[dict]) -> Optional[str]:
+    authorization = (headers or {}).get("Authorization", "")
+    if not authorization.lower().startswith("bearer "):
+        return None
+    return authorization[len("bearer "):]
+
+
+def is_replayable(kwargs: dict) -> bool:
+    """
+    Tell whether a request can be sent again: streamed bodies, such as multipart uploads, are consumed once sent.
+    """
+    return not any(hasattr(kwargs.get(name), "read") for name in ("data", "files"))
+
+
+class SessionRequests:
+    """
+    Stand-in for the requests module, sending the requests through a session.
+    Anything else is looked up in the requests module.
+    """
+
+    def __init__(self, session: requests.Session):
+        self.__session = session
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        response = self.__send(method, url, **kwargs)
+        token = get_bearer_token(kwargs.get("headers"))
+        renew_token = _token_renewer
+        if response.status_code == 401 and token and renew_token and is_replayable(kwargs):
+            new_token = renew_token(token)
+            if new_token and new_token != token:
+                kwargs["headers"] = dict(kwargs["headers"], Authorization="bearer %s" % new_token)
+                response = self.__send(method, url, **kwargs)
+        return response
+
+    def __send(self, method: str, url: str, **kwargs) -> requests.Response:
+        rate_limiter = _rate_limiter
+        if rate_limiter:
+            rate_limiter.acquire()
+        return self.__session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("get", url, **kwargs)
+
+    def post(self, url: str, data=None, json=None, **kwargs) -> requests.Response:
+        return self.request("post", url, data=data, json=json, **kwargs)
+
+    def put(self, url: str, data=None, **kwargs) -> requests.Response:
+        return self.request("put", url, data=data, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        return self.request("delete", url, **kwargs)
+
+    def __getattr__(self, name: str):
+        return getattr(requests, name)
+
+
+def install_http_session(session: requests.Session = None):
+    """
+    Make the robo_ai SDK send its requests through the given session, the shared one by default,
+    until uninstall_http_session is called.
+    """
+    global _sdk_requests
+    if _sdk_requests is None:
+        _sdk_requests = (client_resource.requests, oauth.requests)
+    session_requests = SessionRequests(session or get_http_session())
+    client_resource.requests = session_requests
+    oauth.requests = session_requests
+
+
+def uninstall_http_session():
+    """
+    Give the robo_ai SDK back the requests module it used before install_http_session was called.
+    """
+    global _sdk_requests
+    if _sdk_requests is not None:
+        client_resource.requests, oauth.requests = _sdk_requests
+        _sdk_requests = None
+
@@ -0,0 +1,208 @@
+"""
+Statistics of the bot runtime logs.
+
+The log lines are parsed one at a time into records made of a timestamp, a level, a logger and a message, and only
+the lines which matter are looked at any further: a request starts when Rasa receives a user message and ends when
+it predicts `action_listen`, and an action call starts when Rasa calls the action endpoint and ends when the action
+ended or failed. Requests and action calls are paired with their end in the order they started, as the log lines
+do not tell the conversations apart. Exceptions are counted from the last line of their traceback.
+"""
+import re
+from collections import Counter, defaultdict, deque
+from functools import lru_cache
+from datetime import datetime
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+from roboai_cli.util.runtime_logs import LOG_TIMESTAMP_PATTERN
+
+DEFAULT_SLOW_ACTION_THRESHOLD = 1.0
+PERCENTILES = [50, 95, 99]
+MINUTE_FORMAT = "%Y-%m-%d %H:%M"
+
+LOG_RECORD_PATTERN = re.compile(LOG_TIMESTAMP_PATTERN.pattern +
+                                r"\]?\s+(?P<level>[A-Z]+)\s+(?P<logger>[\w.]+)\s+-\s+(?P<message>.*)$")
+EXCEPTION_PATTERN = re.compile(r"^([A-Za-z_][\w.]*(?:Error|Exception|Exit|Interrupt|Timeout))(?::|$)")
+ACTION_NAME_PATTERN = re.compile(r"'([^']+)'")
+
+REQUEST_START = "Received user message"
+REQUEST_END = "Predicted next action 'action_listen'"
+ACTION_START = "Calling action endpoint to run action"
+ACTION_ENDS = ("Action '", "Failed to run custom action")
+
+
+def get_percentile(values: List[float], percent: float) -> Optional[float]:
+    """
+    Get a percentile of sorted values, using the nearest rank method.
+    """
+    if not values:
+        return None
+    rank = max(int(-(-percent * len(values) // 100)), 1)
+    return values[rank - 1]
+
+
+@lru_cache(maxsize=16)
+def get_day_number(date: str) -> int:
+    return datetime.strptime(date, "%Y-%m-%d").toordinal()
+
+
+def get_time(date: str, clock: str, fraction: Optional[str]) -> float:
+    """
+    Get the time of a log line from its parts, in seconds, much faster than parsing its timestamp.
+    """
+    seconds = get_day_number(date) * 86400 + int(clock[0:2]) * 3600 + int(clock[3:5]) * 60 + int(clock[6:8])
+    return seconds + int(fraction) / 10 ** len(fraction) if fraction else seconds
+
+
+def get_minute_span(first_minute: str, last_minute: str) -> int:
+    """
+    Get the number of minutes from a minute, such as "2021-01-27 10:15", to another one, both included.
+    """
+    span = datetime.strptime(last_minute, MINUTE_FORMAT) - datetime.strptime(first_minute, MINUTE_FORMAT)
+    return int(span.total_seconds() // 60) + 1
+
+
+class LogStats:
+    """
+    Statistics of log lines, computed in a single pass over the lines.
+    """
+
+    def __init__(self, slow_action_threshold: float = DEFAULT_SLOW_ACTION_THRESHOLD):
+        self.__slow_action_threshold = slow_action_threshold
+        self.__line_count = 0
+        self.__first = None
+        self.__last = None
+        self.__levels = Counter()
+        self.__requests_per_minute = Counter()
+        self.__exceptions = Counter()
+        self.__latencies = []
+        self.__slow_actions = defaultdict(list)
+        self.__pending_requests = deque()
+        self.__pending_actions = defaultdict(deque)
+
+    @property
+    def line_count(self) -> int:
+        return self.__line_count
+
+    @property
+    def time_range(self) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Time of the first and of the last line with a timestamp.
+        """
+        return self.__first, self.__last
+
+    @property
+    def levels(self) -> Dict[str, int]:
+        return dict(self.__levels)
+
+    @property
+    def requests_per_minute(self) -> Dict[str, int]:
+        """
+        Number of requests received in every minute, by minute, such as "2021-01-27 10:15".
+        """
+        return dict(self.__requests_per_minute)
+
+    @property
+    def exceptions(self) -> Dict[str, int]:
+        return dict(self.__exceptions)
+
+    @property
+    def slow_actions(self) -> Dict[str, List[float]]:
+        """
+        Duration of the action calls which took longer than the threshold, in seconds, by action.
+        """
+        return {action: list(durations) for action, durations in self.__slow_actions.items()}
+
+    @property
+    def slow_action_threshold(self) -> float:
+        return self.__slow_action_threshold
+
+    def get_latency_percentiles(self) -> Dict[int, Optional[float]]:
+        """
+        Request latency percentiles, in seconds.
+        """
+        latencies = sorted(self.__latencies)
+        return {percent: get_percentile(latencies, percent) for percent in PERCENTILES}
+
+    def add(self, line: str):
+        self.__line_count += 1
+        match = LOG_RECORD_PATTERN.match(line)
+        if match is None:
+            if line[:1].isalpha():
+                exception = EXCEPTION_PATTERN.match(line)
+                if exception:
+                    self.__exceptions[exception.group(1)] += 1
+            return
+
+        date, clock, fraction = match.group(1, 2, 3)
+        if self.__first is None:
+            self.__first = date + " " + clock
+        self.__last = date + " " + clock
+        self.__levels[match.group("level")] += 1
+
+        message = match.group("message")
+        if message.startswith(REQUEST_START):
+            self.__requests_per_minute[date + " " + clock[:5]] += 1
+            self.__pending_requests.append(get_time(date, clock, fraction))
+        elif message.startswith(REQUEST_END):
+            if self.__pending_requests:
+                start = self.__pending_requests.popleft()
+                self.__latencies.append(get_time(date, clock, fraction) - start)
+        elif message.startswith(ACTION_START):
+            self.__get_pending_actions(message).append(get_time(date, clock, fraction))
+        elif message.startswith(ACTION_ENDS):
+            pending_actions = self.__get_pending_actions(message)
+            if pending_actions:
+                duration = get_time(date, clock, fraction) - pending_actions.popleft()
+                if duration > self.__slow_action_threshold:
+                    self.__slow_actions[self.__get_action_name(message)].append(duration)
+
+    def __get_pending_actions(self, message: str) -> Deque[float]:
+        return self.__pending_actions[self.__get_action_name(message)]
+
+    @staticmethod
+    def __get_action_name(message: str) -> str:
+        match = ACTION_NAME_PATTERN.search(message)
+        return match.group(1) if match else ""
+
+
+def get_log_stats(lines: Iterable[str], slow_action_threshold: float = DEFAULT_SLOW_ACTION_THRESHOLD) -> LogStats:
+    stats = LogStats(slow_action_threshold)
+    for line in lines:
+        stats.add(line)
+    return stats
+
+
+def format_log_stats(stats: LogStats) -> str:
+    first, last = stats.time_range
+    lines = ["Log statistics ({0} lines{1}):".format(
+        stats.line_count, ", from {0} to {1}".format(first, last) if first else "")]
+
+    levels = stats.levels
+    lines.append("  {0:<30}{1:>9}".format("Errors", levels.get("ERROR", 0) + levels.get("CRITICAL", 0)))
+    lines.append("  {0:<30}{1:>9}".format("Warnings", levels.get("WARNING", 0)))
+
+    requests_per_minute = stats.requests_per_minute
+    request_count = sum(requests_per_minute.values())
+    lines.append("  {0:<30}{1:>9}".format("Requests", request_count))
+    if requests_per_minute:
+        busiest_minute, busiest_count = max(requests_per_minute.items(), key=lambda item: item[1])
+        minutes = get_minute_span(min(requests_per_minute), max(requests_per_minute))
+        lines.append("  {0:<30}{1:>9.1f}".format("Requests per minute", request_count / minutes))
+        lines.append("  {0:<30}{1:>9}   ({2})".format("Busiest minute", busiest_count, busiest_minute))
+
+    for percent, latency in stats.get_latency_percentiles().items():
+        if latency is not None:
+            lines.append("  {0:<30}{1:>9.3f} s".format("Request latency p{0}".format(percent), latency))
+
+    exceptions = stats.exceptions
+    if exceptions:
+        lines.append("  Exceptions:")
+        for exception, count in sorted(exceptions.items(), key=lambda item: (-item[1], item[0])):
+            lines.append("    {0:<28}{1:>9}".format(exception, count))
+
+    slow_actions = stats.slow_actions
+    if slow_actions:
+        lines.append("  Slow action calls (over {0:g} s):".format(stats.slow_action_threshold))
+        for action, durations in sorted(slow_actions.items(), key=lambda item: -len(item[1])):
+            lines.append("    {0:<28}{1:>9}   (up to {2:.3f} s)".format(action, len(durations), max(durations)))
+    return "\n".join(lines)
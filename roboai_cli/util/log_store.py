@@ -0,0 +1,214 @@
+"""
+Local store of the bot runtime logs, one per bot UUID.
+
+The log lines are appended to segment files, a new segment being started once the current one is large enough,
+and the oldest segments are removed once the store is too large. The store index records, for every segment,
+its size and the timestamps of its first and last lines, along with a sparse index from timestamps to line offsets,
+so that a time range query only reads the segments, and the part of them, within the range.
+The index also records the last lines stored, used as the cursor to find the new lines in the fetched log buffer.
+"""
+import bisect
+import json
+import os
+import re
+import tempfile
+from datetime import datetime
+from os.path import join
+from typing import Iterator, List, Optional
+
+from roboai_cli.config.environment_constants import PACKAGE_NAME
+from roboai_cli.config.store.utils import getConfigDir
+from roboai_cli.util.runtime_logs import CURSOR_MARKER_SIZE, LogCursor, parse_log_timestamp
+
+LOG_STORE_INDEX_FILE_NAME = "index.json"
+LOG_STORE_VERSION = 1
+SEGMENT_SIZE = 4 * 1024 * 1024
+MAX_STORE_SIZE = 64 * 1024 * 1024
+# number of lines between two entries of the timestamp index of a segment
+INDEX_INTERVAL = 256
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+
+def format_timestamp(timestamp: datetime) -> str:
+    return timestamp.strftime(TIMESTAMP_FORMAT)
+
+
+def parse_timestamp(timestamp: str) -> datetime:
+    return datetime.strptime(timestamp, TIMESTAMP_FORMAT)
+
+
+class LogStore:
+    """
+    Append only store of the log lines of a bot runtime.
+    """
+
+    def __init__(self, directory: str, segment_size: int = SEGMENT_SIZE, max_size: int = MAX_STORE_SIZE):
+        self.__directory = directory
+        self.__index_path = join(directory, LOG_STORE_INDEX_FILE_NAME)
+        self.__segment_size = segment_size
+        self.__max_size = max_size
+        self.__segments = []
+        self.__marker = []
+        self.__load()
+
+    @property
+    def marker(self) -> List[str]:
+        """
+        Last lines stored.
+        """
+        return list(self.__marker)
+
+    @property
+    def size(self) -> int:
+        return sum(segment["size"] for segment in self.__segments)
+
+    def advance(self, lines: List[str]) -> List[str]:
+        """
+        Store the lines of a log buffer which were not stored yet.
+
+        Args:
+            lines: the log buffer fetched from the platform
+
+        Returns:
+            List[str]: the new lines
+        """
+        cursor = LogCursor(self.__marker)
+        new_lines = cursor.advance(lines)
+        if new_lines:
+            self.append(new_lines, cursor.marker)
+        return new_lines
+
+    def append(self, lines: List[str], marker: List[str] = None):
+        """
+        Append lines to the store, starting new segments as needed, and save the index.
+
+        Args:
+            lines: the lines to append
+            marker: the last lines of the log buffer, the last lines appended by default
+        """
+        os.makedirs(self.__directory, exist_ok=True)
+        position = 0
+        while position < len(lines):
+            segment = self.__segments[-1] if self.__segments else None
+            if segment is None or segment["size"] >= self.__segment_size:
+                segment = self.__create_segment()
+            position = self.__write(segment, lines, position)
+
+        self.__marker = list(marker) if marker is not None else (self.__marker + lines)[-CURSOR_MARKER_SIZE:]
+        self.__remove_old_segments()
+        self.__save()
+
+    def query(self, start: datetime = None, end: datetime = None, pattern: str = None) -> Iterator[str]:
+        """
+        Get the stored lines logged between `start` and `end`, and matching a regular expression.
+        Lines without timestamp belong to the line before them.
+        """
+        regex = re.compile(pattern) if pattern else None
+        keep = start is None
+        for segment in self.__segments:
+            if end is not None and segment["first"] is not None and parse_timestamp(segment["first"]) > end:
+                return
+            if start is not None and segment["last"] is not None and parse_timestamp(segment["last"]) < start:
+                keep = False
+                continue
+
+            offset = self.__get_offset(segment, start)
+            with open(self.__get_path(segment), "rb") as f:
+                f.seek(offset)
+                for data in f:
+                    if offset >= segment["size"]:
+                        break
+                    offset += len(data)
+                    line = data.decode("utf-8", "replace").rstrip("\n")
+                    timestamp = parse_log_timestamp(line)
+                    if timestamp is not None:
+                        if end is not None and timestamp > end:
+                            return
+                        keep = start is None or timestamp >= start
+                    if keep and (regex is None or regex.search(line)):
+                        yield line
+
+    def __write(self, segment: dict, lines: List[str], position: int) -> int:
+        """
+        Write lines to a segment until it is full.
+
+        Returns:
+            int: position of the first line not written
+        """
+        with open(self.__get_path(segment), "r+b") as f:
+            # anything written after the last index update belongs to an interrupted append
+            f.seek(segment["size"])
+            f.truncate()
+            while position < len(lines) and segment["size"] < self.__segment_size:
+                line = lines[position]
+                timestamp = parse_log_timestamp(line)
+                if timestamp is not None:
+                    formatted_timestamp = format_timestamp(timestamp)
+                    if segment["first"] is None:
+                        segment["first"] = formatted_timestamp
+                    segment["last"] = formatted_timestamp
+                    if not segment["index"] or segment["lines"] - segment["indexed_line"] >= INDEX_INTERVAL:
+                        segment["index"].append([formatted_timestamp, segment["size"]])
+                        segment["indexed_line"] = segment["lines"]
+                data = (line + "\n").encode("utf-8")
+                f.write(data)
+                segment["size"] += len(data)
+                segment["lines"] += 1
+                position += 1
+        return position
+
+    def __get_offset(self, segment: dict, start: Optional[datetime]) -> int:
+        """
+        Get the offset of the last indexed line logged before `start`.
+        """
+        if start is None or not segment["index"]:
+            return 0
+        timestamps = [parse_timestamp(timestamp) for timestamp, _ in segment["index"]]
+        position = bisect.bisect_left(timestamps, start)
+        return segment["index"][position - 1][1] if position else 0
+
+    def __get_path(self, segment: dict) -> str:
+        return join(self.__directory, segment["name"])
+
+    def __create_segment(self) -> dict:
+        number = int(self.__segments[-1]["name"].split(".")[0]) + 1 if self.__segments else 1
+        segment = {"name": "{0:08d}.log".format(number), "size": 0, "lines": 0, "first": None, "last": None,
+                   "index": [], "indexed_line": 0}
+        open(self.__get_path(segment), "wb").close()
+        self.__segments.append(segment)
+        return segment
+
+    def __remove_old_segments(self):
+        while len(self.__segments) > 1 and self.size > self.__max_size:
+            segment = self.__segments.pop(0)
+            if os.path.exists(self.__get_path(segment)):
+                os.remove(self.__get_path(segment))
+
+    def __load(self):
+        if not os.path.isfile(self.__index_path):
+            return
+        try:
+            with open(self.__index_path) as f:
+                content = json.load(f)
+        except ValueError:
+            return
+        if content.get("version") != LOG_STORE_VERSION:
+            return
+        self.__segments = [segment for segment in content.get("segments", [])
+                           if os.path.isfile(self.__get_path(segment))]
+        self.__marker = content.get("marker", [])
+
+    def __save(self):
+        content = {"version": LOG_STORE_VERSION, "marker": self.__marker, "segments": self.__segments}
+        file_descriptor, temp_path = tempfile.mkstemp(suffix=".partial", dir=self.__directory)
+        with os.fdopen(file_descriptor, "w") as f:
+            json.dump(content, f)
+        os.replace(temp_path, self.__index_path)
+
+
+def get_log_store_dir(bot_uuid: str) -> str:
+    return join(getConfigDir(), PACKAGE_NAME, "logs", bot_uuid)
+
+
+def get_log_store(bot_uuid: str) -> LogStore:
+    return LogStore(get_log_store_dir(bot_uuid))
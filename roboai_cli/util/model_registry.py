@@ -0,0 +1,246 @@
+import hashlib
+import json
+import os
+import re
+import tarfile
+import tempfile
+from datetime import datetime
+from os.path import join
+from typing import List, NamedTuple, Optional
+
+import click
+
+MODEL_REGISTRY_FILE_NAME = ".model-registry.json"
+MODEL_REGISTRY_VERSION = 1
+MODEL_EXTENSION = ".tar.gz"
+FINGERPRINT_FILE_NAME = "fingerprint.json"
+# fingerprint keys which change on every training, even when the training data and configuration are the same
+VOLATILE_FINGERPRINT_KEYS = ["trained_at"]
+MODEL_TIMESTAMP_PATTERN = re.compile(r"(\d{8}-\d{6})")
+
+FULL_MODEL = "full"
+NLU_MODEL = "nlu"
+CORE_MODEL = "core"
+
+
+class ModelInfo(NamedTuple):
+    """
+    A trained model as recorded in the model registry.
+    """
+    name: str
+    language: Optional[str]
+    type: str
+    fingerprint: Optional[str]
+    size: int
+    created: float
+    mtime_ns: int
+
+
+def read_model_info(path: str, language: str = None) -> ModelInfo:
+    """
+    Read the information of a model tarball without extracting it.
+    The tarball is streamed, its fingerprint.json member is read and its top level directories
+    tell whether it is a NLU, core or full model. The fingerprint is the digest of the fingerprint.json content,
+    leaving out the training time, so that models trained from the same data and configuration share it.
+    """
+    stat = os.stat(path)
+    fingerprint = None
+    created = None
+    top_level_dirs = set()
+    try:
+        with tarfile.open(path, mode="r|gz") as model_tar:
+            for member in model_tar:
+                name = member.name[2:] if member.name.startswith("./") else member.name
+                top_level_dirs.add(name.split("/")[0])
+                if name == FINGERPRINT_FILE_NAME:
+                    content = json.load(model_tar.extractfile(member))
+                    created = content.get("trained_at")
+                    content = {key: value for key, value in content.items() if key not in VOLATILE_FINGERPRINT_KEYS}
+                    fingerprint = hashlib.sha256(json.dumps(content, sort_keys=True).encode("utf-8")).hexdigest()
+                # the rest of the stream, the model data, is not decompressed once the type is known for sure
+                if fingerprint and {NLU_MODEL, CORE_MODEL} <= top_level_dirs:
+                    break
+    except (tarfile.TarError, OSError, ValueError):
+        pass
+
+    if NLU_MODEL in top_level_dirs and CORE_MODEL not in top_level_dirs:
+        model_type = NLU_MODEL
+    elif CORE_MODEL in top_level_dirs and NLU_MODEL not in top_level_dirs:
+        model_type = CORE_MODEL
+    else:
+        model_type = FULL_MODEL
+    if not isinstance(created, (int, float)):
+        created = get_name_timestamp(os.path.basename(path)) or stat.st_mtime
+    return ModelInfo(os.path.basename(path), language, model_type, fingerprint, stat.st_size, created,
+                     stat.st_mtime_ns)
+
+
+def get_name_timestamp(name: str) -> Optional[float]:
+    match = MODEL_TIMESTAMP_PATTERN.search(name)
+    if not match:
+        return None
+    try:
+        return datetime.strptime(match.group(1), "%Y%m%d-%H%M%S").timestamp()
+    except ValueError:
+        return None
+
+
+class ModelRegistry:
+    """
+    Index of the models trained for a bot (language), stored next to its models directory.
+
+    The index keeps the latest model and maps every fingerprint to its latest model, so both lookups
+    are constant time. The models directory is only listed again when its modification time changed,
+    i.e. when models were added or removed, and only the new tarballs are read.
+    Models are ordered by their training time, read from their fingerprint, rather than by file times
+    which do not survive a checkout or a copy.
+    """
+
+    def __init__(self, models_dir: str):
+        self.__models_dir = models_dir
+        self.__path = join(os.path.dirname(models_dir), MODEL_REGISTRY_FILE_NAME)
+        self.__language = get_models_language(models_dir)
+        self.__models = {}
+        self.__latest = None
+        self.__fingerprints = {}
+        self.__load()
+
+    @property
+    def models(self) -> List[ModelInfo]:
+        """
+        Registered models, from the latest to the oldest.
+        """
+        return sorted(self.__models.values(), key=lambda model: (model.created, model.name), reverse=True)
+
+    def get_path(self, model: ModelInfo) -> str:
+        return join(self.__models_dir, model.name)
+
+    def get_latest(self) -> Optional[ModelInfo]:
+        return self.__models.get(self.__latest)
+
+    def get_by_fingerprint(self, fingerprint: str) -> Optional[ModelInfo]:
+        return self.__models.get(self.__fingerprints.get(fingerprint))
+
+    def get_by_name(self, name: str) -> Optional[ModelInfo]:
+        return self.__models.get(name)
+
+    def prune(self, keep: int = None, max_bytes: int = None, dry_run: bool = False) -> List[ModelInfo]:
+        """
+        Remove the oldest models, keeping at most `keep` models and `max_bytes` bytes of models.
+        The latest model is never removed.
+
+        Returns:
+            List[ModelInfo]: removed models
+        """
+        models = self.models
+        kept = models[:max(keep, 1)] if keep is not None else models[:]
+        if max_bytes is not None:
+            total_size = sum(model.size for model in kept)
+            while len(kept) > 1 and total_size > max_bytes:
+                total_size -= kept.pop().size
+        removed = [model for model in models if model not in kept]
+        if dry_run or not removed:
+            return removed
+
+        for model in removed:
+            path = self.get_path(model)
+            if os.path.exists(path):
+                os.remove(path)
+            del self.__models[model.name]
+        self.__update_indexes()
+        self.__save()
+        return removed
+
+    def __load(self):
+        content = {}
+        if os.path.isfile(self.__path):
+            try:
+                with open(self.__path) as f:
+                    content = json.load(f)
+            except ValueError:
+                content = {}
+        if content.get("version") == MODEL_REGISTRY_VERSION:
+            self.__models = {name: ModelInfo(**model) for name, model in content.get("models", {}).items()}
+            self.__latest = content.get("latest")
+            self.__fingerprints = content.get("fingerprints", {})
+
+        if not os.path.isdir(self.__models_dir):
+            self.__models, self.__latest, self.__fingerprints = {}, None, {}
+            return
+        if content.get("version") != MODEL_REGISTRY_VERSION \
+                or content.get("directory_mtime_ns") != os.stat(self.__models_dir).st_mtime_ns:
+            self.__sync()
+
+    def __sync(self):
+        models = {}
+        with os.scandir(self.__models_dir) as entries:
+            for entry in entries:
+                if not entry.is_file() or not entry.name.endswith(MODEL_EXTENSION):
+                    continue
+                stat = entry.stat()
+                model = self.__models.get(entry.name)
+                if model is None or model.size != stat.st_size or model.mtime_ns != stat.st_mtime_ns:
+                    model = read_model_info(entry.path, self.__language)
+                models[entry.name] = model
+        self.__models = models
+        self.__update_indexes()
+        self.__save()
+
+    def __update_indexes(self):
+        models = self.models
+        self.__latest = models[0].name if models else None
+        self.__fingerprints = {}
+        for model in reversed(models):
+            if model.fingerprint:
+                self.__fingerprints[model.fingerprint] = model.name
+
+    def __save(self):
+        content = {
+            "version": MODEL_REGISTRY_VERSION,
+            "directory_mtime_ns": os.stat(self.__models_dir).st_mtime_ns,
+            "latest": self.__latest,
+            "fingerprints": self.__fingerprints,
+            "models": {name: model._asdict() for name, model in self.__models.items()},
+        }
+        try:
+            file_descriptor, temp_path = tempfile.mkstemp(suffix=".partial", dir=os.path.dirname(self.__path))
+            with os.fdopen(file_descriptor, "w") as f:
+                json.dump(content, f, indent=4, sort_keys=True)
+            os.replace(temp_path, self.__path)
+        except OSError:
+            # the registry is only an index, the models can still be used when it cannot be written
+            pass
+
+
+def get_models_language(models_dir: str) -> Optional[str]:
+    """
+    Get the language of the models stored in languages/<language>/models, None for a single language bot.
+    """
+    language_dir = os.path.dirname(os.path.abspath(models_dir))
+    if os.path.basename(os.path.dirname(language_dir)) != "languages":
+        return None
+    return os.path.basename(language_dir)
+
+
+def get_model_registry(language_dir: str) -> ModelRegistry:
+    return ModelRegistry(join(language_dir, "models"))
+
+
+def parse_size(size: str) -> int:
+    """
+    Parse a size such as 500M, 2G or 1048576 into a number of bytes.
+    """
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+    size = size.strip().upper().rstrip("B")
+    if size and size[-1] in units:
+        return int(float(size[:-1]) * units[size[-1]])
+    return int(size)
+
+
+def get_latest_model_path(language_dir: str) -> str:
+    model_registry = get_model_registry(language_dir)
+    latest_model = model_registry.get_latest()
+    if not latest_model:
+        raise click.UsageError("No model was found in {0}. Please train the bot first.".format(
+            join(language_dir, "models")))
+    return model_registry.get_path(latest_model)
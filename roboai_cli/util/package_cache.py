@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+from os.path import join
+from typing import List
+
+from roboai_cli.util.archive import RawSource
+
+PACKAGE_CACHE_FILE_NAME = "package-cache.json"
+PACKAGE_CACHE_VERSION = 2
+
+
+def get_file_digest(path: str, block_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PackageCache:
+    """
+    Content addressed cache of the entries of the last package built in a build directory.
+
+    It keeps the digest of every packaged file, so that the compressed data of unchanged files can be
+    copied as is from the previous package instead of being compressed again.
+    File digests are only recomputed when the file size or modification time changes.
+    The cache is discarded whenever the previous package was not written along with it
+    or was compressed with another compression level.
+    """
+
+    def __init__(self, build_dir: str, package_file_path: str, level: int):
+        self.__path = join(build_dir, PACKAGE_CACHE_FILE_NAME)
+        self.__package_file_path = package_file_path
+        self.__level = level
+        self.__files = {}
+        self.__current_files = {}
+        self.__entries = {}
+        self.__reused = 0
+        self.__previous_entries = {}
+        self.__previous_infos = {}
+        self.__load()
+
+    def resolve(self, plan: List[tuple]) -> List[tuple]:
+        """
+        Replace the sources of the plan entries whose content is already compressed in the previous package
+        with RawSource objects pointing to that compressed data.
+
+        Args:
+            plan: (source, arcname) entries to be packaged
+
+        Returns:
+            list: (source, arcname) entries, where the source is either a path, in memory content or a RawSource.
+                  Entries which are already RawSource objects are kept as they are.
+        """
+        digest_to_arcname = {digest: arcname for arcname, digest in self.__previous_entries.items()
+                             if arcname in self.__previous_infos}
+        entries = []
+        for source, arcname in plan:
+            if arcname.endswith("/") or not isinstance(source, str):
+                entries.append((source, arcname))
+                continue
+            digest = self.__get_digest(source)
+            self.__entries[arcname] = digest
+            previous_arcname = digest_to_arcname.get(digest)
+            if previous_arcname:
+                self.__reused += 1
+                entries.append((RawSource(source, self.__package_file_path,
+                                          self.__previous_infos[previous_arcname]), arcname))
+            else:
+                entries.append((source, arcname))
+        return entries
+
+    @property
+    def reused_count(self) -> int:
+        return self.__reused
+
+    def save(self):
+        """
+        Persist the cache, it must be called once the new package is written in place.
+        """
+        stat = os.stat(self.__package_file_path)
+        content = {
+            "version": PACKAGE_CACHE_VERSION,
+            "package": {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "level": self.__level},
+            "files": self.__current_files,
+            "entries": self.__entries,
+        }
+        file_descriptor, temp_path = tempfile.mkstemp(suffix=".partial", dir=os.path.dirname(self.__path) or ".")
+        with os.fdopen(file_descriptor, "w") as f:
+            json.dump(content, f)
+        os.replace(temp_path, self.__path)
+
+    def __get_digest(self, path: str) -> str:
+        stat = os.stat(path)
+        cached = self.__files.get(path)
+        if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+            digest = cached["digest"]
+        else:
+            digest = get_file_digest(path)
+        self.__current_files[path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "digest": digest}
+        return digest
+
+    def __load(self):
+        if not os.path.isfile(self.__path):
+            return
+        try:
+            with open(self.__path) as f:
+                content = json.load(f)
+        except ValueError:
+            return
+        if content.get("version") != PACKAGE_CACHE_VERSION:
+            return
+        self.__files = content.get("files", {})
+
+        if not os.path.isfile(self.__package_file_path):
+            return
+        stat = os.stat(self.__package_file_path)
+        package = content.get("package", {})
+        if package.get("size") != stat.st_size or package.get("mtime_ns") != stat.st_mtime_ns \
+                or package.get("level") != self.__level:
+            return
+        try:
+            with zipfile.ZipFile(self.__package_file_path) as package_zip:
+                self.__previous_infos = {info.filename: info for info in package_zip.infolist()}
+        except zipfile.BadZipFile:
+            return
+        self.__previous_entries = content.get("entries", {})
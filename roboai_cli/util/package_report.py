@@ -0,0 +1,123 @@
+import json
+import os
+from typing import Dict, List
+
+from roboai_cli.util.archive import ZIP_STORED
+
+PACKAGE_REPORT_FILE_NAME = "package-report.json"
+DEFAULT_TOP_ENTRIES = 10
+
+# packaging phases, in the order they happen
+PHASES = [
+    ("scanning", "Scanning and ignore matching"),
+    ("hashing", "Hashing (package cache)"),
+    ("reading", "Reading"),
+    ("compression", "Compression"),
+    ("writing", "Writing"),
+]
+
+
+def format_size(size: int) -> str:
+    for unit in ["B", "KB", "MB"]:
+        if size < 1024:
+            return "{0:.1f} {1}".format(size, unit) if unit != "B" else "{0} B".format(size)
+        size /= 1024
+    return "{0:.1f} GB".format(size)
+
+
+def get_ratio(size: int, compressed_size: int) -> float:
+    return compressed_size / size if size else 1.0
+
+
+class PackageReport:
+    """
+    Composition of a package, with the raw and compressed size of every file entry,
+    and the time spent in each packaging phase.
+    The compression time is summed over the compression workers, so it may exceed the elapsed time.
+    """
+
+    def __init__(self, package_file_path: str, entries: List[dict], timings: Dict[str, float]):
+        self.__package_file_path = package_file_path
+        self.__entries = entries
+        self.__timings = timings
+
+    @staticmethod
+    def from_members(package_file_path: str, members: list, copied_arcnames: set,
+                     timings: Dict[str, float]) -> "PackageReport":
+        entries = [{
+            "arcname": member.arcname,
+            "size": member.file_size,
+            "compressed_size": member.compress_size,
+            "ratio": round(get_ratio(member.file_size, member.compress_size), 4),
+            "method": "stored" if member.method == ZIP_STORED else "deflated",
+            "copied": member.arcname in copied_arcnames,
+        } for member in members if not member.is_dir]
+        return PackageReport(package_file_path, entries, timings)
+
+    @staticmethod
+    def load(path: str) -> "PackageReport":
+        with open(path) as f:
+            content = json.load(f)
+        return PackageReport(content["package"], content["entries"], content["timings"])
+
+    @property
+    def package_file_path(self) -> str:
+        return self.__package_file_path
+
+    @property
+    def entries(self) -> List[dict]:
+        return self.__entries
+
+    @property
+    def timings(self) -> Dict[str, float]:
+        return self.__timings
+
+    @property
+    def size(self) -> int:
+        return sum(entry["size"] for entry in self.__entries)
+
+    @property
+    def compressed_size(self) -> int:
+        return sum(entry["compressed_size"] for entry in self.__entries)
+
+    def get_top_entries(self, count: int = DEFAULT_TOP_ENTRIES) -> List[dict]:
+        return sorted(self.__entries, key=lambda entry: (-entry["compressed_size"], entry["arcname"]))[:count]
+
+    def to_dict(self) -> dict:
+        return {
+            "package": self.__package_file_path,
+            "size": self.size,
+            "compressed_size": self.compressed_size,
+            "ratio": round(get_ratio(self.size, self.compressed_size), 4),
+            "timings": self.__timings,
+            "entries": self.__entries,
+        }
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=4)
+
+    def format(self, top: int = DEFAULT_TOP_ENTRIES) -> str:
+        copied_count = sum(1 for entry in self.__entries if entry["copied"])
+        lines = [
+            "Package: {0}".format(self.__package_file_path),
+            "  {0} files, {1} uncompressed, {2} compressed ({3:.1%}), {4} copied without compressing them again"
+            .format(len(self.__entries), format_size(self.size), format_size(self.compressed_size),
+                    get_ratio(self.size, self.compressed_size), copied_count),
+            "",
+            "Largest entries:",
+            "  {0:>10}  {1:>10}  {2:>6}  {3}".format("Compressed", "Size", "Ratio", "Entry"),
+        ]
+        for entry in self.get_top_entries(top):
+            lines.append("  {0:>10}  {1:>10}  {2:>6.1%}  {3}".format(
+                format_size(entry["compressed_size"]), format_size(entry["size"]), entry["ratio"], entry["arcname"]
+            ))
+        lines += ["", "Phases:"]
+        for phase, label in PHASES:
+            if phase in self.__timings:
+                lines.append("  {0:<30}{1:>9.3f} s".format(label, self.__timings[phase]))
+        return "\n".join(lines)
+
+
+def get_package_report_path(package_file_path: str) -> str:
+    return os.path.join(os.path.dirname(package_file_path), PACKAGE_REPORT_FILE_NAME)
@@ -0,0 +1,274 @@
+import os
+import tempfile
+import threading
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from os.path import join, isdir, isfile
+from time import perf_counter
+from typing import Callable, Dict, List, NamedTuple, Union
+
+import click
+
+from roboai_cli.config.bot_manifest import BotManifest, MANIFEST_FILE
+from roboai_cli.util.archive import RawSource, ZipArchiveWriter
+from roboai_cli.util.botignore import BotIgnore
+from roboai_cli.util.cli import print_info, print_warning
+from roboai_cli.util.model_registry import ModelRegistry
+from roboai_cli.util.package_cache import PackageCache
+from roboai_cli.util.package_report import PackageReport
+
+try:
+    import fcntl
+except ImportError:
+    # no advisory file locks on Windows
+    fcntl = None
+
+BUILD_LOCK_FILE_NAME = ".build.lock"
+
+
+@contextmanager
+def lock_build_dir(build_dir: str):
+    """
+    Hold an exclusive advisory lock on a build directory for a whole build. The compressed entries of the previous
+    and shared archives are copied by offset, so another build must not replace these archives in the meantime.
+    """
+    os.makedirs(build_dir, exist_ok=True)
+    if fcntl is None:
+        yield
+        return
+    with open(join(build_dir, BUILD_LOCK_FILE_NAME), "a") as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+class PackageEntry(NamedTuple):
+    """
+    A single package artifact: where it is read from in the bot tree
+    and where it is stored inside the package archive.
+    Directory entries have an arcname ending with '/'.
+    Generated artifacts, like the packaged manifest, have their content as source,
+    and artifacts already compressed in another archive have a RawSource.
+    """
+    source: Union[str, bytes, RawSource]
+    arcname: str
+
+    @property
+    def is_dir(self) -> bool:
+        return self.arcname.endswith("/")
+
+
+def get_package_plan(bot_language_dir: str, bot_root_dir: str, model: str,
+                     bot_ignore: BotIgnore) -> List[PackageEntry]:
+    """
+    Build the list of artifacts to be packaged, mapping each file in the bot tree to its path in the archive.
+    The archive layout is the following:
+        actions/, custom/, data/ (including the shared stories.md file), models/<model>.tar.gz,
+        config.yml, credentials.yml, domain.yml, endpoints.yml, __init__.py, requirements.txt,
+        .botignore and robo-manifest.json
+    Artifacts ignored by the .botignore rules, matched against their path relative to the bot root directory,
+    are left out. Ignored directories are not walked.
+    Entries are sorted by arcname and the manifest is packaged without its deployment state,
+    so that the same bot tree always produces the same package.
+
+    Args:
+        bot_language_dir (str): directory of the bot (language) being packaged
+        bot_root_dir (str): root directory of the bot, where the shared files and the .botignore file are stored
+        model (str): path to the model to be packaged, if None the latest one is picked up
+        bot_ignore (BotIgnore): compiled .botignore rules
+
+    Returns:
+        List[PackageEntry]: artifacts to be packaged
+
+    Raises:
+        click.UsageError: if the model cannot be found
+    """
+    plan = {}
+
+    def relative_path(source: str) -> str:
+        return os.path.relpath(source, bot_root_dir).replace(os.path.sep, "/")
+
+    def add_file(source: str, arcname: str):
+        if not isfile(source):
+            print_warning("Couldn't find {0}, it will not be packaged.".format(source))
+            return
+        if not bot_ignore.is_ignored(relative_path(source)):
+            plan[arcname] = source
+
+    def add_dir(source: str, arcname: str):
+        if not isdir(source):
+            print_warning("Couldn't find {0}, it will not be packaged.".format(source))
+            return
+        relative_source = relative_path(source)
+        if bot_ignore.is_ignored(relative_source, is_dir=True):
+            return
+        plan[arcname + "/"] = source
+        for root, relative_root, dirs, files in bot_ignore.walk(source, relative_source):
+            archive_root = arcname + relative_root[len(relative_source):]
+            for directory in dirs:
+                plan[archive_root + "/" + directory + "/"] = join(root, directory)
+            for file in files:
+                plan[archive_root + "/" + file] = join(root, file)
+
+    models_dir = join(bot_language_dir, "models")
+    if model:
+        model_path = join(models_dir, model.split("/")[-1])
+        if not isfile(model_path):
+            raise click.UsageError("The model {0} could not be found.".format(model_path))
+    else:
+        model_registry = ModelRegistry(models_dir)
+        latest_model = model_registry.get_latest()
+        if not latest_model:
+            raise click.UsageError("No model was found in {0}. Please train the bot first.".format(models_dir))
+        model_path = model_registry.get_path(latest_model)
+
+    add_dir(join(bot_root_dir, "actions"), "actions")
+    add_dir(join(bot_language_dir, "data"), "data")
+    add_file(join(bot_root_dir, "languages", "stories.md"), "data/stories.md")
+    if isdir(models_dir) and not bot_ignore.is_ignored(relative_path(models_dir), is_dir=True):
+        plan["models/"] = models_dir
+    add_file(model_path, "models/" + os.path.basename(model_path))
+    add_dir(join(bot_root_dir, "custom"), "custom")
+    add_file(join(bot_language_dir, "config.yml"), "config.yml")
+    add_file(join(bot_root_dir, "credentials.yml"), "credentials.yml")
+    add_file(join(bot_language_dir, "domain.yml"), "domain.yml")
+    add_file(join(bot_root_dir, "endpoints.yml"), "endpoints.yml")
+    add_file(join(bot_root_dir, "__init__.py"), "__init__.py")
+    add_file(join(bot_root_dir, "requirements.txt"), "requirements.txt")
+    add_file(join(bot_root_dir, ".botignore"), ".botignore")
+    add_file(join(bot_language_dir, MANIFEST_FILE), MANIFEST_FILE)
+    if MANIFEST_FILE in plan:
+        plan[MANIFEST_FILE] = BotManifest(bot_language_dir).get_packaged_content()
+
+    return [PackageEntry(plan[arcname], arcname) for arcname in sorted(plan)]
+
+
+def get_entry_size(source: Union[str, bytes, RawSource], arcname: str) -> int:
+    if arcname.endswith("/"):
+        return 0
+    if isinstance(source, RawSource):
+        return source.info.file_size
+    if isinstance(source, bytes):
+        return len(source)
+    return os.path.getsize(source)
+
+
+def write_package(plan: List[PackageEntry], package_file_path: str, jobs: int = 1,
+                  level: int = zlib.Z_DEFAULT_COMPRESSION,
+                  progress_callback: Callable[[int], None] = None) -> PackageReport:
+    """
+    Stream every artifact of the plan straight from the bot tree into the package archive.
+    The compressed data of the files which did not change since the previous package is copied from it as is.
+    Files which are already compressed, like the model, are stored without being deflated again.
+    The archive is written into a temporary file which replaces the package once complete.
+
+    Args:
+        plan (List[PackageEntry]): artifacts to be packaged
+        package_file_path (str): path of the package archive to be written
+        jobs (int): number of compression workers, 0 uses all the available cores
+        level (int): deflate compression level, from 0 (no compression) to 9
+        progress_callback: called with the number of uncompressed bytes written,
+                           if None a progress bar is displayed
+
+    Returns:
+        PackageReport: composition of the package and time spent in each phase
+    """
+    start = perf_counter()
+    cache = PackageCache(os.path.dirname(package_file_path), package_file_path, level)
+    entries = cache.resolve(plan)
+    hashing_time = perf_counter() - start
+
+    file_descriptor, partial_file_path = tempfile.mkstemp(suffix=".partial",
+                                                          dir=os.path.dirname(package_file_path) or ".")
+    os.close(file_descriptor)
+    try:
+        with ZipArchiveWriter(partial_file_path, level=level, jobs=jobs) as package_zip:
+            if progress_callback:
+                package_zip.write(entries, progress_callback=progress_callback)
+            else:
+                total_size = sum(get_entry_size(source, arcname) for source, arcname in entries)
+                with click.progressbar(length=total_size, label="Creating bot runtime package") as bar:
+                    package_zip.write(entries, progress_callback=bar.update)
+    except BaseException:
+        if os.path.exists(partial_file_path):
+            os.remove(partial_file_path)
+        raise
+    os.replace(partial_file_path, package_file_path)
+    cache.save()
+
+    if cache.reused_count and not progress_callback:
+        print_info("Reused {0} unchanged entries from the previous package.".format(cache.reused_count))
+    timings = {"hashing": hashing_time}
+    timings.update(package_zip.timings)
+    copied_arcnames = {arcname for source, arcname in entries if isinstance(source, RawSource)}
+    return PackageReport.from_members(package_file_path, package_zip.members, copied_arcnames, timings)
+
+
+def get_shared_entries(plans: List[List[PackageEntry]]) -> List[PackageEntry]:
+    """
+    Get the file entries packaged the same way, from the same source, in every plan.
+    """
+    if len(plans) < 2:
+        return []
+    common_entries = set(plans[0]).intersection(*plans[1:])
+    return [entry for entry in plans[0]
+            if entry in common_entries and not entry.is_dir and isinstance(entry.source, str)]
+
+
+def write_packages(plans: Dict[str, List[PackageEntry]], package_file_paths: Dict[str, str],
+                   shared_package_file_path: str, jobs: int = 1,
+                   level: int = zlib.Z_DEFAULT_COMPRESSION) -> Dict[str, PackageReport]:
+    """
+    Write several packages concurrently, one per plan.
+    Files shared by every plan, such as the actions and the custom components, are compressed only once
+    into a shared archive, their compressed data is then copied as is into every package.
+
+    Args:
+        plans (Dict[str, List[PackageEntry]]): artifacts to be packaged, by package name
+        package_file_paths (Dict[str, str]): path of the package archive to be written, by package name
+        shared_package_file_path (str): path of the archive holding the shared files
+        jobs (int): number of compression workers per package, 0 uses all the available cores
+        level (int): deflate compression level, from 0 (no compression) to 9
+
+    Returns:
+        Dict[str, PackageReport]: composition of every package, by package name.
+                                  The shared files compression is accounted in the shared archive report,
+                                  stored under the shared archive path.
+    """
+    shared_entries = get_shared_entries(list(plans.values()))
+    total_size = sum(get_entry_size(source, arcname) for source, arcname in shared_entries) + \
+        sum(get_entry_size(source, arcname) for plan in plans.values() for source, arcname in plan)
+    lock = threading.Lock()
+    reports = {}
+
+    with click.progressbar(length=total_size, label="Creating bot runtime packages") as bar:
+        def on_bytes_written(size: int):
+            with lock:
+                bar.update(size)
+
+        shared_sources = {}
+        if shared_entries:
+            os.makedirs(os.path.dirname(shared_package_file_path), exist_ok=True)
+            reports[shared_package_file_path] = write_package(shared_entries, shared_package_file_path, jobs, level,
+                                                              on_bytes_written)
+            with zipfile.ZipFile(shared_package_file_path) as shared_zip:
+                infos = {info.filename: info for info in shared_zip.infolist()}
+            shared_sources = {entry: RawSource(entry.source, shared_package_file_path, infos[entry.arcname])
+                              for entry in shared_entries}
+
+        with ThreadPoolExecutor(max_workers=len(plans)) as pool:
+            futures = {name: pool.submit(write_package,
+                                         [PackageEntry(shared_sources.get(entry, entry.source), entry.arcname)
+                                          for entry in plan],
+                                         package_file_paths[name], jobs, level, on_bytes_written)
+                       for name, plan in plans.items()}
+            for name, future in futures.items():
+                reports[name] = future.result()
+
+    if shared_entries:
+        print_info("Compressed {0} shared entries once for {1} packages.".format(len(shared_entries), len(plans)))
+    return reports
@@ -0,0 +1,358 @@
+"""
+Background daemon running Rasa jobs in an interpreter where Rasa is already imported.
+
+Every Rasa command pays several seconds of imports, and a shell also pays the loading of its model, before doing
+any work. The daemon imports Rasa once and runs the jobs the commands send it over a unix socket, one at a time,
+keeping the agents of the last used models loaded. Each Rasa command runs in a child forked from the daemon, so it
+starts with Rasa already imported while its output, working directory and state stay its own. The commands run Rasa
+in a subprocess when no daemon is running.
+
+The requests and the responses are JSON objects, one per line. A run request gets the output of the Rasa command
+and then its exit code, a message request gets the responses of the bot to a user message.
+"""
+import codecs
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import traceback
+from collections import OrderedDict
+from os.path import join
+from typing import Callable, Iterator, List, Optional
+
+import click
+
+from roboai_cli.config.environment_constants import PACKAGE_NAME
+from roboai_cli.config.store.utils import getConfigDir
+
+DAEMON_SOCKET_FILE_NAME = "rasa-daemon.sock"
+DEFAULT_MODEL_CACHE_SIZE = 3
+ENCODING = "utf-8"
+OUTPUT_BLOCK_SIZE = 64 * 1024
+
+RUN_REQUEST = "run"
+MESSAGE_REQUEST = "message"
+STATUS_REQUEST = "status"
+STOP_REQUEST = "stop"
+
+# commands reading the user input, which the daemon cannot pass on to them
+INTERACTIVE_COMMANDS = ("shell", "interactive")
+
+
+class DaemonError(Exception):
+    pass
+
+
+def get_daemon_socket_path() -> str:
+    return join(getConfigDir(), PACKAGE_NAME, DAEMON_SOCKET_FILE_NAME)
+
+
+def is_daemon_supported() -> bool:
+    return hasattr(socket, "AF_UNIX") and hasattr(os, "fork")
+
+
+def connect_daemon() -> Optional[socket.socket]:
+    """
+    Connect to the running daemon, None when no daemon is running.
+    """
+    socket_path = get_daemon_socket_path()
+    if not is_daemon_supported() or not os.path.exists(socket_path):
+        return None
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(socket_path)
+    except OSError:
+        # the socket of a daemon which did not exit cleanly
+        connection.close()
+        return None
+    return connection
+
+
+def is_daemon_running() -> bool:
+    connection = connect_daemon()
+    if connection is None:
+        return False
+    connection.close()
+    return True
+
+
+def request_daemon(request: dict, timeout: float = None) -> Optional[Iterator[dict]]:
+    """
+    Send a request to the running daemon.
+
+    Returns:
+        Optional[Iterator[dict]]: the responses of the daemon as they arrive, None when no daemon is running
+    """
+    connection = connect_daemon()
+    if connection is None:
+        return None
+    return read_responses(connection, request, timeout)
+
+
+def read_responses(connection: socket.socket, request: dict, timeout: float = None) -> Iterator[dict]:
+    with connection:
+        connection.settimeout(timeout)
+        connection.sendall((json.dumps(request) + "\n").encode(ENCODING))
+        with connection.makefile("r", encoding=ENCODING) as stream:
+            for line in stream:
+                response = json.loads(line)
+                if "error" in response:
+                    raise DaemonError(response["error"])
+                yield response
+
+
+def run_rasa(args: List[str]) -> int:
+    """
+    Run a Rasa command in the daemon when one is running, in a subprocess otherwise.
+    Interactive commands always run in a subprocess, reading the input of the user.
+
+    Args:
+        args (List[str]): arguments of the rasa command, such as ["train", "--out", "models"]
+
+    Returns:
+        int: exit code of the command
+    """
+    if args[:1] and args[0] in INTERACTIVE_COMMANDS:
+        return subprocess.call(["rasa"] + args)
+    responses = request_daemon({"type": RUN_REQUEST, "args": args, "cwd": os.getcwd()})
+    if responses is None:
+        return subprocess.call(["rasa"] + args)
+
+    exit_code = 1
+    try:
+        for response in responses:
+            if "output" in response:
+                sys.stdout.write(response["output"])
+                sys.stdout.flush()
+            elif "exit_code" in response:
+                exit_code = response["exit_code"]
+    except (DaemonError, OSError, ValueError) as e:
+        raise click.ClickException("The Rasa daemon failed to run the command: {0}".format(e))
+    return exit_code
+
+
+def send_message(model_path: str, endpoints_path: str, sender_id: str, text: str,
+                 timeout: float = None) -> Optional[List[dict]]:
+    """
+    Get the responses of a model to a user message from the daemon, None when no daemon is running.
+    """
+    responses = request_daemon({"type": MESSAGE_REQUEST, "model": model_path, "endpoints": endpoints_path,
+                                "sender": sender_id, "text": text}, timeout)
+    if responses is None:
+        return None
+    try:
+        for response in responses:
+            if "responses" in response:
+                return response["responses"]
+    except (DaemonError, OSError, ValueError) as e:
+        raise click.ClickException("The Rasa daemon failed to handle the message: {0}".format(e))
+    raise click.ClickException("The Rasa daemon stopped before handling the message.")
+
+
+class ModelCache:
+    """
+    Least recently used cache of loaded models, keyed by their path, modification time and endpoints,
+    so that a model replaced on disk is loaded again.
+    """
+
+    def __init__(self, load: Callable[[str, Optional[str]], object], max_size: int = DEFAULT_MODEL_CACHE_SIZE):
+        self.__load = load
+        self.__max_size = max_size
+        self.__models = OrderedDict()
+
+    @property
+    def model_paths(self) -> List[str]:
+        """
+        Paths of the loaded models, from the least to the most recently used.
+        """
+        return [key[0] for key in self.__models]
+
+    def get(self, model_path: str, endpoints_path: str = None):
+        key = (model_path, os.stat(model_path).st_mtime_ns, endpoints_path)
+        if key in self.__models:
+            self.__models.move_to_end(key)
+            return self.__models[key]
+
+        model = self.__load(model_path, endpoints_path)
+        self.__models[key] = model
+        while len(self.__models) > self.__max_size:
+            self.__models.popitem(last=False)
+        return model
+
+
+class RasaDaemon:
+    """
+    Unix socket server handling one request at a time.
+    """
+
+    def __init__(self, socket_path: str, model_cache: ModelCache, run_command: Callable[[List[str]], int],
+                 handle_message: Callable[[object, str, str], List[dict]]):
+        self.__socket_path = socket_path
+        self.__model_cache = model_cache
+        self.__run_command = run_command
+        self.__handle_message = handle_message
+        self.__started = time.time()
+        self.__job_count = 0
+        self.__stopped = False
+
+        os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        self.__server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.__server.bind(socket_path)
+        # only the user running the daemon can send it jobs
+        os.chmod(socket_path, 0o600)
+        self.__server.listen()
+
+    def serve(self):
+        try:
+            while not self.__stopped:
+                connection, _ = self.__server.accept()
+                with connection:
+                    self.__handle(connection)
+        finally:
+            self.__server.close()
+            if os.path.exists(self.__socket_path):
+                os.remove(self.__socket_path)
+
+    def __handle(self, connection: socket.socket):
+        with connection.makefile("rw", encoding=ENCODING) as stream:
+            def respond(response: dict):
+                stream.write(json.dumps(response) + "\n")
+                stream.flush()
+
+            try:
+                request = json.loads(stream.readline())
+                handlers = {
+                    RUN_REQUEST: self.__run,
+                    MESSAGE_REQUEST: self.__message,
+                    STATUS_REQUEST: self.__status,
+                    STOP_REQUEST: self.__stop,
+                }
+                if request.get("type") not in handlers:
+                    raise DaemonError("Unknown request type '{0}'.".format(request.get("type")))
+                handlers[request["type"]](request, respond)
+            except OSError:
+                # the client went away, there is nobody to answer to
+                pass
+            except Exception as e:
+                # a failing job must not stop the daemon
+                try:
+                    respond({"error": str(e) or type(e).__name__})
+                except OSError:
+                    pass
+
+    def __run(self, request: dict, respond: Callable[[dict], None]):
+        self.__job_count += 1
+        args, working_dir = request["args"], request.get("cwd") or os.getcwd()
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 1
+            try:
+                os.close(read_fd)
+                exit_code = run_job(self.__run_command, args, working_dir, write_fd)
+            finally:
+                # the child must not go back to serving requests
+                os._exit(exit_code)
+
+        os.close(write_fd)
+        try:
+            decoder = codecs.getincrementaldecoder(ENCODING)(errors="replace")
+            with os.fdopen(read_fd, "rb") as output:
+                for data in iter(lambda: output.read1(OUTPUT_BLOCK_SIZE), b""):
+                    respond({"output": decoder.decode(data)})
+        except BaseException:
+            # nobody reads the output of the job anymore
+            os.kill(pid, signal.SIGTERM)
+            raise
+        finally:
+            _, status = os.waitpid(pid, 0)
+        respond({"exit_code": os.WEXITSTATUS(status) if os.WIFEXITED(status) else 1})
+
+    def __message(self, request: dict, respond: Callable[[dict], None]):
+        self.__job_count += 1
+        model = self.__model_cache.get(request["model"], request.get("endpoints"))
+        respond({"responses": self.__handle_message(model, request["sender"], request["text"]) or []})
+
+    def __status(self, request: dict, respond: Callable[[dict], None]):
+        respond({"pid": os.getpid(), "uptime": time.time() - self.__started, "jobs": self.__job_count,
+                 "models": self.__model_cache.model_paths})
+
+    def __stop(self, request: dict, respond: Callable[[dict], None]):
+        self.__stopped = True
+        respond({"stopped": True})
+
+
+def run_job(run_command: Callable[[List[str]], int], args: List[str], working_dir: str, output_fd: int) -> int:
+    """
+    Run a Rasa command in the child forked for it, with its standard output and error going to output_fd.
+
+    Returns:
+        int: exit code of the command
+    """
+    # the file descriptors are replaced as well, for the output of the libraries and processes Rasa runs
+    os.dup2(output_fd, 1)
+    os.dup2(output_fd, 2)
+    os.close(output_fd)
+    sys.stdout = open(1, "w", encoding=ENCODING, buffering=1, closefd=False)
+    sys.stderr = open(2, "w", encoding=ENCODING, buffering=1, closefd=False)
+    try:
+        os.chdir(working_dir)
+        exit_code = run_command(args)
+    except SystemExit as e:
+        if isinstance(e.code, str):
+            print(e.code, file=sys.stderr)
+        exit_code = e.code if isinstance(e.code, int) else int(e.code is not None)
+    except BaseException:
+        traceback.print_exc()
+        exit_code = 1
+    sys.stdout.flush()
+    sys.stderr.flush()
+    return exit_code or 0
+
+
+def import_rasa():
+    """
+    Import the Rasa modules used by the daemon jobs, so that the jobs do not pay for it.
+    """
+    try:
+        import rasa.__main__  # noqa: F401
+        import rasa.core.agent  # noqa: F401
+    except ImportError:
+        raise click.ClickException("Rasa could not be imported, the daemon must run in the Python environment "
+                                   "where Rasa is installed.")
+
+
+def run_rasa_command(args: List[str]) -> int:
+    """
+    Run a Rasa command in the current interpreter, the way the rasa executable does.
+    """
+    from rasa.__main__ import create_argument_parser
+    from rasa.utils.common import set_log_level
+
+    parser = create_argument_parser()
+    arguments = parser.parse_args(args)
+    if not hasattr(arguments, "func"):
+        parser.print_help()
+        return 1
+    set_log_level(getattr(arguments, "loglevel", None))
+    arguments.func(arguments)
+    return 0
+
+
+def load_agent(model_path: str, endpoints_path: str = None):
+    from rasa.core.agent import Agent
+    from rasa.core.utils import AvailableEndpoints
+
+    endpoints = AvailableEndpoints.read_endpoints(endpoints_path)
+    return Agent.load(model_path, generator=endpoints.nlg, action_endpoint=endpoints.action)
+
+
+def handle_agent_message(agent, sender_id: str, text: str) -> List[dict]:
+    import asyncio
+
+    return asyncio.get_event_loop().run_until_complete(agent.handle_text(text, sender_id=sender_id))
@@ -1,18 +1,39 @@
 import os
-from os.path import join
-import zipfile
-from fnmatch import fnmatch
-from time import sleep
-from shutil import copyfile, rmtree
-from distutils.dir_util import copy_tree
-import glob
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from os.path import dirname, join
+from time import perf_counter
+from typing import Callable, Dict, List, NamedTuple, Optional
 
 import click
-import polling
 from roboai_cli.config.bot_manifest import BotManifest
 from roboai_cli.config.tool_settings import ToolSettings
 from roboai_cli.config.environment_settings import Environment
-from roboai_cli.util.cli import loading_indicator, print_warning
+from roboai_cli.util.botignore import BOT_IGNORE_FILE_NAME, BotIgnore
+from roboai_cli.util.cli import loading_indicator, print_info, print_warning
+from roboai_cli.util.deploy_timings import DeployTimings, measure
+from roboai_cli.util.http import SessionRequests, get_http_session, set_token_renewer
+from roboai_cli.util.package_cache import get_file_digest
+from roboai_cli.util.package_report import PackageReport, get_package_report_path
+from roboai_cli.util.packaging import get_package_plan, lock_build_dir, write_package, write_packages
+from roboai_cli.util.status_watcher import (
+    StatusFailureError,
+    StatusTimeoutError,
+    StatusTransition,
+    StatusWatcher,
+    format_transitions,
+    get_deadline,
+)
+from roboai_cli.util.upload import (
+    CREATE_OPERATION,
+    UPDATE_OPERATION,
+    ChunkedUpload,
+    UploadError,
+    UploadNotSupportedError,
+)
+from roboai_cli.util.workspace import get_workspace
 from robo_ai.exception.invalid_credentials_error import InvalidCredentialsError
 from robo_ai.exception.invalid_token_error import InvalidTokenError
 from robo_ai.exception.not_found_error import NotFoundError
@@ -25,7 +46,12 @@ SUPPORTED_BOT_TYPE = "RASA"
 
 PACKAGE_FILE_NAME = "package.zip"
 BUILD_DIR = "build"
-TEMP_DIR = "temp_dir"
+SHARED_BUILD_DIR = "_shared"
+DEFAULT_COMPRESSION_LEVEL = 6
+# statuses from which a bot runtime does not recover by itself
+RUNTIME_FAILURE_STATUSES = [AssistantRuntimeStatus.DEAD]
+# a token is renewed once it expires within this number of seconds
+TOKEN_RENEWAL_MARGIN = 300
 SUPPORTED_RUNTIME_BASE_VERSIONS = [
     {
         "version": "rasa-1.10.0",
@@ -55,38 +81,118 @@ def get_robo_client(environment: Environment = None, config: Config = None) -> R
     return robo_ai
 
 
+@lru_cache(maxsize=None)
+def get_current_environment() -> Environment:
+    """
+    Get the current environment, read once per command.
+    """
+    return ToolSettings().get_current_environment()
+
+
+@lru_cache(maxsize=None)
+def get_current_robo_client() -> RoboAi:
+    """
+    Get the client of the current environment, created once per command.
+    All its requests share the same pooled connections.
+    """
+    return get_robo_client(get_current_environment())
+
+
+def reset_current_robo_client():
+    """
+    Forget the current environment and client, after the settings they were built from changed.
+    """
+    get_current_environment.cache_clear()
+    get_current_robo_client.cache_clear()
+
+
 def validate_robo_session():
-    settings = ToolSettings()
-    current_environment = settings.get_current_environment()
+    """
+    Make sure the current environment has a token valid for a while, without contacting the platform
+    when the token expiry is known and far enough. A token about to expire is renewed with the API key,
+    as is a token rejected by the platform while the command runs.
+
+    Raises:
+        click.UsageError: if no environment is activated, or its credentials are not valid
+    """
+    current_environment = get_current_environment()
     if not current_environment:
         raise click.UsageError("No environment is currently activated.\nRun 'roboai environment activate <env-name>' to activate"
                                "an environment.")
     api_key = current_environment.api_key
-    robo_client = get_robo_client(environment=current_environment)
+    robo_client = get_current_robo_client()
 
     # an API key must be set
     if not api_key:
         raise click.UsageError("You are not authenticated, please login using the login command.")
 
-    # if a session isn't started yet, starts a new one
     token = current_environment.api_auth_token
-    if not token:
+    expiry = current_environment.api_auth_token_expiry
+    if token and expiry is None:
+        # the expiry of a token stored before expiries were recorded is looked up once
         try:
-            robo_client.oauth.authenticate(api_key)
-        except InvalidCredentialsError:
-            raise click.UsageError("Your current credentials or endpoint configuration are not valid.")
-    else:
-        # checks if the current token is valid
-        try:
-            robo_client.oauth.get_token_info(token)
+            token_info = robo_client.oauth.get_token_info(token)
+            expiry = token_info.exp if token_info.active else 0
         except InvalidTokenError:
-            raise click.UsageError("Your current credentials or endpoint configuration are not valid.")
+            expiry = 0
+        if expiry is not None:
+            save_auth_token(current_environment, token, expiry)
+
+    # a token without expiry is only renewed once the platform rejects it
+    if not token or expiry is not None and expiry - TOKEN_RENEWAL_MARGIN <= time.time():
+        authenticate(current_environment, robo_client)
+    set_token_renewer(renew_auth_token)
+
+
+_auth_token_lock = threading.Lock()
+
+
+def authenticate(environment: Environment, robo_client: RoboAi) -> str:
+    """
+    Start a new session with the API key of an environment, and store its token along with its expiry.
+
+    Returns:
+        str: the new token
+
+    Raises:
+        click.UsageError: if the credentials of the environment are not valid
+    """
+    try:
+        tokens = robo_client.oauth.authenticate(environment.api_key)
+    except InvalidCredentialsError:
+        raise click.UsageError("Your current credentials or endpoint configuration are not valid.")
+    save_auth_token(environment, tokens.access_token, get_token_expiry(tokens.expires_in))
+    robo_client.set_session_token(tokens.access_token)
+    return tokens.access_token
+
+
+def get_token_expiry(expires_in: Optional[float]) -> Optional[float]:
+    """
+    Get the time a token expires at from its lifetime, None when the platform did not tell it.
+    """
+    return time.time() + expires_in if expires_in is not None else None
+
+
+def save_auth_token(environment: Environment, token: str, expiry: Optional[float]):
+    environment.api_auth_token = token
+    environment.api_auth_token_expiry = int(expiry) if expiry is not None else None
+    ToolSettings().update_environment(environment)
+
+
+def renew_auth_token(rejected_token: str) -> str:
+    """
+    Renew the token of the current environment after the platform rejected it, once for all the requests
+    rejected at the same time.
+    """
+    with _auth_token_lock:
+        environment = get_current_environment()
+        if environment.api_auth_token != rejected_token:
+            return environment.api_auth_token
+        return authenticate(environment, get_current_robo_client())
 
 
 def validate_bot(bot_uuid: str):
-    settings = ToolSettings()
-    current_environment = settings.get_current_environment()
-    robo = get_robo_client(current_environment)
+    robo = get_current_robo_client()
     try:
         with loading_indicator("Validating bot..."):
             bot = robo.assistants.get_assistant(bot_uuid)
@@ -99,9 +205,7 @@ def validate_bot(bot_uuid: str):
 
 
 def does_the_runtime_exist(bot_uuid: str) -> bool:
-    settings = ToolSettings()
-    current_environment = settings.get_current_environment()
-    robo = get_robo_client(current_environment)
+    robo = get_current_robo_client()
     try:
         robo.assistants.runtimes.get(bot_uuid)
         return True
@@ -109,99 +213,299 @@ def does_the_runtime_exist(bot_uuid: str) -> bool:
         return False
 
 
-def wait_for_runtime_status(bot_uuid: str, status: AssistantRuntimeStatus):
-    settings = ToolSettings()
-    current_environment = settings.get_current_environment()
-    robo = get_robo_client(current_environment)
-    polling.poll(
-        lambda: robo.assistants.runtimes.get(bot_uuid).content.status == status,
-        step=5,
-        poll_forever=True,
-    )
+def wait_for_runtime_status(bot_uuid: str, status: AssistantRuntimeStatus,
+                            deadline: float = None) -> List[StatusTransition]:
+    return watch_runtime_status(bot_uuid, lambda current_status: current_status == status, deadline)
 
 
-def wait_for_runtime_non_existence(bot_uuid: str):
-    polling.poll(
-        lambda: not does_the_runtime_exist(bot_uuid),
-        step=5,
-        poll_forever=True,
-    )
+def wait_for_runtime_non_existence(bot_uuid: str, deadline: float = None) -> List[StatusTransition]:
+    return watch_runtime_status(bot_uuid, lambda current_status: current_status is None, deadline)
 
 
-def update_runtime(bot_uuid: str, package_file: str, base_version: str):
-    settings = ToolSettings()
-    current_environment = settings.get_current_environment()
-    robo = get_robo_client(current_environment)
-    runtime = robo.assistants.runtimes.get(bot_uuid)
-    if runtime.content.status == AssistantRuntimeStatus.RUNNING:
-        with loading_indicator("The bot runtime is running, stopping..."):
-            robo.assistants.runtimes.stop(bot_uuid)
-            wait_for_runtime_status(bot_uuid, AssistantRuntimeStatus.STOPPED)
+def watch_runtime_status(bot_uuid: str, is_expected, deadline: float = None) -> List[StatusTransition]:
+    """
+    Poll the bot runtime status until is_expected accepts it, the status being None once the runtime is removed.
 
-    total_file_size = os.path.getsize(package_file)
-    with click.progressbar(length=total_file_size, label="Uploading package", show_eta=False) as bar:
-        robo.assistants.runtimes.update(bot_uuid, package_file, base_version,
-                                        progress_callback=lambda bytes_read: bar.update(bytes_read - bar.pos))
+    Returns:
+        List[StatusTransition]: observed statuses and how long each one lasted
+    """
+    robo = get_current_robo_client()
+
+    def get_status():
+        try:
+            return robo.assistants.runtimes.get(bot_uuid).content.status
+        except NotFoundError:
+            return None
+
+    watcher = StatusWatcher(get_status, deadline)
+    try:
+        watcher.wait_for(is_expected, RUNTIME_FAILURE_STATUSES)
+    except StatusFailureError as e:
+        raise click.ClickException("The bot runtime is in the '{0}' status ({1}), please check its logs.".format(
+            format_runtime_status(e.args[0]), format_transitions(watcher.transitions, format_runtime_status)))
+    except StatusTimeoutError as e:
+        raise click.ClickException("Timed out while waiting for the bot runtime, its status is '{0}' ({1}).".format(
+            format_runtime_status(e.args[0]), format_transitions(watcher.transitions, format_runtime_status)))
+    return watcher.transitions
 
-    with loading_indicator("Waiting for the bot runtime to start..."):
-        wait_for_runtime_status(bot_uuid, AssistantRuntimeStatus.RUNNING)
 
+def format_runtime_status(status: AssistantRuntimeStatus) -> str:
+    return status.value.lower() if status else "removed"
 
-def create_runtime(bot_uuid: str, package_file: str, base_version: str):
-    settings = ToolSettings()
-    current_environment = settings.get_current_environment()
-    robo = get_robo_client(current_environment)
+
+def print_transitions(transitions: List[StatusTransition], reporter: Callable[[str], None] = None):
+    if len(transitions) > 1 and not reporter:
+        print_info("The bot runtime is {0} after {1}.".format(format_runtime_status(transitions[-1].status),
+                                                              format_transitions(transitions, format_runtime_status)))
+
+
+@contextmanager
+def runtime_step(text: str, reporter: Callable[[str], None] = None):
+    """
+    Show a loading indicator during a step, or report the step instead when a reporter is given,
+    e.g. when several bots are handled at once under a single progress indicator.
+    """
+    if reporter:
+        reporter(text)
+        yield
+    else:
+        with loading_indicator(text):
+            yield
+
+
+def stage_package(bot_uuid: str, package_file: str, base_version: str, operation: str, parallel_uploads: int = 1,
+                  reporter: Callable[[str], None] = None, timings: DeployTimings = None,
+                  package_digest: str = None) -> Optional[ChunkedUpload]:
+    """
+    Upload the parts of a package to a bot runtime, without deploying it yet.
+    The parts are sent through the shared session, so that a rejected token is renewed.
+
+    Returns:
+        Optional[ChunkedUpload]: the staged upload, to be completed, None when the platform does not support
+        chunked uploads
+    """
+    current_environment = get_current_environment()
+    token = current_environment.api_auth_token
+    headers = {"Authorization": "bearer %s" % token} if token else {}
+
+    total_file_size = os.path.getsize(package_file)
+    if timings:
+        timings.upload_size = total_file_size
+    if package_digest is None:
+        with measure(timings, "hashing"):
+            package_digest = get_package_digest(package_file)
+    upload = ChunkedUpload(current_environment.base_url, bot_uuid, package_file, base_version, operation,
+                           headers=headers, parallel=parallel_uploads,
+                           session=SessionRequests(get_http_session(parallel_uploads)), sha256=package_digest)
+    try:
+        with measure(timings, "upload"):
+            upload.open()
+            with get_upload_progress(total_file_size, reporter) as on_progress:
+                upload.stage(progress_callback=on_progress)
+    except UploadNotSupportedError:
+        return None
+    except UploadError as e:
+        raise click.ClickException(str(e))
+    return upload
+
+
+def complete_upload(upload: ChunkedUpload, timings: DeployTimings = None):
+    try:
+        with measure(timings, "upload"):
+            upload.complete()
+    except UploadError as e:
+        raise click.ClickException(str(e))
+
+
+def send_package(bot_uuid: str, package_file: str, base_version: str, operation: str,
+                 reporter: Callable[[str], None] = None, timings: DeployTimings = None):
+    """
+    Upload and deploy a package in a single request, for platforms which do not support chunked uploads.
+    """
+    robo = get_current_robo_client()
     total_file_size = os.path.getsize(package_file)
+    with get_upload_progress(total_file_size, reporter) as on_progress, measure(timings, "upload"):
+        if operation == UPDATE_OPERATION:
+            robo.assistants.runtimes.update(bot_uuid, package_file, base_version, progress_callback=on_progress)
+        else:
+            robo.assistants.runtimes.create(bot_uuid, package_file, base_version, progress_callback=on_progress)
+
+
+def upload_package(bot_uuid: str, package_file: str, base_version: str, operation: str, parallel_uploads: int = 1,
+                   reporter: Callable[[str], None] = None, timings: DeployTimings = None,
+                   package_digest: str = None):
+    """
+    Upload a package to a bot runtime in resumable chunks,
+    or in a single request when the platform does not support chunked uploads.
+    The upload progress is shown with a progress bar, or reported to the reporter when one is given.
+    """
+    upload = stage_package(bot_uuid, package_file, base_version, operation, parallel_uploads, reporter, timings,
+                           package_digest)
+    if upload:
+        complete_upload(upload, timings)
+    else:
+        send_package(bot_uuid, package_file, base_version, operation, reporter, timings)
+
+
+@contextmanager
+def get_upload_progress(total_file_size: int, reporter: Callable[[str], None] = None):
+    if reporter:
+        def report_progress(bytes_read: int):
+            reporter("uploading package ({0:.0%})".format(bytes_read / total_file_size if total_file_size else 1.0))
+
+        yield report_progress
+        return
+
     with click.progressbar(length=total_file_size, label="Uploading package", show_eta=False) as bar:
-        robo.assistants.runtimes.create(bot_uuid, package_file, base_version,
-                                        progress_callback=lambda bytes_read: bar.update(bytes_read - bar.pos))
+        def update_bar(bytes_read: int):
+            bar.update(bytes_read - bar.pos)
+
+        yield update_bar
+
+
+class Deployment(NamedTuple):
+    """
+    Outcome of a package deployment.
+    """
+    deployed: bool
+    # how long the bot runtime was down, None when it was not running before the deployment
+    downtime: Optional[float] = None
+    # whether the package was uploaded while the bot runtime was down, on platforms without chunked uploads
+    uploaded_while_down: bool = False
 
-    with loading_indicator("Waiting for the bot runtime to be ready (it may take several minutes)..."):
-        wait_for_runtime_status(bot_uuid, AssistantRuntimeStatus.CREATED)
 
-    with loading_indicator("Waiting for the bot runtime to start..."):
+def update_runtime(bot_uuid: str, package_file: str, base_version: str, parallel_uploads: int = 1,
+                   timeout: float = None, reporter: Callable[[str], None] = None,
+                   timings: DeployTimings = None, package_digest: str = None) -> Deployment:
+    """
+    Update a bot runtime with a package.
+    The package is staged while the bot runtime keeps running, and the runtime is only stopped once the whole package
+    was received and verified by the platform, so that it is down during its restart only. Platforms which do not
+    support chunked uploads get the package in a single request once the runtime is stopped, as it deploys the
+    package right away, and the runtime is then down during the upload too.
+
+    Returns:
+        Deployment: how long the bot runtime was down, from the stop request until it was running again,
+        None when it was not running, and whether the upload happened while it was down
+    """
+    robo = get_current_robo_client()
+    deadline = get_deadline(timeout)
+    upload = stage_package(bot_uuid, package_file, base_version, UPDATE_OPERATION, parallel_uploads, reporter, timings,
+                           package_digest)
+
+    downtime_start = None
+    runtime = robo.assistants.runtimes.get(bot_uuid)
+    if runtime.content.status == AssistantRuntimeStatus.RUNNING:
+        downtime_start = perf_counter()
+        with runtime_step("The bot runtime is running, stopping...", reporter), measure(timings, "waiting_stopped"):
+            robo.assistants.runtimes.stop(bot_uuid)
+            transitions = wait_for_runtime_status(bot_uuid, AssistantRuntimeStatus.STOPPED, deadline)
+        print_transitions(transitions, reporter)
+
+    if upload:
+        complete_upload(upload, timings)
+    else:
+        send_package(bot_uuid, package_file, base_version, UPDATE_OPERATION, reporter, timings)
+
+    with runtime_step("Waiting for the bot runtime to start...", reporter), measure(timings, "waiting_running"):
+        transitions = wait_for_runtime_status(bot_uuid, AssistantRuntimeStatus.RUNNING, deadline)
+    print_transitions(transitions, reporter)
+
+    if downtime_start is None:
+        return Deployment(True)
+    downtime = perf_counter() - downtime_start
+    if timings:
+        timings.downtime = downtime
+        timings.downtime_includes_upload = upload is None
+    return Deployment(True, downtime, upload is None)
+
+
+def create_runtime(bot_uuid: str, package_file: str, base_version: str, parallel_uploads: int = 1,
+                   timeout: float = None, reporter: Callable[[str], None] = None, timings: DeployTimings = None,
+                   package_digest: str = None):
+    robo = get_current_robo_client()
+    deadline = get_deadline(timeout)
+    upload_package(bot_uuid, package_file, base_version, CREATE_OPERATION, parallel_uploads, reporter, timings,
+                   package_digest)
+
+    with runtime_step("Waiting for the bot runtime to be ready (it may take several minutes)...", reporter), \
+            measure(timings, "waiting_created"):
+        transitions = wait_for_runtime_status(bot_uuid, AssistantRuntimeStatus.CREATED, deadline)
+    print_transitions(transitions, reporter)
+
+    with runtime_step("Waiting for the bot runtime to start...", reporter), measure(timings, "waiting_running"):
         robo.assistants.runtimes.start(bot_uuid)
-        wait_for_runtime_status(bot_uuid, AssistantRuntimeStatus.RUNNING)
+        transitions = wait_for_runtime_status(bot_uuid, AssistantRuntimeStatus.RUNNING, deadline)
+    print_transitions(transitions, reporter)
 
 
-def remove_runtime(bot_uuid: str):
-    settings = ToolSettings()
-    current_environment = settings.get_current_environment()
-    robo = get_robo_client(current_environment)
+def deploy_package(bot_dir: str, bot_uuid: str, package_file: str, base_version: str, force: bool = False,
+                   parallel_uploads: int = 1, timeout: float = None, reporter: Callable[[str], None] = None,
+                   timings: DeployTimings = None) -> Deployment:
+    """
+    Deploy a package to a bot runtime, creating the runtime when it does not exist yet.
+
+    Returns:
+        Deployment: not deployed when the package was already running and the deployment was skipped
+    """
+    with measure(timings, "hashing"):
+        package_digest = get_package_digest(package_file)
+    if not force and is_package_deployed(bot_dir, bot_uuid, base_version, package_digest):
+        return Deployment(False)
+
+    if does_the_runtime_exist(bot_uuid):
+        deployment = update_runtime(bot_uuid, package_file, base_version, parallel_uploads, timeout, reporter,
+                                    timings, package_digest)
+    else:
+        create_runtime(bot_uuid, package_file, base_version, parallel_uploads, timeout, reporter, timings,
+                       package_digest)
+        deployment = Deployment(True)
+    set_deployed_package_digest(bot_dir, bot_uuid, package_digest)
+    return deployment
+
+
+def remove_runtime(bot_uuid: str, timeout: float = None, reporter: Callable[[str], None] = None) -> bool:
+    """
+    Remove a bot runtime.
+
+    Returns:
+        bool: False when the bot runtime does not exist
+    """
+    robo = get_current_robo_client()
 
     if not does_the_runtime_exist(bot_uuid):
-        print_warning("The bot runtime does not exist.")
-        return
+        if not reporter:
+            print_warning("The bot runtime does not exist.")
+        return False
 
     runtime = robo.assistants.runtimes.get(bot_uuid)
     assert_status_transition(runtime.content.status, AssistantRuntimeStatus.REMOVED, "removed")
 
-    with loading_indicator("Requesting bot runtime deletion..."):
+    with runtime_step("Requesting bot runtime deletion...", reporter):
         robo.assistants.runtimes.remove(bot_uuid)
 
-    with loading_indicator("Waiting for the bot runtime to be removed..."):
-        wait_for_runtime_non_existence(bot_uuid)
+    with runtime_step("Waiting for the bot runtime to be removed...", reporter):
+        transitions = wait_for_runtime_non_existence(bot_uuid, get_deadline(timeout))
+    print_transitions(transitions, reporter)
+    return True
 
 
-def stop_runtime(bot_uuid: str):
-    settings = ToolSettings()
-    current_environment = settings.get_current_environment()
-    robo = get_robo_client(current_environment)
+def stop_runtime(bot_uuid: str, timeout: float = None, reporter: Callable[[str], None] = None):
+    robo = get_current_robo_client()
 
     runtime = robo.assistants.runtimes.get(bot_uuid)
     assert_status_transition(runtime.content.status, AssistantRuntimeStatus.STOPPED, "stopped")
 
-    with loading_indicator("Requesting bot runtime stop..."):
+    with runtime_step("Requesting bot runtime stop...", reporter):
         robo.assistants.runtimes.stop(bot_uuid)
 
-    with loading_indicator("Waiting for the bot runtime to stop..."):
-        wait_for_runtime_status(bot_uuid, AssistantRuntimeStatus.STOPPED)
+    with runtime_step("Waiting for the bot runtime to stop...", reporter):
+        transitions = wait_for_runtime_status(bot_uuid, AssistantRuntimeStatus.STOPPED, get_deadline(timeout))
+    print_transitions(transitions, reporter)
 
 
-def start_runtime(bot_uuid: str):
-    settings = ToolSettings()
-    current_environment = settings.get_current_environment()
-    robo = get_robo_client(current_environment)
+def start_runtime(bot_uuid: str, timeout: float = None, reporter: Callable[[str], None] = None):
+    robo = get_current_robo_client()
 
     if not does_the_runtime_exist(bot_uuid):
         raise click.UsageError("The bot runtime does not exist.")
@@ -209,11 +513,12 @@ def start_runtime(bot_uuid: str):
     runtime = robo.assistants.runtimes.get(bot_uuid)
     assert_status_transition(runtime.content.status, AssistantRuntimeStatus.RUNNING, "started")
 
-    with loading_indicator("Requesting bot runtime start..."):
+    with runtime_step("Requesting bot runtime start...", reporter):
         robo.assistants.runtimes.start(bot_uuid)
 
-    with loading_indicator("Waiting for the bot runtime to start..."):
-        wait_for_runtime_status(bot_uuid, AssistantRuntimeStatus.RUNNING)
+    with runtime_step("Waiting for the bot runtime to start...", reporter):
+        transitions = wait_for_runtime_status(bot_uuid, AssistantRuntimeStatus.RUNNING, get_deadline(timeout))
+    print_transitions(transitions, reporter)
 
 
 def assert_status_transition(current_status: AssistantRuntimeStatus, new_status: AssistantRuntimeStatus, verb: str):
@@ -236,88 +541,85 @@ def assert_status_transition(current_status: AssistantRuntimeStatus, new_status:
         raise click.UsageError("The bot cannot be {0} when in the '{1}' status".format(verb, current_status.value))
 
 
-def copy_directories(bot_language_dir: str, bot_root_dir: str, model: str):
+def create_package(bot_language_dir: str, bot_root_dir: str, model: str, jobs: int = 1) -> str:
+    bot_ignore = get_bot_ignore(bot_root_dir)
+    package_file_path = get_default_package_path()
+    os.makedirs(BUILD_DIR, exist_ok=True)
+
+    compression_level = get_current_bot_compression_level(bot_language_dir)
+
+    with lock_build_dir(BUILD_DIR):
+        start = perf_counter()
+        plan = get_package_plan(bot_language_dir, bot_root_dir, model, bot_ignore)
+        scanning_time = perf_counter() - start
+        report = write_package(plan, package_file_path, jobs, compression_level)
+        save_package_report(report, scanning_time)
+    return package_file_path
+
+
+def create_packages(bot_root_dir: str, languages: List[str], jobs: int = 1) -> Dict[str, str]:
     """
-    Copy files to a temporary directory
+    Build the packages of several languages concurrently, each one in its own build directory.
+    Languages sharing the same compression level share the compressed data of the common bot files.
+
+    Returns:
+        Dict[str, str]: package file path by language
     """
-    copy_dir(join(bot_root_dir, "actions"), join(TEMP_DIR, "actions"))
-    copy_dir(join(bot_language_dir, "data"), join(TEMP_DIR, "data"))
-    copy_file(join(bot_root_dir, "languages", "stories.md"), join(TEMP_DIR, "data", "stories.md"))
-    os.makedirs(join(TEMP_DIR, "models"), exist_ok=True)
-    if model:
-        model_name = model.split("/")[-1]
-        copy_file(join(bot_language_dir, "models", model_name), join(TEMP_DIR, "models", model_name))
-    else:
-        list_of_models = glob.glob(join(bot_language_dir, "models", "*.tar.gz"))
-        latest_file = max(list_of_models, key=os.path.getctime)
-        model_name = latest_file.split("/")[-1]
-        copy_file(latest_file, join(TEMP_DIR, "models", model_name))
-    copy_dir(join(bot_root_dir, "custom"), join(TEMP_DIR, "custom"))
-    copy_file(join(bot_language_dir, "config.yml"), join(TEMP_DIR, "config.yml"))
-    copy_file(join(bot_root_dir, "credentials.yml"), join(TEMP_DIR, "credentials.yml"))
-    copy_file(join(bot_language_dir, "domain.yml"), join(TEMP_DIR, "domain.yml"))
-    copy_file(join(bot_root_dir, "endpoints.yml"), join(TEMP_DIR, "endpoints.yml"))
-    copy_file(join(bot_root_dir, "__init__.py"), join(TEMP_DIR, "__init__.py"))
-    copy_file(join(bot_root_dir, "requirements.txt"), join(TEMP_DIR, "requirements.txt"))
-    copy_file(join(bot_root_dir, ".botignore"), join(TEMP_DIR, ".botignore"))
-    copy_file(join(bot_language_dir, "robo-manifest.json"), join(TEMP_DIR, "robo-manifest.json"))
-
-
-def copy_dir(source_path: str, dest_path: str):
-    try:
-        # print("Trying to copy tree from {} to {}".format(source_path, dest_path))
-        copy_tree(source_path, dest_path)
-    except Exception:
-        print("Couldn't copy tree from {} to {}".format(source_path, dest_path))
+    bot_ignore = get_bot_ignore(bot_root_dir)
+    plans_by_level = {}
+    scanning_times = {}
+    for language in languages:
+        bot_language_dir = join(bot_root_dir, "languages", language)
+        compression_level = get_current_bot_compression_level(bot_language_dir)
+        start = perf_counter()
+        plans_by_level.setdefault(compression_level, {})[language] = \
+            get_package_plan(bot_language_dir, bot_root_dir, None, bot_ignore)
+        scanning_times[language] = perf_counter() - start
 
+    package_file_paths = {language: get_language_package_path(language) for language in languages}
+    for package_file_path in package_file_paths.values():
+        os.makedirs(dirname(package_file_path), exist_ok=True)
+    # the shared archives are used by every language build, the whole build directory is locked
+    with lock_build_dir(BUILD_DIR):
+        for compression_level, plans in plans_by_level.items():
+            shared_package_file_path = join(BUILD_DIR, SHARED_BUILD_DIR, str(compression_level), PACKAGE_FILE_NAME)
+            reports = write_packages(plans, package_file_paths, shared_package_file_path, jobs, compression_level)
+            for name, report in reports.items():
+                save_package_report(report, scanning_times.get(name, 0.0))
+    return package_file_paths
 
-def copy_file(source_path: str, dest_path: str):
-    try:
-        # print("Trying to copy file from {} to {}".format(source_path, dest_path))
-        copyfile(source_path, dest_path)
-    except Exception:
-        print("Couldn't copy file from {} to {}".format(source_path, dest_path))
 
+def save_package_report(report: PackageReport, scanning_time: float):
+    report.timings["scanning"] = scanning_time
+    report.save(get_package_report_path(report.package_file_path))
 
-def create_package(bot_language_dir: str, bot_root_dir: str, model: str) -> str:
-    exclusions, exceptions = get_bot_ignore_content(bot_root_dir)
-    os.makedirs(BUILD_DIR, exist_ok=True)
-    package_file_path = get_default_package_path()
 
-    package_zip = zipfile.ZipFile(package_file_path, "w", zipfile.ZIP_DEFLATED)
-    os.makedirs(TEMP_DIR, exist_ok=True)
-    copy_directories(bot_language_dir, bot_root_dir, model)
-    all_artifacts = []
-    for root, dirs, files in os.walk(TEMP_DIR, topdown=True):
-        dirs[:] = [directory for directory in dirs
-                   if not any(fnmatch(directory, exclusion) for exclusion in exclusions) or any(fnmatch(directory, exception) for exception in exceptions)]
-        actual_files = [os.path.join(root, file) for file in files
-                        if not any(fnmatch(file, exclusion) for exclusion in exclusions) or any(fnmatch(file, exception) for exception in exceptions)]
-        actual_dirs = [os.path.join(root, directory) for directory in dirs
-                       if not any(fnmatch(directory, exclusion) for exclusion in exclusions) or any(fnmatch(directory, exception) for exception in exceptions)]
-        all_artifacts.extend(actual_files)
-        all_artifacts.extend(actual_dirs)
-
-    with click.progressbar(all_artifacts, label="Creating bot runtime package") as bar:
-        for artifact in bar:
-            package_zip.write(artifact, os.path.relpath(artifact, TEMP_DIR))
-            sleep(0.05)  # hack to display the bar, if the process is too fast, the bar does not display
-
-    package_zip.close()
-    rmtree(TEMP_DIR)
-    return package_file_path
+def get_package_report(package_file_path: str) -> PackageReport:
+    report_path = get_package_report_path(package_file_path)
+    if not os.path.isfile(report_path):
+        raise click.UsageError("The package report could not be found, please package the bot again.")
+    return PackageReport.load(report_path)
+
 
+def get_bot_languages(bot_root_dir: str) -> List[str]:
+    return get_workspace(bot_root_dir).get_languages()
 
-def get_bot_ignore_content(bot_ignore_dir: str):
-    with open(join(bot_ignore_dir, ".botignore"), "r") as f:
-        bot_ignore = f.read().splitlines()
-        return ["%s" % s for s in bot_ignore if not s.startswith("!")], ["%s" % s.replace("!", "").strip() for s in bot_ignore if s.startswith("!")]
+
+def get_bot_ignore(bot_ignore_dir: str) -> BotIgnore:
+    return BotIgnore.from_file(join(bot_ignore_dir, BOT_IGNORE_FILE_NAME))
 
 
 def get_default_package_path() -> str:
     return os.path.join(BUILD_DIR, PACKAGE_FILE_NAME)
 
 
+def get_language_package_path(language: str) -> str:
+    """
+    Get the path of the package of a language built along with other languages, in its own build directory.
+    """
+    return os.path.join(BUILD_DIR, language, PACKAGE_FILE_NAME)
+
+
 def validate_package_file(path: str):
     if not os.path.exists(path):
         raise click.UsageError("The package file does not exist.")
@@ -332,6 +634,38 @@ def get_current_bot_uuid(bot_dir: str):
     return bot_uuid
 
 
+def get_target_bot_uuids(language: tuple, all_languages: bool = False, bot_uuid: str = None,
+                         bot_uuids_file: str = None) -> Dict[str, str]:
+    """
+    Get the bots a command applies to: the bot of the current directory, the bots of the given languages
+    or of every language, a bot UUID, or the bot UUIDs listed in a file, one per line.
+
+    Returns:
+        Dict[str, str]: bot UUID by name, the name being the language code or the bot UUID
+    """
+    if bot_uuids_file:
+        if language or all_languages or bot_uuid:
+            raise click.UsageError("A bot UUIDs file cannot be combined with languages or a bot UUID.")
+        with open(bot_uuids_file) as f:
+            bot_uuids = [line.strip() for line in f if line.strip() and not line.strip().startswith("#")]
+        if not bot_uuids:
+            raise click.UsageError("The bot UUIDs file is empty.")
+        return {uuid: uuid for uuid in dict.fromkeys(bot_uuids)}
+
+    if all_languages:
+        language = tuple(get_bot_languages(os.path.abspath(".")))
+    if len(language) > 1:
+        if bot_uuid:
+            raise click.UsageError("A bot UUID can only be selected for a single language.")
+        return {code: get_current_bot_uuid(os.path.abspath(join(".", "languages", code))) for code in language}
+
+    name = language[0] if language else ""
+    if bot_uuid:
+        return {name: bot_uuid}
+    bot_dir = os.path.abspath(join(".", "languages", name)) if name else os.path.abspath(".")
+    return {name: get_current_bot_uuid(bot_dir)}
+
+
 def get_current_bot_base_version(bot_dir: str):
     manifest = BotManifest(bot_dir)
     base_version = manifest.get_base_version()
@@ -340,24 +674,60 @@ def get_current_bot_base_version(bot_dir: str):
     return base_version
 
 
+def get_current_bot_compression_level(bot_dir: str) -> int:
+    manifest = BotManifest(bot_dir)
+    compression_level = manifest.get_compression_level()
+    if compression_level is None:
+        return DEFAULT_COMPRESSION_LEVEL
+    if not isinstance(compression_level, int) or isinstance(compression_level, bool) \
+            or not 0 <= compression_level <= 9:
+        raise click.UsageError("The package compression level must be an integer between 0 and 9.")
+    return compression_level
+
+
+def get_package_digest(package_file: str) -> str:
+    return get_file_digest(package_file)
+
+
+def is_package_deployed(bot_dir: str, bot_uuid: str, base_version: str, package_digest: str) -> bool:
+    """
+    Check whether the package was the last one deployed from this bot to the same bot runtime,
+    with the same base version, and whether the runtime is still running it.
+    """
+    manifest = BotManifest(bot_dir)
+    if manifest.get_package_digest() != package_digest or manifest.get_bot_id() != bot_uuid \
+            or manifest.get_base_version() != base_version:
+        return False
+    if not does_the_runtime_exist(bot_uuid):
+        return False
+    return get_bot_runtime(bot_uuid).status == AssistantRuntimeStatus.RUNNING
+
+
+def set_deployed_package_digest(bot_dir: str, bot_uuid: str, package_digest: str):
+    manifest = BotManifest(bot_dir)
+    # the digest is only meaningful for the bot runtime the manifest refers to
+    if manifest.get_bot_id() == bot_uuid:
+        manifest.set_package_digest(package_digest)
+
+
 def get_bot_runtime(bot_uuid: str):
-    settings = ToolSettings()
-    current_environment = settings.get_current_environment()
-    robo = get_robo_client(current_environment)
+    robo = get_current_robo_client()
     return robo.assistants.runtimes.get(bot_uuid).content
 
 
-def get_runtime_logs(bot_uuid: str) -> str:
-    settings = ToolSettings()
-    current_environment = settings.get_current_environment()
-    robo = get_robo_client(current_environment)
+def get_runtime_log_lines(bot_uuid: str) -> List[str]:
+    """
+    Get the lines of the log buffer of a bot runtime.
 
-    if not does_the_runtime_exist(bot_uuid):
+    Raises:
+        click.UsageError: if the bot runtime does not exist
+    """
+    robo = get_current_robo_client()
+    try:
+        logs = robo.assistants.runtimes.get_logs(bot_uuid)
+    except NotFoundError:
         raise click.UsageError("The bot runtime does not exist.")
-
-    logs = robo.assistants.runtimes.get_logs(bot_uuid)
-    lines = logs.content.lines
-    return "\n".join(lines)
+    return logs.content.lines or []
 
 
 def get_supported_base_versions():
@@ -0,0 +1,153 @@
+"""
+Bot runtime logs.
+
+The platform returns the log buffer of a bot runtime as a whole, so new lines are found by looking for the last
+lines already seen (the cursor marker) in the buffer fetched again. Lines are handled one at a time,
+and only the marker, and the last lines when they are requested, are kept in memory.
+Log lines start with their timestamp, e.g. "2021-01-27 10:15:32 INFO rasa.core.processor - ...", lines without
+one, such as the lines of a traceback, belong to the previous line. Log timestamps are expected to be UTC.
+"""
+import heapq
+import re
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import click
+
+LOG_TIMESTAMP_PATTERN = re.compile(r"^\[?(\d{4}-\d{2}-\d{2})[ T](\d{2}:\d{2}:\d{2})(?:[.,](\d{1,6}))?")
+DURATION_PATTERN = re.compile(r"^(?:(\d+)d)?(?:(\d+)h)?(?:(\d+)m)?(?:(\d+)s)?$")
+CURSOR_MARKER_SIZE = 10
+DEFAULT_FOLLOW_INTERVAL = 2.0
+
+
+def parse_log_timestamp(line: str) -> Optional[datetime]:
+    match = LOG_TIMESTAMP_PATTERN.match(line)
+    if not match:
+        return None
+    date, clock, fraction = match.groups()
+    try:
+        timestamp = datetime.strptime(date + " " + clock, "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return None
+    if fraction:
+        timestamp += timedelta(microseconds=int(fraction.ljust(6, "0")))
+    return timestamp
+
+
+def parse_time(value: str, now: datetime = None) -> datetime:
+    """
+    Parse a time given either as a duration before now, such as 90s, 15m, 2h or 1d12h, or as a timestamp,
+    such as 2021-01-27, 2021-01-27 10:15 or 2021-01-27T10:15:32.
+
+    Raises:
+        click.BadParameter: if the value is neither a duration nor a timestamp
+    """
+    value = value.strip()
+    match = DURATION_PATTERN.match(value)
+    if value and match:
+        days, hours, minutes, seconds = (int(group or 0) for group in match.groups())
+        return (now or datetime.utcnow()) - timedelta(days=days, hours=hours, minutes=minutes, seconds=seconds)
+    for time_format in ["%Y-%m-%d", "%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S"]:
+        try:
+            return datetime.strptime(value, time_format)
+        except ValueError:
+            pass
+    raise click.BadParameter("'{0}' is neither a duration, such as 15m or 2h, nor a timestamp, such as "
+                             "2021-01-27 10:15.".format(value))
+
+
+class LogCursor:
+    """
+    Position in the log buffer of a bot runtime, made of the last lines seen.
+    """
+
+    def __init__(self, marker: List[str] = None, marker_size: int = CURSOR_MARKER_SIZE):
+        self.__marker_size = marker_size
+        self.__marker = list(marker or [])[-marker_size:]
+
+    @property
+    def marker(self) -> List[str]:
+        return list(self.__marker)
+
+    def get_start(self, lines: List[str]) -> int:
+        """
+        Get the index of the first line not seen yet. When the marker cannot be found, the buffer was rotated
+        past it, and every line is new.
+        """
+        if not self.__marker:
+            return 0
+        marker_length = len(self.__marker)
+        last_line = self.__marker[-1]
+        for index in range(len(lines) - 1, -1, -1):
+            if lines[index] != last_line:
+                continue
+            start = index + 1 - marker_length
+            # the beginning of the marker may already be out of the buffer
+            if lines[max(start, 0):index + 1] == self.__marker[max(-start, 0):]:
+                return index + 1
+        return 0
+
+    def advance(self, lines: List[str]) -> List[str]:
+        """
+        Get the lines not seen yet, and move the cursor after them.
+        """
+        new_lines = lines[self.get_start(lines):]
+        if new_lines:
+            self.__marker = (self.__marker + new_lines)[-self.__marker_size:]
+        return new_lines
+
+
+def filter_since(lines: Iterable[str], since: datetime) -> Iterator[str]:
+    """
+    Keep the lines logged at or after `since`, along with the lines without timestamp which follow them.
+    """
+    keep = False
+    for line in lines:
+        timestamp = parse_log_timestamp(line)
+        if timestamp is not None:
+            keep = timestamp >= since
+        if keep:
+            yield line
+
+
+def get_last_lines(lines: Iterable[str], count: int) -> Deque[str]:
+    return deque(lines, maxlen=count)
+
+
+def get_timestamped_lines(lines: Iterable[str]) -> Iterator[Tuple[datetime, str]]:
+    """
+    Pair every line with its timestamp, lines without timestamp getting the timestamp of the line before them.
+    """
+    timestamp = datetime.min
+    for line in lines:
+        timestamp = parse_log_timestamp(line) or timestamp
+        yield timestamp, line
+
+
+def merge_logs(streams: Dict[str, Iterable[str]]) -> Iterator[str]:
+    """
+    Merge the log lines of several bots in timestamp order, every line being prefixed by the name of its bot.
+    The streams are read lazily, holding a single line of each one at a time, and lines logged at the same time
+    keep the order of the streams, so that the lines without timestamp stay after their line.
+    """
+    width = max((len(name) for name in streams), default=0)
+
+    def prefix(name: str, lines: Iterable[str]) -> Iterator[Tuple[datetime, str]]:
+        for timestamp, line in get_timestamped_lines(lines):
+            yield timestamp, "{0:<{1}} {2}".format("[" + name + "]", width + 2, line)
+
+    for _, line in heapq.merge(*(prefix(name, lines) for name, lines in streams.items()), key=lambda item: item[0]):
+        yield line
+
+
+def follow_logs(get_lines: Callable[[], List[str]], cursor: LogCursor, interval: float = DEFAULT_FOLLOW_INTERVAL,
+                sleep: Callable[[float], None] = time.sleep) -> Iterator[str]:
+    """
+    Poll the log buffer every `interval` seconds and yield the lines added since the cursor, forever.
+    """
+    while True:
+        sleep(interval)
+        for line in cursor.advance(get_lines()):
+            yield line
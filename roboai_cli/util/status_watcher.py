@@ -0,0 +1,109 @@
+import time
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional
+
+INITIAL_POLL_INTERVAL = 0.5
+MAX_POLL_INTERVAL = 10.0
+POLL_BACKOFF_FACTOR = 1.5
+
+
+class StatusTimeoutError(Exception):
+    pass
+
+
+class StatusFailureError(Exception):
+    pass
+
+
+class StatusTransition(NamedTuple):
+    """
+    A status observed while watching, and how long it lasted.
+    """
+    status: Any
+    duration: float
+
+
+def get_deadline(timeout: Optional[float]) -> Optional[float]:
+    return time.monotonic() + timeout if timeout is not None else None
+
+
+class StatusWatcher:
+    """
+    Poll a status until it reaches the expected one.
+
+    The first polls are close to each other, so that fast transitions are noticed quickly, then the poll interval
+    grows exponentially up to a cap. It goes back to the initial interval whenever the status changes.
+    Watching stops with an error when the deadline is reached or when a failure status is observed,
+    and every observed status is recorded along with how long it lasted.
+    """
+
+    def __init__(self, get_status: Callable[[], Any], deadline: float = None,
+                 initial_interval: float = INITIAL_POLL_INTERVAL, max_interval: float = MAX_POLL_INTERVAL,
+                 backoff_factor: float = POLL_BACKOFF_FACTOR, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.__get_status = get_status
+        self.__deadline = deadline
+        self.__initial_interval = initial_interval
+        self.__max_interval = max_interval
+        self.__backoff_factor = backoff_factor
+        self.__clock = clock
+        self.__sleep = sleep
+        self.__transitions = []
+
+    @property
+    def transitions(self) -> List[StatusTransition]:
+        return self.__transitions
+
+    def wait_for(self, is_expected: Callable[[Any], bool], failure_statuses: Iterable = ()) -> Any:
+        """
+        Wait until the status is the expected one.
+
+        Args:
+            is_expected: tells whether a status is the expected one
+            failure_statuses: statuses from which the expected status cannot be reached
+
+        Returns:
+            the expected status
+
+        Raises:
+            StatusFailureError: if a failure status is observed
+            StatusTimeoutError: if the deadline is reached
+        """
+        failure_statuses = list(failure_statuses)
+        self.__transitions = []
+        interval = self.__initial_interval
+        status_start = self.__clock()
+        previous_status = None
+        first_poll = True
+
+        while True:
+            status = self.__get_status()
+            now = self.__clock()
+            if first_poll or status != previous_status:
+                if not first_poll:
+                    self.__transitions.append(StatusTransition(previous_status, now - status_start))
+                    interval = self.__initial_interval
+                status_start = now
+                previous_status = status
+                first_poll = False
+
+            if is_expected(status):
+                self.__transitions.append(StatusTransition(status, 0.0))
+                return status
+            if status in failure_statuses:
+                self.__transitions.append(StatusTransition(status, 0.0))
+                raise StatusFailureError(status)
+
+            if self.__deadline is not None:
+                remaining = self.__deadline - now
+                if remaining <= 0:
+                    self.__transitions.append(StatusTransition(status, now - status_start))
+                    raise StatusTimeoutError(status)
+                self.__sleep(min(interval, remaining))
+            else:
+                self.__sleep(interval)
+            interval = min(interval * self.__backoff_factor, self.__max_interval)
+
+
+def format_transitions(transitions: List[StatusTransition], format_status: Callable[[Any], str] = str) -> str:
+    return ", ".join("{0} {1:.1f} s".format(format_status(transition.status), transition.duration)
+                     for transition in transitions[:-1])
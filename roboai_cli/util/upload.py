@@ -0,0 +1,314 @@
+"""
+Resumable, chunked package upload.
+
+The package is uploaded in parts to an upload session of the bot runtime:
+    POST   /api/assistants/<bot uuid>/runtime/uploads
+           {"fileName", "size", "sha256", "chunkSize", "runtimeBase", "operation": "create" | "update"}
+           -> {"uploadId", "chunkSize"}
+    GET    /api/assistants/<bot uuid>/runtime/uploads/<upload id>
+           -> {"uploadId", "chunkSize", "receivedParts": [part indexes]}
+    PUT    /api/assistants/<bot uuid>/runtime/uploads/<upload id>/parts/<part index>
+           body: part content, headers: Content-Range, X-Content-SHA256
+           -> 2xx once the part checksum is verified, 422 when it does not match
+    POST   /api/assistants/<bot uuid>/runtime/uploads/<upload id>/complete
+           {"sha256"} -> the bot runtime, the package is deployed as with a single request upload
+
+The parts can be staged ahead of the completion, e.g. while the bot runtime is still running, since the package
+is only deployed once the upload is completed.
+The upload session is saved next to the package, so that an interrupted upload of the same package
+resumes from the parts the server already acknowledged. Every part is retried with an exponential backoff.
+Servers which do not support upload sessions answer the session creation with 404, 405 or 501, the package is
+then uploaded with a single request. Any other error fails the upload.
+"""
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Union
+
+import requests
+
+from roboai_cli.util.http import SessionRequests
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF = 1.0
+MAX_BACKOFF = 30.0
+UPLOAD_STATE_SUFFIX = ".upload.json"
+# the session creation answered with these status codes means the server has no upload sessions
+NOT_SUPPORTED_STATUS_CODES = (404, 405, 501)
+RETRIABLE_STATUS_CODES = (408, 422, 429, 500, 502, 503, 504)
+
+CREATE_OPERATION = "create"
+UPDATE_OPERATION = "update"
+
+
+class UploadNotSupportedError(Exception):
+    pass
+
+
+class UploadError(Exception):
+    pass
+
+
+def get_backoff_delay(attempt: int, backoff: float) -> float:
+    """
+    Exponential backoff with full jitter.
+    """
+    return random.uniform(0, min(MAX_BACKOFF, backoff * 2 ** attempt))
+
+
+class ChunkedUpload:
+    """
+    Upload of a package file to a bot runtime, in parts of chunk_size bytes with up to `parallel` parts in flight.
+    """
+
+    def __init__(self, base_url: str, bot_uuid: str, package_file: str, base_version: str, operation: str,
+                 headers: dict = None, chunk_size: int = DEFAULT_CHUNK_SIZE, parallel: int = 1,
+                 max_retries: int = DEFAULT_MAX_RETRIES, backoff: float = DEFAULT_BACKOFF,
+                 session: Union[requests.Session, SessionRequests] = None, sha256: str = None):
+        self.__url = "{0}/api/assistants/{1}/runtime/uploads".format(base_url.rstrip("/"), bot_uuid)
+        self.__bot_uuid = bot_uuid
+        self.__package_file = package_file
+        self.__base_version = base_version
+        self.__operation = operation
+        self.__headers = dict(headers or {})
+        self.__chunk_size = chunk_size
+        self.__parallel = max(parallel, 1)
+        self.__max_retries = max_retries
+        self.__backoff = backoff
+        self.__state_path = package_file + UPLOAD_STATE_SUFFIX
+        self.__size = os.path.getsize(package_file)
+        # the package digest, computed when the upload is opened unless it is already known
+        self.__sha256 = sha256
+        self.__http = session or requests.Session()
+        self.__lock = threading.Lock()
+        self.__uploaded = 0
+        self.__upload_id = None
+        self.__received_parts = set()
+        self.__staged = False
+
+    def run(self, progress_callback: Callable[[int], None] = None) -> dict:
+        """
+        Upload the package, resuming a previous upload of the same package when possible.
+
+        Args:
+            progress_callback: called with the total number of bytes acknowledged by the server
+
+        Returns:
+            dict: the server response to the upload completion
+
+        Raises:
+            UploadNotSupportedError: if the server does not support upload sessions
+            UploadError: if a part could not be uploaded after the retries, or the upload could not be completed
+        """
+        self.stage(progress_callback)
+        return self.complete()
+
+    def stage(self, progress_callback: Callable[[int], None] = None):
+        """
+        Upload every part of the package, without deploying it yet.
+
+        Args:
+            progress_callback: called with the total number of bytes acknowledged by the server
+
+        Raises:
+            UploadNotSupportedError: if the server does not support upload sessions
+            UploadError: if a part could not be uploaded after the retries
+        """
+        if self.__upload_id is None:
+            self.open()
+        upload_id, received_parts = self.__upload_id, self.__received_parts
+
+        missing_parts = [part for part in range(self.__get_part_count()) if part not in received_parts]
+        self.__uploaded = sum(self.__get_part_size(part) for part in received_parts)
+        if progress_callback:
+            progress_callback(self.__uploaded)
+
+        if self.__parallel == 1:
+            for part in missing_parts:
+                self.__upload_part(upload_id, part, progress_callback)
+        else:
+            with ThreadPoolExecutor(max_workers=self.__parallel) as pool:
+                futures = [pool.submit(self.__upload_part, upload_id, part, progress_callback)
+                           for part in missing_parts]
+                for future in futures:
+                    future.result()
+        self.__staged = True
+
+    def open(self):
+        """
+        Start an upload session, or resume the session of a previous upload of the same package.
+
+        Raises:
+            UploadNotSupportedError: if the server does not support upload sessions
+            UploadError: if the upload session could not be started
+        """
+        if self.__sha256 is None:
+            self.__sha256 = self.__get_package_digest()
+        upload_id, received_parts = self.__resume()
+        if upload_id is None:
+            upload_id = self.__create()
+            received_parts = set()
+        self.__upload_id, self.__received_parts = upload_id, received_parts
+
+    def complete(self) -> dict:
+        """
+        Complete a staged upload, the server checks the package digest and deploys it.
+
+        Returns:
+            dict: the server response to the upload completion
+
+        Raises:
+            UploadError: if the upload could not be completed
+        """
+        if not self.__staged:
+            raise UploadError("The package must be staged before completing its upload.")
+        response = self.__request("post", "{0}/{1}/complete".format(self.__url, self.__upload_id),
+                                  json={"sha256": self.__sha256})
+        self.__remove_state()
+        return response.json() if response.content else {}
+
+    def __get_part_count(self) -> int:
+        return max(1, -(-self.__size // self.__chunk_size))
+
+    def __get_part_size(self, part: int) -> int:
+        return min(self.__chunk_size, self.__size - part * self.__chunk_size)
+
+    def __get_package_digest(self) -> str:
+        digest = hashlib.sha256()
+        with open(self.__package_file, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def __create(self) -> str:
+        try:
+            response = self.__http.post(self.__url, headers=self.__headers, json={
+                "fileName": os.path.basename(self.__package_file),
+                "size": self.__size,
+                "sha256": self.__sha256,
+                "chunkSize": self.__chunk_size,
+                "runtimeBase": self.__base_version,
+                "operation": self.__operation,
+            })
+        except requests.RequestException as e:
+            raise UploadError("The upload could not be started: {0}".format(e))
+        self.__keep_renewed_token(response)
+        if response.status_code in NOT_SUPPORTED_STATUS_CODES:
+            raise UploadNotSupportedError("The upload could not be started (HTTP {0}).".format(response.status_code))
+        if response.status_code // 100 != 2:
+            raise UploadError("The upload could not be started (HTTP {0}).".format(response.status_code))
+        try:
+            content = response.json()
+            upload_id = content["uploadId"]
+            # the server may enforce its own part size
+            chunk_size = int(content.get("chunkSize") or self.__chunk_size)
+        except (ValueError, TypeError, KeyError, AttributeError):
+            raise UploadError("The upload session could not be read.")
+        if not upload_id or chunk_size <= 0:
+            raise UploadError("The upload session could not be read.")
+        self.__chunk_size = chunk_size
+        self.__save_state(upload_id)
+        return upload_id
+
+    def __resume(self):
+        """
+        Get the upload session and the parts already received of a previous upload of the same package.
+        """
+        state = self.__load_state()
+        if not state:
+            return None, None
+        try:
+            response = self.__http.get("{0}/{1}".format(self.__url, state["uploadId"]), headers=self.__headers)
+        except requests.RequestException:
+            return None, None
+        if response.status_code // 100 != 2:
+            self.__remove_state()
+            return None, None
+        try:
+            content = response.json()
+            self.__chunk_size = int(content.get("chunkSize") or state["chunkSize"])
+            return state["uploadId"], set(content.get("receivedParts", []))
+        except (ValueError, TypeError, KeyError, AttributeError):
+            self.__remove_state()
+            return None, None
+
+    def __upload_part(self, upload_id: str, part: int, progress_callback: Callable[[int], None]):
+        start = part * self.__chunk_size
+        size = self.__get_part_size(part)
+        with open(self.__package_file, "rb") as f:
+            f.seek(start)
+            data = f.read(size)
+        headers = {
+            "Content-Type": "application/octet-stream",
+            "Content-Range": "bytes {0}-{1}/{2}".format(start, start + size - 1, self.__size),
+            "X-Content-SHA256": hashlib.sha256(data).hexdigest(),
+        }
+        self.__request("put", "{0}/{1}/parts/{2}".format(self.__url, upload_id, part), data=data, headers=headers)
+        with self.__lock:
+            self.__uploaded += size
+            if progress_callback:
+                progress_callback(self.__uploaded)
+
+    def __request(self, method: str, url: str, headers: dict = None, **kwargs) -> requests.Response:
+        """
+        Send a request, retrying on connection errors and retriable status codes with an exponential backoff.
+        """
+        headers = dict(self.__headers, **(headers or {}))
+        error = None
+        for attempt in range(self.__max_retries + 1):
+            if attempt:
+                time.sleep(get_backoff_delay(attempt - 1, self.__backoff))
+            try:
+                response = self.__http.request(method, url, headers=headers, **kwargs)
+            except requests.RequestException as e:
+                error = str(e)
+                continue
+            self.__keep_renewed_token(response)
+            if response.status_code // 100 == 2:
+                return response
+            error = "HTTP {0}".format(response.status_code)
+            if response.status_code not in RETRIABLE_STATUS_CODES:
+                break
+        raise UploadError("The upload failed after {0} attempts ({1}), running the deploy again resumes it."
+                          .format(attempt + 1, error))
+
+    def __keep_renewed_token(self, response: requests.Response):
+        """
+        The session sends a request rejected with 401 again with a renewed token, the next requests reuse it.
+        """
+        authorization = response.request.headers.get("Authorization")
+        if authorization and "Authorization" in self.__headers:
+            self.__headers["Authorization"] = authorization
+
+    def __load_state(self):
+        if not os.path.isfile(self.__state_path):
+            return None
+        try:
+            with open(self.__state_path) as f:
+                state = json.load(f)
+        except ValueError:
+            return None
+        if state.get("sha256") != self.__sha256 or state.get("botUuid") != self.__bot_uuid \
+                or state.get("runtimeBase") != self.__base_version or state.get("operation") != self.__operation:
+            return None
+        return state
+
+    def __save_state(self, upload_id: str):
+        with open(self.__state_path, "w") as f:
+            json.dump({
+                "uploadId": upload_id,
+                "sha256": self.__sha256,
+                "botUuid": self.__bot_uuid,
+                "runtimeBase": self.__base_version,
+                "operation": self.__operation,
+                "chunkSize": self.__chunk_size,
+            }, f)
+
+    def __remove_state(self):
+        if os.path.exists(self.__state_path):
+            os.remove(self.__state_path)
@@ -0,0 +1,157 @@
+"""
+Layout of a bot project.
+
+A project is either a single language bot, whose root directory holds the domain, data and models, or a
+multi-language bot, whose languages/ directory holds a bot directory per language along with the stories shared by
+every language. The workspace discovers the layout once and caches the directory listings along with the
+modification time of the directories, so that a directory is only listed again when entries were added or removed.
+The workspaces are shared by path within a process, so every command and helper uses the same listings.
+"""
+import os
+from os.path import join
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import click
+
+from roboai_cli.config.bot_manifest import BotManifest
+from roboai_cli.util.model_registry import ModelRegistry, get_model_registry
+
+LANGUAGES_DIR_NAME = "languages"
+DATA_DIR_NAME = "data"
+MODELS_DIR_NAME = "models"
+DOMAIN_FILE_NAME = "domain.yml"
+# data files whose name contains this marker are stories, the other ones are NLU data
+STORIES_MARKER = "stories"
+
+
+class DataFiles(NamedTuple):
+    """
+    Training data files of a bot directory.
+    """
+    domain: Optional[str]
+    nlu: List[str]
+    stories: List[str]
+
+
+class Workspace:
+    """
+    Cached layout of a bot project: single or multi-language, language directories, manifests, model registries
+    and training data files.
+    """
+
+    def __init__(self, root: str):
+        self.__root = os.path.abspath(root)
+        self.__listings = {}
+        self.__manifests = {}
+        self.__model_registries = {}
+
+    @property
+    def root(self) -> str:
+        return self.__root
+
+    @property
+    def languages_dir(self) -> str:
+        return join(self.__root, LANGUAGES_DIR_NAME)
+
+    @property
+    def is_multi_language(self) -> bool:
+        return os.path.isdir(self.languages_dir)
+
+    def get_languages(self) -> List[str]:
+        """
+        Get the language codes of a multi-language bot, sorted.
+        """
+        if not self.is_multi_language:
+            raise click.UsageError("No languages directory could be found. Please verify if your current directory "
+                                   "is the bot root directory.")
+        return [name for name, is_dir in self.__list(self.languages_dir) if is_dir]
+
+    def get_language_dir(self, language: str) -> str:
+        return join(self.languages_dir, language)
+
+    def get_language_dirs(self, languages: tuple = ()) -> List[str]:
+        """
+        Get the directories of the given languages, or of every language when none is given.
+        The languages without a directory are left out.
+        """
+        return [self.get_language_dir(language) for language in self.get_languages()
+                if not languages or language in languages]
+
+    def get_bot_dirs(self, languages: tuple = ()) -> List[str]:
+        """
+        Get the directories of the given languages, of every language when none is given,
+        or the root directory of a single language bot.
+        """
+        if not languages and not self.is_multi_language:
+            return [self.__root]
+        return self.get_language_dirs(languages)
+
+    def get_shared_stories(self) -> List[str]:
+        """
+        Get the stories files shared by every language of a multi-language bot.
+        """
+        if not self.is_multi_language:
+            return []
+        return self.__get_files(self.languages_dir, lambda name: STORIES_MARKER in name)
+
+    def get_data_files(self, bot_dir: str) -> DataFiles:
+        data_dir = join(bot_dir, DATA_DIR_NAME)
+        domain = self.__get_files(bot_dir, lambda name: name == DOMAIN_FILE_NAME)
+        return DataFiles(domain[0] if domain else None,
+                         self.__get_files(data_dir, lambda name: STORIES_MARKER not in name),
+                         self.__get_files(data_dir, lambda name: STORIES_MARKER in name))
+
+    def get_manifest(self, bot_dir: str) -> BotManifest:
+        if bot_dir not in self.__manifests:
+            self.__manifests[bot_dir] = BotManifest(bot_dir)
+        return self.__manifests[bot_dir]
+
+    def get_model_registry(self, bot_dir: str) -> ModelRegistry:
+        """
+        Get the model registry of a bot directory, created again when models were added or removed.
+        """
+        mtime_ns = self.__get_mtime_ns(join(bot_dir, MODELS_DIR_NAME))
+        cached = self.__model_registries.get(bot_dir)
+        if cached is None or cached[0] != mtime_ns:
+            cached = (mtime_ns, get_model_registry(bot_dir))
+            self.__model_registries[bot_dir] = cached
+        return cached[1]
+
+    def __get_files(self, directory: str, select) -> List[str]:
+        return [join(directory, name) for name, is_dir in self.__list(directory) if not is_dir and select(name)]
+
+    def __list(self, directory: str) -> List[Tuple[str, bool]]:
+        """
+        List the names of the entries of a directory, sorted, along with whether they are directories.
+        The listing is cached until the modification time of the directory changes.
+        """
+        mtime_ns = self.__get_mtime_ns(directory)
+        if mtime_ns is None:
+            self.__listings.pop(directory, None)
+            return []
+        cached = self.__listings.get(directory)
+        if cached is None or cached[0] != mtime_ns:
+            with os.scandir(directory) as entries:
+                cached = (mtime_ns, sorted((entry.name, entry.is_dir()) for entry in entries))
+            self.__listings[directory] = cached
+        return cached[1]
+
+    @staticmethod
+    def __get_mtime_ns(directory: str) -> Optional[int]:
+        try:
+            return os.stat(directory).st_mtime_ns
+        except OSError:
+            return None
+
+
+_workspaces: Dict[str, Workspace] = {}
+
+
+def get_workspace(path: str = ".") -> Workspace:
+    """
+    Get the workspace of a bot root directory, shared by every caller within the process.
+    """
+    root = os.path.abspath(path)
+    if root not in _workspaces:
+        _workspaces[root] = Workspace(root)
+    return _workspaces[root]
@@ -0,0 +1,99 @@
+import os
+import zipfile
+from os.path import join
+
+import pytest
+
+from roboai_cli.util.archive import PROBE_MIN_FILE_SIZE, ZipArchiveWriter, is_incompressible
+
+
+def create_sources(root: str) -> list:
+    os.makedirs(join(root, "data"))
+    contents = {
+        "data/nlu.md": b"## intent:greet\n- hello\n" * 5000,
+        "data/empty.md": b"",
+        "models/model.tar.gz": os.urandom(300 * 1024),
+    }
+    os.makedirs(join(root, "models"))
+    entries = [(join(root, "data"), "data/")]
+    for arcname, content in contents.items():
+        with open(join(root, arcname), "wb") as f:
+            f.write(content)
+        entries.append((join(root, arcname), arcname))
+    return entries
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_archive_is_valid(tmp_path, jobs):
+    entries = create_sources(str(tmp_path))
+    package_path = join(str(tmp_path), "package.zip")
+
+    with ZipArchiveWriter(package_path, jobs=jobs, block_size=64 * 1024) as writer:
+        writer.write(entries)
+
+    with zipfile.ZipFile(package_path) as package_zip:
+        assert package_zip.testzip() is None
+        assert package_zip.namelist() == [arcname for _, arcname in entries]
+        assert package_zip.getinfo("data/").is_dir()
+        for source, arcname in entries[1:]:
+            with open(source, "rb") as f:
+                assert package_zip.read(arcname) == f.read()
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_incompressible_entries_are_stored(tmp_path, jobs):
+    entries = create_sources(str(tmp_path))
+    package_path = join(str(tmp_path), "package.zip")
+
+    with ZipArchiveWriter(package_path, jobs=jobs) as writer:
+        writer.write(entries)
+
+    with zipfile.ZipFile(package_path) as package_zip:
+        assert package_zip.testzip() is None
+        assert package_zip.getinfo("models/model.tar.gz").compress_type == zipfile.ZIP_STORED
+        assert package_zip.getinfo("data/nlu.md").compress_type == zipfile.ZIP_DEFLATED
+
+
+def test_incompressible_probe(tmp_path):
+    path = join(str(tmp_path), "model.bin")
+    with open(path, "wb") as f:
+        f.write(os.urandom(PROBE_MIN_FILE_SIZE))
+
+    assert is_incompressible(path, PROBE_MIN_FILE_SIZE)
+    assert not is_incompressible(join(str(tmp_path), "nlu.md"), 1024)
+
+    with open(path, "wb") as f:
+        f.write(b"- hello there\n" * PROBE_MIN_FILE_SIZE)
+
+    assert not is_incompressible(path, PROBE_MIN_FILE_SIZE * 14)
+
+
+def test_mixed_content_file_is_deflated(tmp_path):
+    # compressible and random regions alternating, like a model archive holding weights and vocabularies
+    path = join(str(tmp_path), "model.bin")
+    with open(path, "wb") as f:
+        for _ in range(8):
+            f.write(os.urandom(256 * 1024))
+            f.write(b"- hello there\n" * (256 * 1024 // 14))
+    package_path = join(str(tmp_path), "package.zip")
+
+    assert not is_incompressible(path, os.path.getsize(path))
+    with ZipArchiveWriter(package_path) as writer:
+        writer.write([(path, "model.bin")])
+
+    with zipfile.ZipFile(package_path) as package_zip:
+        info = package_zip.getinfo("model.bin")
+        assert info.compress_type == zipfile.ZIP_DEFLATED
+        assert info.compress_size < info.file_size * 0.6
+
+
+def test_level_zero_stores_everything(tmp_path):
+    entries = create_sources(str(tmp_path))
+    package_path = join(str(tmp_path), "package.zip")
+
+    with ZipArchiveWriter(package_path, level=0) as writer:
+        writer.write(entries)
+
+    with zipfile.ZipFile(package_path) as package_zip:
+        assert package_zip.testzip() is None
+        assert all(info.compress_type == zipfile.ZIP_STORED for info in package_zip.infolist())
@@ -0,0 +1,90 @@
+import time
+from types import SimpleNamespace
+
+from robo_ai.exception.invalid_token_error import InvalidTokenError
+from robo_ai.model.auth.access_token import AccessToken
+
+from roboai_cli.config.environment_settings import Environment, EnvironmentAuth
+from roboai_cli.config.tool_settings import ToolSettings
+from roboai_cli.util import robo
+
+
+class FakeOauth:
+    def __init__(self):
+        self.calls = []
+
+    def authenticate(self, api_key: str) -> AccessToken:
+        self.calls.append("authenticate")
+        return AccessToken("new-token", "bearer", 3600, "scope")
+
+    def get_token_info(self, token: str):
+        self.calls.append("get_token_info")
+        raise InvalidTokenError()
+
+
+class FakeRoboClient:
+    def __init__(self):
+        self.oauth = FakeOauth()
+        self.session_token = None
+
+    def set_session_token(self, token: str):
+        self.session_token = token
+
+
+def validate_session(monkeypatch, environment: Environment) -> FakeRoboClient:
+    client = FakeRoboClient()
+    saved = []
+    monkeypatch.setattr(robo, "get_current_environment", lambda: environment)
+    monkeypatch.setattr(robo, "get_current_robo_client", lambda: client)
+    monkeypatch.setattr(ToolSettings, "update_environment", lambda self, env: saved.append(env.api_auth_token))
+    monkeypatch.setattr(robo, "set_token_renewer", lambda renew_token: None)
+    robo.validate_robo_session()
+    return client
+
+
+def get_environment(token: str = None, expiry: int = None) -> Environment:
+    return Environment("test", "http://localhost", api_key="key", api_auth_token=token,
+                       api_auth_setting=EnvironmentAuth("user", "password"), api_auth_token_expiry=expiry)
+
+
+def test_valid_token_is_not_checked_again(monkeypatch):
+    environment = get_environment("token", int(time.time()) + 3600)
+
+    assert validate_session(monkeypatch, environment).oauth.calls == []
+    assert environment.api_auth_token == "token"
+
+
+def test_token_about_to_expire_is_renewed(monkeypatch):
+    environment = get_environment("token", int(time.time()) + 60)
+    client = validate_session(monkeypatch, environment)
+
+    assert client.oauth.calls == ["authenticate"]
+    assert client.session_token == environment.api_auth_token == "new-token"
+    assert environment.api_auth_token_expiry >= time.time() + 3500
+
+
+def test_rejected_token_without_expiry_is_renewed(monkeypatch):
+    environment = get_environment("token")
+
+    assert validate_session(monkeypatch, environment).oauth.calls == ["get_token_info", "authenticate"]
+    assert environment.api_auth_token == "new-token"
+
+
+def test_token_without_expiry_is_not_renewed_ahead(monkeypatch):
+    environment = get_environment("token")
+    monkeypatch.setattr(FakeOauth, "get_token_info", lambda self, token: self.calls.append("get_token_info")
+                        or SimpleNamespace(active=True, exp=None))
+
+    assert validate_session(monkeypatch, environment).oauth.calls == ["get_token_info"]
+    assert environment.api_auth_token == "token"
+    assert environment.api_auth_token_expiry is None
+
+
+def test_new_token_without_expiry_is_stored_without_one(monkeypatch):
+    environment = get_environment()
+    monkeypatch.setattr(FakeOauth, "authenticate", lambda self, api_key: self.calls.append("authenticate")
+                        or AccessToken("new-token", "bearer", None, "scope"))
+
+    assert validate_session(monkeypatch, environment).oauth.calls == ["authenticate"]
+    assert environment.api_auth_token == "new-token"
+    assert environment.api_auth_token_expiry is None
@@ -0,0 +1,39 @@
+import threading
+import time
+
+import click
+
+from roboai_cli.util.batch import format_batch_results, run_batch
+
+
+def test_run_batch_isolates_failures_and_bounds_concurrency():
+    lock = threading.Lock()
+    running = [0, 0]
+
+    def get_task(name: str):
+        def task(report):
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            report("working")
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+            if name == "es":
+                raise click.ClickException("The bot runtime is dead.")
+            return "deployed"
+        return task
+
+    names = ["en", "es", "fr", "pt", "de"]
+    results = run_batch({name: get_task(name) for name in names}, concurrency=2)
+
+    assert [result.name for result in results] == names
+    assert [result.succeeded for result in results] == [True, False, True, True, True]
+    assert results[1].message == "The bot runtime is dead."
+    assert results[0].message == "deployed"
+    assert running[1] == 2
+    assert all(result.duration >= 0.05 for result in results)
+
+    table = format_batch_results(results, "Language").splitlines()
+    assert table[0].startswith("Language")
+    assert "failed" in table[2] and "The bot runtime is dead." in table[2]
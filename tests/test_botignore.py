@@ -0,0 +1,69 @@
+import pytest
+
+from roboai_cli.util.botignore import BotIgnore
+
+
+@pytest.mark.parametrize("path, is_dir, ignored", [
+    ("custom/__pycache__", True, True),
+    ("actions/action.pyc", False, True),
+    ("actions/action.py", False, False),
+    ("venv", True, True),
+    ("custom/venv", True, True),
+    (".botignore", False, True),
+    ("build", True, True),
+    ("custom/build.py", False, False),
+])
+def test_default_rules(path, is_dir, ignored):
+    bot_ignore = BotIgnore(["__pycache__", "*.py[cod]", ".*", "venv", "build"])
+
+    assert bot_ignore.match(path, is_dir) == ignored
+
+
+def test_anchored_rules():
+    bot_ignore = BotIgnore(["/models", "custom/tmp"])
+
+    assert bot_ignore.match("models", is_dir=True)
+    assert not bot_ignore.match("languages/en/models", is_dir=True)
+    assert bot_ignore.match("custom/tmp", is_dir=True)
+    assert not bot_ignore.match("actions/custom/tmp", is_dir=True)
+
+
+def test_double_star_rules():
+    bot_ignore = BotIgnore(["**/logs", "data/**/*.bak", "cache/**"])
+
+    assert bot_ignore.match("logs", is_dir=True)
+    assert bot_ignore.match("custom/components/logs", is_dir=True)
+    assert bot_ignore.match("data/nlu.bak")
+    assert bot_ignore.match("data/a/b/nlu.bak")
+    assert not bot_ignore.match("custom/nlu.bak")
+    assert bot_ignore.match("cache/a/b.txt")
+    assert not bot_ignore.match("cache", is_dir=True)
+
+
+def test_directory_only_rules():
+    bot_ignore = BotIgnore(["output/"])
+
+    assert bot_ignore.match("output", is_dir=True)
+    assert not bot_ignore.match("output")
+    assert bot_ignore.is_ignored("output/results.json")
+
+
+def test_negation_precedence():
+    bot_ignore = BotIgnore(["*.md", "!README.md", "docs/", "!docs/index.md"])
+
+    assert bot_ignore.match("data/nlu.md")
+    assert not bot_ignore.match("README.md")
+    assert bot_ignore.is_ignored("docs/index.md")
+
+    bot_ignore = BotIgnore(["!README.md", "*.md"])
+
+    assert bot_ignore.match("README.md")
+
+
+def test_comments_and_escapes():
+    bot_ignore = BotIgnore(["# comment", "", "\\#notes", "\\!important", "trailing   "])
+
+    assert len(bot_ignore.rules) == 3
+    assert bot_ignore.match("#notes")
+    assert bot_ignore.match("!important")
+    assert bot_ignore.match("trailing")
@@ -0,0 +1,66 @@
+import json
+import multiprocessing
+import os
+
+from roboai_cli.config import store as config_store
+from roboai_cli.config.store import ConfigStore
+
+
+def get_store(tmp_path, monkeypatch) -> ConfigStore:
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path))
+    return ConfigStore("robo-ai", {"CURRENT_ENV": ""}, globalConfigPath=True)
+
+
+def test_config_file_is_read_again_only_once_changed(tmp_path, monkeypatch):
+    store = get_store(tmp_path, monkeypatch)
+    reads = []
+    read_configs = config_store.readConfigs
+    monkeypatch.setattr(config_store, "readConfigs", lambda path: reads.append(path) or read_configs(path))
+
+    assert store.get("CURRENT_ENV") == ""
+    assert store.has("CURRENT_ENV")
+    assert reads == []
+
+    # another process updates the file
+    with open(store.path, "w") as f:
+        json.dump({"CURRENT_ENV": "local", "local": {"API_KEY": "key"}}, f)
+    assert store.get("CURRENT_ENV") == "local"
+    assert store.get("local") == {"API_KEY": "key"}
+    assert len(reads) == 1
+
+
+def test_batched_updates_are_written_at_once(tmp_path, monkeypatch):
+    store = get_store(tmp_path, monkeypatch)
+    writes = []
+    write_configs = config_store.writeConfigs
+    monkeypatch.setattr(config_store, "writeConfigs",
+                        lambda path, data: writes.append(path) or write_configs(path, data))
+
+    with store.batch():
+        store.set("local", {"API_KEY": "key"})
+        store.set("CURRENT_ENV", "local")
+        assert store.get("CURRENT_ENV") == "local"
+
+    assert len(writes) == 1
+    with open(store.path) as f:
+        assert json.load(f) == {"CURRENT_ENV": "local", "local": {"API_KEY": "key"}}
+    assert sorted(os.listdir(os.path.dirname(store.path))) == ["config.json", "config.json.lock"]
+
+
+def set_keys(config_dir: str, prefix: str, count: int):
+    os.environ["XDG_CONFIG_HOME"] = config_dir
+    store = ConfigStore("robo-ai", {}, globalConfigPath=True)
+    for index in range(count):
+        store.set("{0}-{1}".format(prefix, index), index)
+
+
+def test_updates_of_concurrent_processes_are_kept(tmp_path, monkeypatch):
+    get_store(tmp_path, monkeypatch)
+    processes = [multiprocessing.Process(target=set_keys, args=(str(tmp_path), prefix, 20)) for prefix in "ab"]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    store = get_store(tmp_path, monkeypatch)
+    assert len(store.all()) == 41
@@ -0,0 +1,36 @@
+import json
+import time
+
+from roboai_cli.util.deploy_timings import (
+    DEPLOY_HISTORY_FILE_NAME,
+    DeployTimings,
+    append_deploy_history,
+    format_deploy_record,
+    get_deploy_record,
+    measure,
+)
+
+
+def test_deploy_record_is_appended_to_the_history(tmp_path):
+    timings = DeployTimings()
+    with measure(timings, "packaging"):
+        time.sleep(0.01)
+    deployment = DeployTimings()
+    deployment.upload_size = 2 * 1024 * 1024
+    with deployment.measure("upload"):
+        time.sleep(0.01)
+    with measure(None, "waiting_running"):
+        pass
+
+    record = get_deploy_record(timings, {"en": deployment}, api_calls=7, total=1.5)
+    assert record["api_calls"] == 7
+    assert record["phases"]["packaging"] >= 0.01
+    assert record["deployments"]["en"]["upload"]["size"] == 2 * 1024 * 1024
+    assert 0 < record["deployments"]["en"]["upload"]["throughput_mb_s"] <= 200
+    assert "Upload throughput" in format_deploy_record(record)
+
+    path = append_deploy_history(str(tmp_path), record)
+    append_deploy_history(str(tmp_path), record)
+    assert path == str(tmp_path / DEPLOY_HISTORY_FILE_NAME)
+    with open(path) as f:
+        assert [json.loads(line) for line in f] == [record, record]
@@ -0,0 +1,121 @@
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+import pytest
+import requests
+from robo_ai.exception.not_found_error import NotFoundError
+from robo_ai.model.config import Config
+from robo_ai.resources import client_resource, oauth
+from robo_ai.robo_ai import RoboAi
+
+from roboai_cli.util.http import (
+    RateLimiter,
+    create_http_session,
+    install_http_session,
+    set_token_renewer,
+    uninstall_http_session,
+)
+
+
+class CountingServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), CountingHandler)
+        self.connections = 0
+        self.requests = 0
+
+    @property
+    def url(self) -> str:
+        return "http://127.0.0.1:{0}".format(self.server_address[1])
+
+
+class CountingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_GET(self):
+        self.server.requests += 1
+        # the runtimes are only found with the renewed token
+        authorized = self.headers.get("Authorization") in (None, "bearer renewed")
+        self.send_response(404 if authorized else 401)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+@pytest.fixture
+def server():
+    counting_server = CountingServer()
+    thread = threading.Thread(target=counting_server.serve_forever, daemon=True)
+    thread.start()
+    yield counting_server
+    counting_server.shutdown()
+    counting_server.server_close()
+
+
+@pytest.fixture
+def http_session():
+    install_http_session(create_http_session())
+    yield
+    uninstall_http_session()
+    assert client_resource.requests is requests
+    assert oauth.requests is requests
+
+
+def test_sdk_requests_reuse_the_connection(server, http_session):
+    robo = RoboAi(Config(server.url, http_auth={"username": None, "password": None}))
+
+    for _ in range(5):
+        with pytest.raises(NotFoundError):
+            robo.assistants.runtimes.get("bot")
+
+    assert server.requests == 5
+    assert server.connections == 1
+
+
+def test_request_is_sent_again_once_the_rejected_token_is_renewed(server, http_session):
+    robo = RoboAi(Config(server.url, http_auth={"username": None, "password": None}))
+    robo.set_session_token("expired")
+    rejected_tokens = []
+
+    def renew_token(token: str) -> str:
+        rejected_tokens.append(token)
+        robo.set_session_token("renewed")
+        return "renewed"
+
+    set_token_renewer(renew_token)
+    try:
+        for _ in range(2):
+            with pytest.raises(NotFoundError):
+                robo.assistants.runtimes.get("bot")
+    finally:
+        set_token_renewer(None)
+        robo.set_session_token(None)
+
+    assert rejected_tokens == ["expired"]
+    assert server.requests == 3
+
+
+def test_rate_limiter_spaces_requests_after_the_burst():
+    now = [0.0]
+    sleeps = []
+
+    def sleep(delay: float):
+        sleeps.append(round(delay, 6))
+        now[0] += delay
+
+    rate_limiter = RateLimiter(rate=4, burst=2, clock=lambda: now[0], sleep=sleep)
+    for _ in range(4):
+        rate_limiter.acquire()
+    assert sleeps == [0.25, 0.25]
+
+    now[0] += 10
+    rate_limiter.acquire()
+    assert sleeps == [0.25, 0.25]
@@ -0,0 +1,45 @@
+from roboai_cli.util.log_stats import format_log_stats, get_log_stats, get_percentile
+
+PREDICTED = "DEBUG    rasa.core.processor  - Predicted next action 'action_listen' with confidence 1.00."
+
+LINES = [
+    "2021-01-27 10:15:00.000 DEBUG    rasa.core.processor  - Received user message 'hi' with intent '{}'",
+    "2021-01-27 10:15:00.100 DEBUG    rasa.core.actions.action  - Calling action endpoint to run action 'action_a'.",
+    "2021-01-27 10:15:02.600 DEBUG    rasa.core.processor  - Action 'action_a' ended with events '[]'.",
+    "2021-01-27 10:15:02.700 " + PREDICTED,
+    "2021-01-27 10:16:30.000 DEBUG    rasa.core.processor  - Received user message 'bye' with intent '{}'",
+    "2021-01-27 10:16:30.000 DEBUG    rasa.core.actions.action  - Calling action endpoint to run action 'action_b'.",
+    "2021-01-27 10:16:30.200 ERROR    rasa.core.actions.action  - Failed to run custom action 'action_b'.",
+    "Traceback (most recent call last):",
+    "  File \"rasa/core/actions/action.py\", line 1, in run",
+    "requests.exceptions.ConnectionError: HTTPConnectionPool(host='actions', port=5055)",
+    "2021-01-27 10:16:30.500 " + PREDICTED,
+]
+
+
+def test_log_stats():
+    stats = get_log_stats(LINES, slow_action_threshold=1.0)
+
+    assert stats.line_count == len(LINES)
+    assert stats.time_range == ("2021-01-27 10:15:00", "2021-01-27 10:16:30")
+    assert stats.levels == {"DEBUG": 7, "ERROR": 1}
+    assert stats.requests_per_minute == {"2021-01-27 10:15": 1, "2021-01-27 10:16": 1}
+    assert stats.exceptions == {"requests.exceptions.ConnectionError": 1}
+    assert list(stats.slow_actions) == ["action_a"]
+    assert round(stats.slow_actions["action_a"][0], 3) == 2.5
+    percentiles = stats.get_latency_percentiles()
+    assert round(percentiles[50], 3) == 0.5
+    assert round(percentiles[99], 3) == 2.7
+
+    report = format_log_stats(stats)
+    assert "Request latency p95" in report
+    assert "requests.exceptions.ConnectionError" in report
+
+
+def test_percentile():
+    values = list(range(1, 101))
+
+    assert get_percentile(values, 50) == 50
+    assert get_percentile(values, 95) == 95
+    assert get_percentile([3.0], 99) == 3.0
+    assert get_percentile([], 50) is None
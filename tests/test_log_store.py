@@ -0,0 +1,60 @@
+import os
+from datetime import datetime
+
+from roboai_cli.util.log_store import LogStore
+
+
+def get_lines(start: int, end: int) -> list:
+    return ["2021-01-27 10:{0:02d}:00 INFO line {0}".format(minute) for minute in range(start, end)]
+
+
+def test_store_only_keeps_new_lines_across_instances(tmp_path):
+    store = LogStore(str(tmp_path))
+
+    assert store.advance(get_lines(0, 5)) == get_lines(0, 5)
+    # the buffer fetched again has both old and new lines
+    assert LogStore(str(tmp_path)).advance(get_lines(2, 8)) == get_lines(5, 8)
+    assert list(LogStore(str(tmp_path)).query()) == get_lines(0, 8)
+
+
+def test_query_by_time_range_and_pattern(tmp_path):
+    store = LogStore(str(tmp_path), segment_size=200)
+    lines = get_lines(0, 10)
+    lines.insert(4, "Traceback (most recent call last):")
+    store.advance(lines)
+
+    assert len(os.listdir(str(tmp_path))) > 2
+    assert list(store.query(datetime(2021, 1, 27, 10, 3), datetime(2021, 1, 27, 10, 5))) == \
+        get_lines(3, 4) + ["Traceback (most recent call last):"] + get_lines(4, 6)
+    assert list(store.query(datetime(2021, 1, 27, 10, 8))) == get_lines(8, 10)
+    assert list(store.query(pattern=r"line [27]$")) == ["2021-01-27 10:02:00 INFO line 2",
+                                                        "2021-01-27 10:07:00 INFO line 7"]
+
+
+def test_query_seeks_with_the_timestamp_index(tmp_path, monkeypatch):
+    monkeypatch.setattr("roboai_cli.util.log_store.INDEX_INTERVAL", 2)
+    store = LogStore(str(tmp_path))
+    store.advance(get_lines(0, 50))
+
+    assert list(store.query(datetime(2021, 1, 27, 10, 25), datetime(2021, 1, 27, 10, 26))) == get_lines(25, 27)
+
+
+def test_interrupted_append_is_discarded(tmp_path):
+    store = LogStore(str(tmp_path))
+    store.advance(get_lines(0, 3))
+    with open(str(tmp_path / "00000001.log"), "a") as f:
+        f.write("2021-01-27 10:03:00 INFO partial")
+
+    store = LogStore(str(tmp_path))
+    assert list(store.query()) == get_lines(0, 3)
+    store.advance(get_lines(0, 5))
+    assert list(store.query()) == get_lines(0, 5)
+
+
+def test_oldest_segments_are_removed(tmp_path):
+    store = LogStore(str(tmp_path), segment_size=100, max_size=300)
+    for minute in range(0, 20):
+        store.advance(get_lines(minute, minute + 1))
+
+    assert store.size <= 300
+    assert list(store.query()) == get_lines(20 - len(list(store.query())), 20)
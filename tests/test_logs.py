@@ -44,10 +44,26 @@ def test_logs_language(runner):
 
 def test_logs_multiple_language(runner):
 
+    path = 'tests/test_bots/test_logs/multi_bot'
+    chdir(path)
     result = runner.invoke(cli, ['logs', 'en', 'es'])
 
     assert result.exit_code == 0
-    assert "Please select only one bot to check the logs." in result.output
+    assert "Displaying logs for bots 'en', 'es'\n" in result.output
+
+    chdir(cwd)
+
+
+def test_logs_multiple_language_with_bot_uuid(runner):
+
+    path = 'tests/test_bots/test_logs/multi_bot'
+    chdir(path)
+    result = runner.invoke(cli, ['logs', 'en', 'es', '--bot-uuid', 'test-rasa-bot'])
+
+    assert result.exit_code == 2
+    assert "A bot UUID can only be selected for a single language." in result.output
+
+    chdir(cwd)
 
 
 def test_logs_default_structure(runner):
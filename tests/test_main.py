@@ -0,0 +1,50 @@
+import importlib
+import sys
+
+import click
+import requests
+from click.testing import CliRunner
+from robo_ai.resources import client_resource, oauth
+
+from roboai_cli.main import COMMANDS, cli
+from roboai_cli.util.http import SessionRequests
+
+
+def test_commands_are_listed_with_their_help():
+    for name, (module_name, help) in COMMANDS.items():
+        command = importlib.import_module(module_name).command
+        assert command.name == name
+        assert command.help == help
+
+
+def test_help_does_not_import_the_commands(monkeypatch):
+    for module_name, _ in COMMANDS.values():
+        monkeypatch.delitem(sys.modules, module_name, raising=False)
+    monkeypatch.setattr(cli, "commands", {})
+
+    result = CliRunner().invoke(cli, ["--help"])
+
+    assert result.exit_code == 0
+    assert "Close the current session in the ROBO.AI platform." in result.output
+    assert not any(module_name in sys.modules for module_name, _ in COMMANDS.values())
+    assert CliRunner().invoke(cli, ["logout", "--help"]).exit_code == 0
+    assert "roboai_cli.commands.logout" in sys.modules
+    assert "roboai_cli.commands.deploy" not in sys.modules
+
+
+def test_platform_commands_use_the_http_session_while_they_run(monkeypatch):
+    sdk_requests = []
+
+    @click.command()
+    def command():
+        sdk_requests.append((client_resource.requests, oauth.requests))
+
+    monkeypatch.setattr(cli, "commands", {"status": command, "seed": command})
+
+    assert CliRunner().invoke(cli, ["status"]).exit_code == 0
+    assert CliRunner().invoke(cli, ["seed"]).exit_code == 0
+
+    assert all(isinstance(module, SessionRequests) for module in sdk_requests[0])
+    assert sdk_requests[1] == (requests, requests)
+    assert client_resource.requests is requests
+    assert oauth.requests is requests
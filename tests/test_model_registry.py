@@ -0,0 +1,94 @@
+import io
+import json
+import os
+import tarfile
+from os import makedirs
+from os.path import join
+
+from roboai_cli.util.model_registry import CORE_MODEL, FULL_MODEL, NLU_MODEL, ModelRegistry, read_model_info
+
+
+def create_model(models_dir: str, name: str, trained_at: float, stories: str = "stories",
+                 parts: tuple = ("core", "nlu"), size: int = 0):
+    fingerprint = json.dumps({"trained_at": trained_at, "stories": stories, "version": "1.10.0"}).encode("utf-8")
+    with tarfile.open(join(models_dir, name), "w:gz") as model_tar:
+        for content, arcname in [(fingerprint, "fingerprint.json")] + \
+                [(os.urandom(size), part + "/data.bin") for part in parts]:
+            info = tarfile.TarInfo(arcname)
+            info.size = len(content)
+            model_tar.addfile(info, io.BytesIO(content))
+
+
+def test_read_model_info(tmp_path):
+    models_dir = join(str(tmp_path), "languages", "en", "models")
+    makedirs(models_dir)
+    create_model(models_dir, "model-en.tar.gz", 1600000000.0)
+    create_model(models_dir, "nlu-model-en.tar.gz", 1600000000.0, parts=("nlu",))
+    create_model(models_dir, "core-model-en.tar.gz", 1600000100.0, parts=("core",))
+
+    full_model = read_model_info(join(models_dir, "model-en.tar.gz"), "en")
+    nlu_model = read_model_info(join(models_dir, "nlu-model-en.tar.gz"), "en")
+
+    assert full_model.type == FULL_MODEL
+    assert nlu_model.type == NLU_MODEL
+    assert read_model_info(join(models_dir, "core-model-en.tar.gz"), "en").type == CORE_MODEL
+    assert full_model.created == 1600000000.0
+    # the training time is not part of the fingerprint
+    assert full_model.fingerprint == read_model_info(join(models_dir, "core-model-en.tar.gz")).fingerprint
+
+
+def test_read_model_info_stops_once_the_type_is_known(tmp_path, monkeypatch):
+    create_model(str(tmp_path), "model-en.tar.gz", 1600000000.0, parts=("core", "nlu", "nlu", "nlu"))
+    read_members = []
+    next_member = tarfile.TarFile.next
+
+    def next(model_tar):
+        member = next_member(model_tar)
+        read_members.append(member.name if member else None)
+        return member
+
+    monkeypatch.setattr(tarfile.TarFile, "next", next)
+
+    assert read_model_info(join(str(tmp_path), "model-en.tar.gz")).type == FULL_MODEL
+    # the members following the first NLU one are not read
+    assert read_members[-1] == "nlu/data.bin"
+    assert read_members.count("nlu/data.bin") == 1
+
+
+def test_latest_and_fingerprint_lookup(tmp_path):
+    models_dir = join(str(tmp_path), "languages", "en", "models")
+    makedirs(models_dir)
+    create_model(models_dir, "model-en-b.tar.gz", 1600000200.0, stories="old")
+    create_model(models_dir, "model-en-a.tar.gz", 1600000300.0, stories="new")
+    # file times do not matter, only the training time
+    os.utime(join(models_dir, "model-en-b.tar.gz"), (2000000000, 2000000000))
+
+    registry = ModelRegistry(models_dir)
+    assert registry.get_latest().name == "model-en-a.tar.gz"
+    assert registry.get_latest().language == "en"
+    old_fingerprint = registry.get_by_name("model-en-b.tar.gz").fingerprint
+    assert registry.get_by_fingerprint(old_fingerprint).name == "model-en-b.tar.gz"
+
+    create_model(models_dir, "model-en-c.tar.gz", 1600000400.0, stories="newer")
+    assert ModelRegistry(models_dir).get_latest().name == "model-en-c.tar.gz"
+    os.remove(join(models_dir, "model-en-c.tar.gz"))
+    assert ModelRegistry(models_dir).get_latest().name == "model-en-a.tar.gz"
+
+
+def test_prune(tmp_path):
+    models_dir = join(str(tmp_path), "models")
+    makedirs(models_dir)
+    for index in range(4):
+        create_model(models_dir, "model-{0}.tar.gz".format(index), 1600000000.0 + index, stories=str(index),
+                     size=10000)
+
+    registry = ModelRegistry(models_dir)
+    assert [model.name for model in registry.prune(keep=3, dry_run=True)] == ["model-0.tar.gz"]
+    assert os.path.exists(join(models_dir, "model-0.tar.gz"))
+
+    removed = registry.prune(keep=3, max_bytes=registry.get_latest().size * 2 + 1000)
+    assert [model.name for model in removed] == ["model-1.tar.gz", "model-0.tar.gz"]
+    assert sorted(os.listdir(models_dir)) == ["model-2.tar.gz", "model-3.tar.gz"]
+    assert [model.name for model in ModelRegistry(models_dir).models] == ["model-3.tar.gz", "model-2.tar.gz"]
+    # the latest model is always kept
+    assert [model.name for model in registry.prune(max_bytes=0)] == ["model-2.tar.gz"]
@@ -0,0 +1,195 @@
+import threading
+import zipfile
+import zlib
+from os import makedirs, remove, utime
+from os.path import dirname, join
+
+import click
+import pytest
+
+from roboai_cli.util.archive import RawSource
+from roboai_cli.util.botignore import BotIgnore
+from roboai_cli.util.package_cache import PackageCache
+from roboai_cli.util.packaging import (
+    get_package_plan,
+    get_shared_entries,
+    lock_build_dir,
+    write_package,
+    write_packages,
+)
+from roboai_cli.util.robo import create_package, create_packages
+
+
+def create_file(path: str, content: str = ""):
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def create_bot(root: str, languages: tuple = ("en",)):
+    for directory in ["actions", "custom/__pycache__", "languages"]:
+        makedirs(join(root, directory), exist_ok=True)
+    for file in ["actions/action.py", "custom/__pycache__/component.pyc", "languages/stories.md",
+                 "credentials.yml", "endpoints.yml", "__init__.py", "requirements.txt", ".botignore"]:
+        create_file(join(root, file))
+    for language in languages:
+        language_dir = join(root, "languages", language)
+        for directory in ["data", "models"]:
+            makedirs(join(language_dir, directory), exist_ok=True)
+        for file in ["data/nlu.md", "config.yml", "domain.yml", "models/model-{0}.tar.gz".format(language)]:
+            create_file(join(language_dir, file))
+        create_file(join(language_dir, "robo-manifest.json"), '{"bot_id": "1234", "package_digest": "abcd"}')
+
+
+def test_package_plan_layout(tmp_path):
+    root = str(tmp_path)
+    create_bot(root)
+
+    plan = get_package_plan(join(root, "languages", "en"), root, None, BotIgnore(["__pycache__", ".*"]))
+    arcnames = [entry.arcname for entry in plan]
+
+    assert arcnames == [
+        "__init__.py", "actions/", "actions/action.py", "config.yml", "credentials.yml", "custom/", "data/",
+        "data/nlu.md", "data/stories.md", "domain.yml", "endpoints.yml", "models/", "models/model-en.tar.gz",
+        "requirements.txt", "robo-manifest.json",
+    ]
+
+
+def test_package_plan_requires_a_model(tmp_path):
+    root = str(tmp_path)
+    create_bot(root)
+
+    with pytest.raises(click.UsageError):
+        get_package_plan(join(root, "languages", "en"), root, "missing.tar.gz", BotIgnore())
+    remove(join(root, "languages", "en", "models", "model-en.tar.gz"))
+    with pytest.raises(click.UsageError):
+        get_package_plan(join(root, "languages", "en"), root, None, BotIgnore())
+
+
+def test_package_plan_reads_from_bot_tree(tmp_path):
+    root = str(tmp_path)
+    create_bot(root)
+
+    plan = get_package_plan(join(root, "languages", "en"), root, None, BotIgnore())
+    sources = {entry.arcname: entry.source for entry in plan}
+
+    assert sources["data/stories.md"] == join(root, "languages", "stories.md")
+    assert sources["robo-manifest.json"] == b'{\n    "bot_id": "1234"\n}'
+    assert sources["models/model-en.tar.gz"] == join(root, "languages", "en", "models", "model-en.tar.gz")
+    assert "custom/__pycache__/component.pyc" in sources
+
+
+def test_package_cache_reuses_unchanged_entries(tmp_path):
+    root = str(tmp_path)
+    create_bot(root)
+    create_file(join(root, "languages", "en", "domain.yml"), "intents:\n- greet\n")
+    build_dir = join(root, "build")
+    makedirs(build_dir)
+    package_path = join(build_dir, "package.zip")
+    plan = get_package_plan(join(root, "languages", "en"), root, None, BotIgnore())
+    write_package(plan, package_path)
+
+    create_file(join(root, "languages", "en", "domain.yml"), "intents:\n- greet\n- goodbye\n")
+    entries = PackageCache(build_dir, package_path, zlib.Z_DEFAULT_COMPRESSION).resolve(plan)
+    raw_arcnames = [arcname for source, arcname in entries if isinstance(source, RawSource)]
+    write_package(plan, package_path)
+
+    assert "domain.yml" not in raw_arcnames
+    assert "actions/action.py" in raw_arcnames
+    with zipfile.ZipFile(package_path) as package_zip:
+        assert package_zip.testzip() is None
+        assert package_zip.read("domain.yml") == b"intents:\n- greet\n- goodbye\n"
+
+
+def test_package_is_reproducible(tmp_path):
+    root = str(tmp_path)
+    create_bot(root)
+    create_file(join(root, "languages", "en", "domain.yml"), "intents:\n- greet\n" * 1000)
+    plan = get_package_plan(join(root, "languages", "en"), root, None, BotIgnore())
+    contents = []
+    for jobs in [1, 4]:
+        build_dir = join(root, "build-{0}".format(jobs))
+        makedirs(build_dir)
+        write_package(plan, join(build_dir, "package.zip"), jobs=jobs)
+        # touching the files only changes their modification time
+        for entry in plan:
+            if isinstance(entry.source, str):
+                utime(entry.source, (0, 0))
+        with open(join(build_dir, "package.zip"), "rb") as f:
+            contents.append(f.read())
+
+    assert contents[0] == contents[1]
+
+
+def test_packages_share_common_entries(tmp_path):
+    root = str(tmp_path)
+    create_bot(root, ("en", "pt"))
+    create_file(join(root, "actions", "action.py"), "class ActionGreet:\n    pass\n" * 1000)
+    plans = {language: get_package_plan(join(root, "languages", language), root, None, BotIgnore())
+             for language in ["en", "pt"]}
+    package_paths = {language: join(root, "build", language, "package.zip") for language in plans}
+    for package_path in package_paths.values():
+        makedirs(dirname(package_path))
+    shared_package_path = join(root, "build", "_shared", "package.zip")
+
+    write_packages(plans, package_paths, shared_package_path)
+
+    shared_arcnames = [entry.arcname for entry in get_shared_entries(list(plans.values()))]
+    assert "actions/action.py" in shared_arcnames
+    assert "domain.yml" not in shared_arcnames
+    with zipfile.ZipFile(shared_package_path) as shared_zip:
+        assert shared_zip.namelist() == shared_arcnames
+    # the shared compressed data is copied as is, so each package is the same as when built on its own
+    single_package_path = join(root, "single", "package.zip")
+    makedirs(dirname(single_package_path))
+    write_package(plans["pt"], single_package_path)
+    with open(package_paths["pt"], "rb") as package, open(single_package_path, "rb") as single_package:
+        assert package.read() == single_package.read()
+
+
+def test_only_several_languages_get_their_own_build_directory(tmp_path, monkeypatch):
+    root = str(tmp_path)
+    create_bot(root, ("en", "pt"))
+    monkeypatch.chdir(root)
+
+    assert create_package(join(root, "languages", "en"), root, None) == join("build", "package.zip")
+    assert create_packages(root, ["en", "pt"]) == {"en": join("build", "en", "package.zip"),
+                                                   "pt": join("build", "pt", "package.zip")}
+
+
+def test_package_report(tmp_path):
+    root = str(tmp_path)
+    create_bot(root)
+    create_file(join(root, "languages", "en", "domain.yml"), "intents:\n- greet\n" * 1000)
+    build_dir = join(root, "build")
+    makedirs(build_dir)
+    package_path = join(build_dir, "package.zip")
+    plan = get_package_plan(join(root, "languages", "en"), root, None, BotIgnore())
+    write_package(plan, package_path)
+
+    report = write_package(plan, package_path)
+
+    entries = {entry["arcname"]: entry for entry in report.entries}
+    assert "actions/" not in entries
+    assert entries["domain.yml"]["size"] == len("intents:\n- greet\n") * 1000
+    assert entries["domain.yml"]["compressed_size"] < entries["domain.yml"]["size"]
+    assert entries["domain.yml"]["copied"]
+    assert not entries["robo-manifest.json"]["copied"]
+    assert report.get_top_entries(1)[0]["arcname"] == "domain.yml"
+    assert set(report.timings) == {"hashing", "reading", "compression", "writing"}
+    assert "domain.yml" in report.format()
+
+
+def test_build_dir_lock_serializes_builds(tmp_path):
+    events = []
+    with lock_build_dir(str(tmp_path)):
+        def build():
+            with lock_build_dir(str(tmp_path)):
+                events.append("second build")
+
+        thread = threading.Thread(target=build)
+        thread.start()
+        thread.join(timeout=0.2)
+        events.append("first build")
+    thread.join(timeout=5)
+
+    assert events == ["first build", "second build"]
@@ -0,0 +1,134 @@
+import os
+import sys
+import threading
+
+import click
+import pytest
+
+from roboai_cli.util.rasa_daemon import (
+    RUN_REQUEST,
+    STATUS_REQUEST,
+    STOP_REQUEST,
+    DaemonError,
+    ModelCache,
+    RasaDaemon,
+    request_daemon,
+    run_rasa,
+    send_message,
+)
+
+
+@pytest.fixture
+def socket_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "daemon.sock")
+    monkeypatch.setattr("roboai_cli.util.rasa_daemon.get_daemon_socket_path", lambda: path)
+    return path
+
+
+def start_daemon(socket_path, run_command, handle_message=None, load=None):
+    daemon = RasaDaemon(socket_path, ModelCache(load or (lambda model_path, endpoints_path: model_path)),
+                        run_command, handle_message or (lambda model, sender_id, text: []))
+    thread = threading.Thread(target=daemon.serve, daemon=True)
+    thread.start()
+    return thread
+
+
+def stop_daemon(thread):
+    list(request_daemon({"type": STOP_REQUEST}))
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+
+
+def test_model_cache_evicts_the_least_recently_used_model(tmp_path):
+    paths = []
+    for name in ["a", "b", "c"]:
+        (tmp_path / name).write_text(name)
+        paths.append(str(tmp_path / name))
+    loads = []
+    cache = ModelCache(lambda model_path, endpoints_path: loads.append(model_path) or model_path, max_size=2)
+
+    cache.get(paths[0])
+    cache.get(paths[1])
+    cache.get(paths[0])
+    cache.get(paths[2])
+    assert cache.model_paths == [paths[0], paths[2]]
+
+    # a model replaced on disk is loaded again
+    stat = os.stat(paths[0])
+    os.utime(paths[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+    cache.get(paths[0])
+    assert loads == [paths[0], paths[1], paths[2], paths[0]]
+
+
+def test_run_streams_the_output_of_the_daemon_job(socket_path, tmp_path, monkeypatch, capsys):
+    def run_command(args):
+        print("training", " ".join(args), "in", os.getcwd())
+        sys.exit(3)
+
+    monkeypatch.chdir(str(tmp_path))
+    thread = start_daemon(socket_path, run_command)
+    try:
+        assert run_rasa(["train", "--out", "models"]) == 3
+        assert capsys.readouterr().out == "training train --out models in {0}\n".format(tmp_path)
+        assert next(request_daemon({"type": STATUS_REQUEST}))["jobs"] == 1
+
+        with pytest.raises(DaemonError):
+            list(request_daemon({"type": RUN_REQUEST}))
+    finally:
+        stop_daemon(thread)
+    assert not os.path.exists(socket_path)
+
+
+def test_failing_job_does_not_touch_the_daemon(socket_path, tmp_path, capsys):
+    def run_command(args):
+        os.chdir(str(tmp_path))
+        raise ValueError("broken model")
+
+    working_dir = os.getcwd()
+    thread = start_daemon(socket_path, run_command)
+    try:
+        assert run_rasa(["train"]) == 1
+        assert "ValueError: broken model" in capsys.readouterr().out
+        assert run_rasa(["train"]) == 1
+    finally:
+        stop_daemon(thread)
+    assert os.getcwd() == working_dir
+
+
+def test_messages_are_handled_by_the_loaded_model(socket_path, tmp_path):
+    model_path = str(tmp_path / "model.tar.gz")
+    with open(model_path, "w") as f:
+        f.write("model")
+    loads = []
+
+    thread = start_daemon(socket_path, lambda args: 0,
+                          lambda model, sender_id, text: [{"text": "{0} {1}".format(model, text)}],
+                          lambda path, endpoints_path: loads.append(path) or "bot")
+    try:
+        assert send_message(model_path, None, "user", "hello") == [{"text": "bot hello"}]
+        assert send_message(model_path, None, "user", "bye") == [{"text": "bot bye"}]
+        assert loads == [model_path]
+    finally:
+        stop_daemon(thread)
+
+
+def test_rasa_runs_in_a_subprocess_without_daemon(socket_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr("subprocess.call", lambda args: calls.append(args) or 0)
+
+    assert run_rasa(["test", "--model", "models"]) == 0
+    assert calls == [["rasa", "test", "--model", "models"]]
+    assert send_message("model.tar.gz", None, "user", "hello") is None
+
+
+def test_interactive_commands_never_run_in_the_daemon(socket_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr("subprocess.call", lambda args: calls.append(args) or 0)
+
+    thread = start_daemon(socket_path, lambda args: 0)
+    try:
+        assert run_rasa(["shell", "--debug"]) == 0
+        assert calls == [["rasa", "shell", "--debug"]]
+        assert next(request_daemon({"type": STATUS_REQUEST}))["jobs"] == 0
+    finally:
+        stop_daemon(thread)
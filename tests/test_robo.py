@@ -0,0 +1,49 @@
+from types import SimpleNamespace
+
+import pytest
+from robo_ai.model.assistant_runtime.assistant_runtime_status import AssistantRuntimeStatus
+
+from roboai_cli.util import robo
+from roboai_cli.util.deploy_timings import DeployTimings, format_deploy_record, get_deploy_record
+
+
+@pytest.fixture
+def events(monkeypatch):
+    events = []
+    runtimes = SimpleNamespace(
+        get=lambda bot_uuid: SimpleNamespace(content=SimpleNamespace(status=AssistantRuntimeStatus.RUNNING)),
+        stop=lambda bot_uuid: events.append("stop"),
+    )
+    monkeypatch.setattr(robo, "get_current_robo_client", lambda: SimpleNamespace(
+        assistants=SimpleNamespace(runtimes=runtimes)))
+    monkeypatch.setattr(robo, "wait_for_runtime_status",
+                        lambda bot_uuid, status, deadline=None: events.append(status.value) or [])
+    monkeypatch.setattr(robo, "send_package", lambda *args, **kwargs: events.append("send"))
+    monkeypatch.setattr(robo, "complete_upload", lambda upload, timings=None: events.append("complete"))
+    return events
+
+
+def test_staged_package_is_deployed_once_the_runtime_is_stopped(events, monkeypatch):
+    monkeypatch.setattr(robo, "stage_package", lambda *args, **kwargs: events.append("stage") or object())
+    timings = DeployTimings()
+
+    deployment = robo.update_runtime("bot", "package.zip", "rasa-1.10.0", reporter=lambda text: None,
+                                     timings=timings)
+
+    assert events == ["stage", "stop", "STOPPED", "complete", "RUNNING"]
+    assert deployment.downtime is not None and not deployment.uploaded_while_down
+    assert timings.to_dict()["downtime_includes_upload"] is False
+
+
+def test_downtime_includes_the_upload_without_chunked_uploads(events, monkeypatch):
+    monkeypatch.setattr(robo, "stage_package", lambda *args, **kwargs: events.append("stage") or None)
+    timings = DeployTimings()
+
+    deployment = robo.update_runtime("bot", "package.zip", "rasa-1.10.0", reporter=lambda text: None,
+                                     timings=timings)
+
+    assert events == ["stage", "stop", "STOPPED", "send", "RUNNING"]
+    assert deployment.downtime is not None and deployment.uploaded_while_down
+    record = get_deploy_record(DeployTimings(), {"en": timings}, api_calls=4, total=1.0)
+    assert record["deployments"]["en"]["downtime_includes_upload"] is True
+    assert "(upload included)" in format_deploy_record(record)
@@ -0,0 +1,107 @@
+from datetime import datetime
+
+import click
+import pytest
+import requests
+from robo_ai.exception.api_error import ApiError
+from robo_ai.exception.not_authorized_error import NotAuthorizedError
+
+from roboai_cli.commands.logs import fetch_log_lines, poll_log_lines
+from roboai_cli.util.runtime_logs import LogCursor, filter_since, follow_logs, get_last_lines, merge_logs, parse_time
+
+
+def get_lines(start: int, end: int) -> list:
+    return ["2021-01-27 10:{0:02d}:00 INFO line {0}".format(minute) for minute in range(start, end)]
+
+
+def test_cursor_returns_only_new_lines():
+    cursor = LogCursor(marker_size=3)
+
+    assert cursor.advance(get_lines(0, 5)) == get_lines(0, 5)
+    assert cursor.advance(get_lines(0, 8)) == get_lines(5, 8)
+    assert cursor.advance(get_lines(0, 8)) == []
+    # the buffer was rotated, only the end of the marker is still in it
+    assert cursor.advance(get_lines(7, 10)) == get_lines(8, 10)
+    # the buffer was rotated past the marker
+    assert cursor.advance(get_lines(20, 22)) == get_lines(20, 22)
+
+
+def test_cursor_does_not_stop_at_a_repeated_line():
+    cursor = LogCursor(marker_size=2)
+    cursor.advance(["a", "b", "c"])
+
+    assert cursor.advance(["a", "b", "c", "c", "d"]) == ["c", "d"]
+    assert cursor.advance(["a", "b", "c", "c", "d", "c"]) == ["c"]
+
+
+def test_filter_since_keeps_lines_without_timestamp_with_their_line():
+    lines = get_lines(0, 2) + ["Traceback (most recent call last):"] + get_lines(2, 3) + ["  File x"]
+
+    assert list(filter_since(lines, datetime(2021, 1, 27, 10, 1))) == lines[1:]
+    assert list(get_last_lines(lines, 2)) == lines[-2:]
+
+
+def test_parse_time():
+    now = datetime(2021, 1, 27, 12, 0)
+
+    assert parse_time("90s", now) == datetime(2021, 1, 27, 11, 58, 30)
+    assert parse_time("1d2h", now) == datetime(2021, 1, 26, 10, 0)
+    assert parse_time("2021-01-27 10:15") == datetime(2021, 1, 27, 10, 15)
+    with pytest.raises(click.BadParameter):
+        parse_time("yesterday")
+
+
+def test_follow_logs_polls_new_lines():
+    buffers = iter([get_lines(0, 3), get_lines(0, 3), get_lines(1, 5)])
+    cursor = LogCursor()
+    cursor.advance(get_lines(0, 2))
+    sleeps = []
+
+    lines = follow_logs(lambda: next(buffers), cursor, interval=1.5, sleep=sleeps.append)
+
+    assert [next(lines) for _ in range(3)] == get_lines(2, 5)
+    assert sleeps == [1.5, 1.5, 1.5]
+
+
+def test_merge_logs_by_timestamp():
+    streams = {
+        "en": iter(get_lines(0, 1) + ["Traceback (most recent call last):"] + get_lines(2, 3)),
+        "pt": iter(get_lines(0, 2)),
+    }
+
+    assert list(merge_logs(streams)) == [
+        "[en] 2021-01-27 10:00:00 INFO line 0",
+        "[en] Traceback (most recent call last):",
+        "[pt] 2021-01-27 10:00:00 INFO line 0",
+        "[pt] 2021-01-27 10:01:00 INFO line 1",
+        "[en] 2021-01-27 10:02:00 INFO line 2",
+    ]
+
+
+def test_bots_whose_logs_cannot_be_fetched_are_left_out(monkeypatch):
+    def get_runtime_log_lines(bot_uuid):
+        if bot_uuid == "bot-es":
+            raise NotAuthorizedError("forbidden")
+        return get_lines(0, 2)
+
+    monkeypatch.setattr("roboai_cli.commands.logs.get_runtime_log_lines", get_runtime_log_lines)
+
+    buffers, errors = fetch_log_lines({"en": "bot-en", "es": "bot-es"}, concurrency=2)
+    assert buffers == {"en": get_lines(0, 2)}
+    assert list(errors) == ["es"] and isinstance(errors["es"], NotAuthorizedError)
+
+
+def test_failing_poll_gives_no_new_line(monkeypatch):
+    buffers = iter([get_lines(0, 2), ApiError("unavailable"), requests.ConnectionError("reset"), get_lines(0, 3)])
+
+    def get_runtime_log_lines(bot_uuid):
+        buffer = next(buffers)
+        if isinstance(buffer, BaseException):
+            raise buffer
+        return buffer
+
+    monkeypatch.setattr("roboai_cli.commands.logs.get_runtime_log_lines", get_runtime_log_lines)
+
+    cursor = LogCursor()
+    lines = follow_logs(lambda: poll_log_lines("bot"), cursor, sleep=lambda interval: None)
+    assert [next(lines) for _ in range(3)] == get_lines(0, 3)
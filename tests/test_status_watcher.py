@@ -0,0 +1,65 @@
+import pytest
+
+from roboai_cli.util.status_watcher import StatusFailureError, StatusTimeoutError, StatusWatcher
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def create_watcher(statuses: list, clock: FakeClock, deadline: float = None) -> StatusWatcher:
+    """
+    Create a watcher over a status sequence, each status being observed once per poll.
+    """
+    statuses = iter(statuses)
+    return StatusWatcher(lambda: next(statuses), deadline, initial_interval=1, max_interval=4, backoff_factor=2,
+                         clock=clock, sleep=clock.sleep)
+
+
+def test_backoff_and_transitions():
+    clock = FakeClock()
+    watcher = create_watcher(["STOPPING"] * 5 + ["STARTING"] * 2 + ["RUNNING"], clock)
+
+    assert watcher.wait_for(lambda status: status == "RUNNING") == "RUNNING"
+
+    # the interval grows up to the cap, and goes back to the initial one when the status changes
+    assert clock.sleeps == [1, 2, 4, 4, 4, 1, 2]
+    assert [(transition.status, transition.duration) for transition in watcher.transitions] == [
+        ("STOPPING", 15), ("STARTING", 3), ("RUNNING", 0)
+    ]
+
+
+def test_fast_transition_is_noticed_quickly():
+    clock = FakeClock()
+    watcher = create_watcher(["STARTING", "RUNNING"], clock)
+
+    watcher.wait_for(lambda status: status == "RUNNING")
+
+    assert clock.now == 1
+
+
+def test_failure_status():
+    clock = FakeClock()
+    watcher = create_watcher(["STARTING", "DEAD", "RUNNING"], clock)
+
+    with pytest.raises(StatusFailureError):
+        watcher.wait_for(lambda status: status == "RUNNING", failure_statuses=["DEAD"])
+
+
+def test_deadline():
+    clock = FakeClock()
+    watcher = create_watcher(["STARTING"] * 100, clock, deadline=10)
+
+    with pytest.raises(StatusTimeoutError):
+        watcher.wait_for(lambda status: status == "RUNNING")
+
+    assert clock.now == 10
@@ -0,0 +1,216 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from os.path import join
+from socketserver import ThreadingMixIn
+
+import pytest
+import requests
+
+from roboai_cli.util.http import SessionRequests
+from roboai_cli.util.upload import UPDATE_OPERATION, ChunkedUpload, UploadError, UploadNotSupportedError
+
+CHUNK_SIZE = 64 * 1024
+
+
+class UploadServer(ThreadingMixIn, HTTPServer):
+    """
+    Stand-in implementation of the chunked upload endpoints of the platform.
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), UploadHandler)
+        # status and body answered to the session creation, instead of creating a session
+        self.create_response = None
+        self.uploads = {}
+        self.completed = {}
+        # part index -> number of times the part upload fails before succeeding
+        self.failures = {}
+        self.part_requests = []
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return "http://127.0.0.1:{0}".format(self.server_address[1])
+
+
+class UploadHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if self.server.create_response:
+            return self.send_body(*self.server.create_response)
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.path.endswith("/uploads"):
+            upload_id = str(len(self.server.uploads) + 1)
+            self.server.uploads[upload_id] = {"size": body["size"], "chunkSize": body["chunkSize"], "parts": {}}
+            return self.send_json(201, {"uploadId": upload_id, "chunkSize": body["chunkSize"]})
+        upload_id = re.search(r"/uploads/(\w+)/complete$", self.path).group(1)
+        upload = self.server.uploads[upload_id]
+        content = b"".join(upload["parts"][part] for part in sorted(upload["parts"]))
+        if len(content) != upload["size"] or hashlib.sha256(content).hexdigest() != body["sha256"]:
+            return self.send_json(409, {})
+        self.server.completed[upload_id] = content
+        self.send_json(200, {"status": "UPDATING"})
+
+    def do_GET(self):
+        upload_id = re.search(r"/uploads/(\w+)$", self.path).group(1)
+        upload = self.server.uploads[upload_id]
+        self.send_json(200, {"uploadId": upload_id, "chunkSize": upload["chunkSize"],
+                             "receivedParts": sorted(upload["parts"])})
+
+    def do_PUT(self):
+        match = re.search(r"/uploads/(\w+)/parts/(\d+)$", self.path)
+        upload, part = self.server.uploads[match.group(1)], int(match.group(2))
+        data = self.rfile.read(int(self.headers["Content-Length"]))
+        with self.server.lock:
+            self.server.part_requests.append(part)
+            failures = self.server.failures.get(part, 0)
+            if failures:
+                self.server.failures[part] = failures - 1
+                return self.send_json(503, {})
+        if hashlib.sha256(data).hexdigest() != self.headers["X-Content-SHA256"]:
+            return self.send_json(422, {})
+        upload["parts"][part] = data
+        self.send_json(200, {})
+
+    def send_json(self, status: int, content: dict):
+        self.send_body(status, json.dumps(content).encode("utf-8"))
+
+    def send_body(self, status: int, body: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    upload_server = UploadServer()
+    thread = threading.Thread(target=upload_server.serve_forever, daemon=True)
+    thread.start()
+    yield upload_server
+    upload_server.shutdown()
+    upload_server.server_close()
+
+
+@pytest.fixture
+def package_file(tmp_path):
+    path = join(str(tmp_path), "package.zip")
+    with open(path, "wb") as f:
+        f.write(os.urandom(CHUNK_SIZE * 5 + 1000))
+    return path
+
+
+def create_upload(server: UploadServer, package_file: str, **kwargs) -> ChunkedUpload:
+    return ChunkedUpload(server.url, "bot", package_file, "rasa-1.10.0", UPDATE_OPERATION,
+                         chunk_size=CHUNK_SIZE, backoff=0.01, **kwargs)
+
+
+@pytest.mark.parametrize("parallel", [1, 3])
+def test_upload_retries_failed_parts(server, package_file, parallel):
+    server.failures = {1: 2, 4: 1}
+    progress = []
+
+    create_upload(server, package_file, parallel=parallel).run(progress_callback=progress.append)
+
+    with open(package_file, "rb") as f:
+        assert server.completed["1"] == f.read()
+    assert sorted(server.part_requests) == [0, 1, 1, 1, 2, 3, 4, 4, 5]
+    assert progress[-1] == os.path.getsize(package_file)
+    assert not os.path.exists(package_file + ".upload.json")
+
+
+def test_upload_resumes_from_acknowledged_parts(server, package_file):
+    server.failures = {3: 10}
+    with pytest.raises(UploadError):
+        create_upload(server, package_file, max_retries=2).run()
+    assert os.path.exists(package_file + ".upload.json")
+
+    server.failures = {}
+    server.part_requests = []
+    progress = []
+    create_upload(server, package_file).run(progress_callback=progress.append)
+
+    assert server.part_requests == [3, 4, 5]
+    assert progress[0] == 3 * CHUNK_SIZE
+    with open(package_file, "rb") as f:
+        assert server.completed["1"] == f.read()
+
+
+@pytest.mark.parametrize("status", [404, 405, 501])
+def test_upload_not_supported(server, package_file, status):
+    server.create_response = (status, b"{}")
+
+    with pytest.raises(UploadNotSupportedError):
+        create_upload(server, package_file).run()
+
+
+@pytest.mark.parametrize("status,body", [(400, b"{}"), (401, b"{}"), (403, b"{}"), (415, b""), (500, b"{}"),
+                                         (201, b"<html></html>"), (201, b"{}"), (200, b"[]")])
+def test_upload_fails_on_other_errors(server, package_file, status, body):
+    server.create_response = (status, body)
+
+    with pytest.raises(UploadError):
+        create_upload(server, package_file).run()
+
+
+def test_upload_fails_when_the_server_cannot_be_reached(package_file):
+    upload = ChunkedUpload("http://127.0.0.1:1", "bot", package_file, "rasa-1.10.0", UPDATE_OPERATION,
+                           chunk_size=CHUNK_SIZE, backoff=0.01)
+
+    with pytest.raises(UploadError):
+        upload.run()
+
+
+def test_upload_renews_a_rejected_token(server, package_file, monkeypatch):
+    tokens = []
+
+    def renew_token(token):
+        tokens.append(token)
+        return "new-token"
+
+    class RejectingUploadHandler(UploadHandler):
+        def do_POST(self):
+            if self.headers["Authorization"] != "bearer new-token":
+                return self.send_json(401, {})
+            super().do_POST()
+
+    server.RequestHandlerClass = RejectingUploadHandler
+    monkeypatch.setattr("roboai_cli.util.http._token_renewer", renew_token)
+
+    create_upload(server, package_file, headers={"Authorization": "bearer old-token"},
+                  session=SessionRequests(requests.Session())).run()
+    assert tokens == ["old-token"]
+    with open(package_file, "rb") as f:
+        assert server.completed["1"] == f.read()
+
+
+def test_known_digest_is_not_computed_again(server, package_file):
+    with open(package_file, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    upload = create_upload(server, package_file, sha256="0" * 64)
+    upload.stage()
+
+    # the server checks the digest sent with the completion against the received parts
+    with pytest.raises(UploadError):
+        upload.complete()
+    create_upload(server, package_file, sha256=digest).run()
+
+
+def test_upload_is_staged_before_completion(server, package_file):
+    upload = create_upload(server, package_file)
+    upload.stage()
+
+    assert sorted(server.uploads["1"]["parts"]) == [0, 1, 2, 3, 4, 5]
+    assert server.completed == {}
+
+    upload.complete()
+    with open(package_file, "rb") as f:
+        assert server.completed["1"] == f.read()
@@ -0,0 +1,96 @@
+import json
+import os
+
+import click
+import pytest
+
+from roboai_cli.config.bot_manifest import BotManifest
+from roboai_cli.util.workspace import Workspace
+
+
+def create_bot(root, languages):
+    (root / "languages").mkdir()
+    (root / "languages" / "stories.md").write_text("## greet\n")
+    for language in languages:
+        data_dir = root / "languages" / language / "data"
+        data_dir.mkdir(parents=True)
+        (root / "languages" / language / "domain.yml").write_text("intents: []\n")
+        (data_dir / "nlu.md").write_text("## intent:greet\n")
+        (data_dir / "extra-stories.md").write_text("## bye\n")
+
+
+def test_multi_language_layout(tmp_path):
+    create_bot(tmp_path, ["fr", "en", "es"])
+    workspace = Workspace(str(tmp_path))
+
+    assert workspace.is_multi_language
+    assert workspace.get_languages() == ["en", "es", "fr"]
+    assert workspace.get_language_dirs(("fr", "de")) == [str(tmp_path / "languages" / "fr")]
+    assert workspace.get_bot_dirs() == [str(tmp_path / "languages" / code) for code in ["en", "es", "fr"]]
+    assert workspace.get_shared_stories() == [str(tmp_path / "languages" / "stories.md")]
+
+    data_files = workspace.get_data_files(str(tmp_path / "languages" / "en"))
+    assert data_files.domain == str(tmp_path / "languages" / "en" / "domain.yml")
+    assert data_files.nlu == [str(tmp_path / "languages" / "en" / "data" / "nlu.md")]
+    assert data_files.stories == [str(tmp_path / "languages" / "en" / "data" / "extra-stories.md")]
+
+
+def test_single_language_layout(tmp_path):
+    workspace = Workspace(str(tmp_path))
+
+    assert not workspace.is_multi_language
+    assert workspace.get_bot_dirs() == [str(tmp_path)]
+    assert workspace.get_shared_stories() == []
+    with pytest.raises(click.UsageError):
+        workspace.get_languages()
+
+
+def test_directories_are_listed_again_only_when_they_change(tmp_path, monkeypatch):
+    create_bot(tmp_path, ["en"])
+    workspace = Workspace(str(tmp_path))
+    listed = []
+    scandir = os.scandir
+    monkeypatch.setattr("os.scandir", lambda path: listed.append(path) or scandir(path))
+
+    for _ in range(3):
+        assert workspace.get_languages() == ["en"]
+    assert listed == [str(tmp_path / "languages")]
+
+    (tmp_path / "languages" / "pt").mkdir()
+    stat = os.stat(str(tmp_path / "languages"))
+    os.utime(str(tmp_path / "languages"), ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+    assert workspace.get_languages() == ["en", "pt"]
+    assert len(listed) == 2
+
+
+def test_manifest_is_parsed_again_only_when_it_changes(tmp_path, monkeypatch):
+    (tmp_path / "robo-manifest.json").write_text(json.dumps({"bot_id": "bot-1"}))
+    manifest = BotManifest(str(tmp_path))
+    loads = []
+    load = json.load
+    monkeypatch.setattr("json.load", lambda file: loads.append(file) or load(file))
+
+    assert manifest.get_bot_id() == "bot-1"
+    assert manifest.get_base_version() is None
+    assert BotManifest(str(tmp_path)).get_bot_id() == "bot-1"
+    assert len(loads) == 1
+
+    manifest.set_bot_id("bot-2")
+    assert BotManifest(str(tmp_path)).get_bot_id() == "bot-2"
+    assert len(loads) == 1
+
+
+def test_manifest_is_replaced_atomically(tmp_path, monkeypatch):
+    manifest_path = tmp_path / "robo-manifest.json"
+    manifest_path.write_text(json.dumps({"bot_id": "bot-1"}))
+    os.chmod(str(manifest_path), 0o640)
+    replaced = []
+    replace = os.replace
+    monkeypatch.setattr("os.replace", lambda source, target: replaced.append(target) or replace(source, target))
+
+    BotManifest(str(tmp_path)).set_bot_id("bot-2")
+
+    assert replaced == [str(manifest_path)]
+    assert json.loads(manifest_path.read_text()) == {"bot_id": "bot-2"}
+    assert os.stat(str(manifest_path)).st_mode & 0o777 == 0o640
+    assert os.listdir(str(tmp_path)) == ["robo-manifest.json"]